@@ -0,0 +1,118 @@
+# Race the IT-on-duty delivery channels instead of trying them one after another
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DEADLINE = 20.0
+DEFAULT_STAGGER = 1.5
+
+
+class AlertChannel:
+    """One delivery route. ``send(alert_data, timeout)`` returns True once the alert is out."""
+
+    def __init__(self, name, endpoint, send):
+        self.name = name
+        self.endpoint = endpoint
+        self.send = send
+
+
+class AlertDispatcher:
+    """Starts channels in priority order, staggered, under one overall deadline.
+
+    The next channel starts when the stagger delay passes or as soon as the
+    running ones have failed, whichever comes first. Nothing new starts once
+    a channel confirms delivery; sends already in flight are left to finish
+    but their results are ignored. Channels that share an endpoint are only
+    tried once.
+    """
+
+    def __init__(self, channels, deadline=DEFAULT_DEADLINE, stagger=DEFAULT_STAGGER):
+        self.channels = self._dedupe(channels)
+        self.deadline = deadline
+        self.stagger = stagger
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _dedupe(channels):
+        seen = set()
+        unique = []
+        for channel in channels:
+            if not channel.endpoint or channel.endpoint in seen:
+                continue
+            seen.add(channel.endpoint)
+            unique.append(channel)
+        return unique
+
+    def dispatch(self, alert_data):
+        """Deliver ``alert_data``; returns a result dict with the winning channel and latencies."""
+        started = time.monotonic()
+        deadline = started + self.deadline
+        results = queue.Queue()
+        result = {"delivered": False, "channel": None, "latency_ms": {}, "errors": {}}
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.channels)),
+                                      thread_name_prefix="casi-alert")
+        next_index = 0
+        next_start = started
+        in_flight = 0
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if next_index < len(self.channels) and now >= next_start:
+                    channel = self.channels[next_index]
+                    executor.submit(self._run_channel, channel, alert_data, deadline - now, results)
+                    print(f"📤 Alert channel started: {channel.name}")
+                    next_index += 1
+                    in_flight += 1
+                    next_start = now + self.stagger
+                    continue
+                if in_flight == 0 and next_index >= len(self.channels):
+                    break
+                wake_at = deadline if next_index >= len(self.channels) else min(deadline, next_start)
+                try:
+                    name, ok, latency_ms, error = results.get(timeout=max(0.0, wake_at - now))
+                except queue.Empty:
+                    continue
+                in_flight -= 1
+                result["latency_ms"][name] = round(latency_ms, 1)
+                if ok:
+                    result["delivered"] = True
+                    result["channel"] = name
+                    break
+                result["errors"][name] = error
+                next_start = time.monotonic()  # a failed channel hands over immediately
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        result["total_ms"] = round((time.monotonic() - started) * 1000, 1)
+        if result["delivered"]:
+            print(f"✅ Alert delivered via {result['channel']} in {result['total_ms']} ms")
+        else:
+            print(f"❌ Alert not delivered within {self.deadline}s: {result['errors']}")
+        return result
+
+    def _run_channel(self, channel, alert_data, timeout, results):
+        started = time.monotonic()
+        ok = False
+        error = None
+        try:
+            ok = bool(channel.send(alert_data, timeout))
+            if not ok:
+                error = "channel reported failure"
+        except Exception as e:
+            error = str(e)
+        latency_ms = (time.monotonic() - started) * 1000
+        self._record(channel.name, ok, latency_ms)
+        results.put((channel.name, ok, latency_ms, error))
+
+    def _record(self, name, ok, latency_ms):
+        with self._stats_lock:
+            stats = self.stats.setdefault(name, {"attempts": 0, "successes": 0, "total_latency_ms": 0.0,
+                                                 "last_latency_ms": None})
+            stats["attempts"] += 1
+            stats["successes"] += 1 if ok else 0
+            stats["total_latency_ms"] += latency_ms
+            stats["last_latency_ms"] = round(latency_ms, 1)
+            stats["avg_latency_ms"] = round(stats["total_latency_ms"] / stats["attempts"], 1)
@@ -0,0 +1,154 @@
+# Local cache of chat answers, validated against the backend's knowledge-base version
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Serve without asking the backend while younger than this
+ANSWER_FRESH_SECONDS = 10 * 60
+# Revalidate with /kb-version until this age, then drop
+ANSWER_MAX_AGE_SECONDS = 7 * 24 * 3600
+ANSWER_MAX_ENTRIES = 300
+ANSWER_MAX_BYTES = 512 * 1024
+
+
+def normalize_question(text):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share an entry."""
+    text = re.sub(r"[^\w\s*]", " ", (text or "").lower())
+    return " ".join(text.split())
+
+
+def cache_key(question, authenticated):
+    # Signed-in users get knowledge-base answers anonymous users do not, so keep them apart
+    scope = "auth" if authenticated else "anon"
+    return hashlib.sha256(f"{scope}|{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """LRU answer cache persisted as one JSON file, bounded by entry count, bytes and age.
+
+    ``lookup`` returns ``(entry, state)`` where state is "fresh" (show at once),
+    "stale" (revalidate the kb_version first) or None (miss). Versions are
+    tracked per backend, since each backend computes its own: a different
+    kb_version seen from a backend drops that backend's entries made under the
+    old one, and failing over to another backend leaves them alone.
+    """
+
+    def __init__(self, path, fresh_seconds=ANSWER_FRESH_SECONDS, max_age_seconds=ANSWER_MAX_AGE_SECONDS,
+                 max_entries=ANSWER_MAX_ENTRIES, max_bytes=ANSWER_MAX_BYTES, clock=time.time):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.kb_versions = {}
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _entry_size(entry):
+        return len(entry["answer"].encode("utf-8")) + len(json.dumps(entry.get("options", [])))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[DEBUG] Ignoring unreadable answer cache: {e}")
+            return
+        self.kb_versions = data.get("kb_versions", {})
+        for key, entry in data.get("entries", []):
+            self.entries[key] = entry
+            self.size_bytes += self._entry_size(entry)
+        self._evict()
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"kb_versions": self.kb_versions, "entries": list(self.entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _evict(self):
+        cutoff = self.clock() - self.max_age_seconds
+        for key in [k for k, e in self.entries.items() if e["validated_at"] < cutoff]:
+            self.size_bytes -= self._entry_size(self.entries.pop(key))
+        while self.entries and (len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            _, entry = self.entries.popitem(last=False)
+            self.size_bytes -= self._entry_size(entry)
+
+    def lookup(self, question, authenticated):
+        key = cache_key(question, authenticated)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["kb_version"] != self.kb_versions.get(entry.get("backend", "")):
+                self.misses += 1
+                return None, None
+            age = self.clock() - entry["validated_at"]
+            if age > self.max_age_seconds:
+                self.size_bytes -= self._entry_size(self.entries.pop(key))
+                self.misses += 1
+                return None, None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry, "fresh" if age <= self.fresh_seconds else "stale"
+
+    def store(self, question, authenticated, answer, kb_version, options=None, backend=""):
+        entry = {"answer": answer, "options": options or [], "kb_version": kb_version,
+                 "backend": backend, "validated_at": self.clock()}
+        key = cache_key(question, authenticated)
+        with self._lock:
+            self._observe_version(kb_version, backend)
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= self._entry_size(previous)
+            self.entries[key] = entry
+            self.size_bytes += self._entry_size(entry)
+            self._evict()
+            self._save()
+
+    def mark_validated(self, kb_version, backend=""):
+        """``backend`` confirmed ``kb_version`` is current: restart the freshness clock for its entries."""
+        with self._lock:
+            self._observe_version(kb_version, backend)
+            now = self.clock()
+            for entry in self.entries.values():
+                if entry.get("backend", "") == backend:
+                    entry["validated_at"] = now
+            self._save()
+
+    def observe_version(self, kb_version, backend=""):
+        with self._lock:
+            if self._observe_version(kb_version, backend):
+                self._save()
+
+    def _observe_version(self, kb_version, backend):
+        if not kb_version or kb_version == self.kb_versions.get(backend):
+            return False
+        self.kb_versions[backend] = kb_version
+        for key in [k for k, e in self.entries.items()
+                    if e.get("backend", "") == backend and e["kb_version"] != kb_version]:
+            self.size_bytes -= self._entry_size(self.entries.pop(key))
+        return True
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size_bytes = 0
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self.entries), "bytes": self.size_bytes, "hits": self.hits,
+                    "misses": self.misses, "kb_versions": dict(self.kb_versions)}
@@ -0,0 +1,175 @@
+# Admission control: cap concurrent work, queue a bounded number of waiters by priority, shed the rest
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from flask import jsonify, make_response
+
+# Lower numbers are served first
+PRIORITY_ESCALATION = 0
+PRIORITY_USER = 1
+PRIORITY_ANONYMOUS = 2
+PRIORITY_NAMES = {PRIORITY_ESCALATION: "escalation", PRIORITY_USER: "user", PRIORITY_ANONYMOUS: "anonymous"}
+WAIT_SAMPLES = 512
+SERVICE_EWMA_ALPHA = 0.2
+MAX_RETRY_AFTER = 30
+
+
+class Overloaded(Exception):
+    """The request was shed: the queue was full, it was pushed out, or it waited too long."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Overloaded ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, priority):
+        self.priority = priority
+        self.event = threading.Event()
+        self.admitted = False
+        self.shed_reason = None
+
+
+class AdmissionController:
+    """At most ``max_concurrent`` requests run at once; up to ``max_queue`` more wait.
+
+    Waiters are admitted in priority order, FIFO within a priority. When the
+    queue is full a new request is rejected, unless it outranks the lowest
+    priority waiter, which is then rejected in its place. A waiter that has
+    not started after ``queue_timeout`` is rejected too: keep it below the
+    client's timeout so nobody waits for an answer that arrives after the
+    client has already given up and retried.
+
+    Rejections carry a Retry-After estimate based on queue depth and the
+    recent service time. A waiting request still holds a server thread, so
+    the server needs more threads than ``max_concurrent``.
+    """
+
+    def __init__(self, max_concurrent=6, max_queue=8, queue_timeout=4.0, clock=time.monotonic):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.queue = []  # heap of (priority, seq, waiter)
+        self.seq = itertools.count()
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.max_wait = 0.0
+        self.service_seconds = 1.0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "evicted": 0, "timeout": 0}
+        self.shed_by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def retry_after(self):
+        """Seconds until the current queue should have drained (caller holds the lock)."""
+        backlog = (len(self.queue) + 1) * self.service_seconds / max(1, self.max_concurrent)
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(backlog)))
+
+    def _reject(self, priority, reason):
+        self.shed[reason] += 1
+        self.shed_by_priority[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return Overloaded(reason, self.retry_after())
+
+    def _admit(self, waited):
+        self.admitted += 1
+        self.waits.append(waited)
+        self.max_wait = max(self.max_wait, waited)
+
+    def acquire(self, priority=PRIORITY_ANONYMOUS):
+        """Block until the request may run; raises Overloaded if it is shed."""
+        started = self.clock()
+        with self.lock:
+            if self.in_flight < self.max_concurrent and not self.queue:
+                self.in_flight += 1
+                self._admit(0.0)
+                return 0.0
+            if len(self.queue) >= self.max_queue:
+                worst = max(self.queue, key=lambda entry: (entry[0], entry[1])) if self.queue else None
+                if worst is None or worst[0] <= priority:
+                    raise self._reject(priority, "queue_full")
+                # Make room by turning away the newest of the lowest-priority waiters
+                self.queue.remove(worst)
+                heapq.heapify(self.queue)
+                worst[2].shed_reason = "evicted"
+                self._reject(worst[0], "evicted")
+                worst[2].event.set()
+            waiter = _Waiter(priority)
+            entry = (priority, next(self.seq), waiter)
+            heapq.heappush(self.queue, entry)
+        waiter.event.wait(self.queue_timeout)
+        with self.lock:
+            if waiter.admitted:
+                waited = self.clock() - started
+                self._admit(waited)
+                return waited
+            if waiter.shed_reason is not None:
+                raise Overloaded(waiter.shed_reason, self.retry_after())
+            self.queue.remove(entry)
+            heapq.heapify(self.queue)
+            raise self._reject(priority, "timeout")
+
+    def release(self, service_seconds=None):
+        """Finish a request; its slot goes straight to the best waiter, if any."""
+        with self.lock:
+            if service_seconds is not None:
+                self.service_seconds += SERVICE_EWMA_ALPHA * (service_seconds - self.service_seconds)
+            if self.queue:
+                _, _, waiter = heapq.heappop(self.queue)
+                waiter.admitted = True
+                waiter.event.set()
+            else:
+                self.in_flight -= 1
+
+    def guard(self, priority_func):
+        """Decorator for a Flask view: admit it under ``priority_func()`` or answer 503 with Retry-After."""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                priority = priority_func()
+                try:
+                    waited = self.acquire(priority)
+                except Overloaded as e:
+                    logging.warning(f"Shedding {PRIORITY_NAMES.get(priority, priority)} request: {e}")
+                    response = jsonify({"error": "Server is busy, please try again shortly",
+                                        "retry_after": e.retry_after})
+                    response.status_code = 503
+                    response.headers["Retry-After"] = str(e.retry_after)
+                    return response
+                started = self.clock()
+                try:
+                    response = make_response(view(*args, **kwargs))
+                finally:
+                    self.release(self.clock() - started)
+                response.headers["X-Queue-Wait-Ms"] = str(round(waited * 1000, 1))
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self.lock:
+            waits = sorted(self.waits)
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": len(self.queue),
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "shed_by_priority": dict(self.shed_by_priority),
+                "queue_wait_ms": {
+                    "avg": round(sum(waits) * 1000 / len(waits), 1) if waits else 0.0,
+                    "p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                    "p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                    "max": round(self.max_wait * 1000, 1),
+                },
+                "service_ms_ewma": round(self.service_seconds * 1000, 1),
+            }
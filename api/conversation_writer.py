@@ -0,0 +1,193 @@
+# Write-behind persistence of chat turns: /chat enqueues, a background thread group-commits
+import logging
+import queue
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    user_input TEXT,
+    response TEXT,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS conversation_turns_user ON conversation_turns(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS conversation_turns_timestamp ON conversation_turns(timestamp);
+"""
+INSERT_TURN = "INSERT INTO conversation_turns (user_id, user_input, response, timestamp) VALUES (?, ?, ?, ?)"
+DELETE_USER = "DELETE FROM conversation_turns WHERE user_id = ?"
+
+
+class ConversationWriter:
+    """Batches conversation turns into one transaction per flush.
+
+    ``record`` and ``clear_user`` only enqueue, so /chat never waits on SQLite.
+    The writer thread waits ``flush_interval`` after the first queued item to
+    gather a batch, then commits it in one transaction (one WAL sync for the
+    whole batch). Every ``retention_interval`` it deletes turns older than
+    ``ttl_seconds`` and returns up to ``vacuum_pages`` free pages to the OS
+    with ``PRAGMA incremental_vacuum``.
+    """
+
+    def __init__(self, pool, flush_interval=0.005, max_batch=500, max_queue=10000,
+                 ttl_seconds=30 * 24 * 3600, retention_interval=600, vacuum_pages=256, clock=time.time):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.ttl_seconds = ttl_seconds
+        self.retention_interval = retention_interval
+        self.vacuum_pages = vacuum_pages
+        self.clock = clock
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.purged = 0
+        self.failures = 0
+        self.last_batch_ms = 0.0
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._next_retention = 0.0
+        self._init_schema()
+
+    def _init_schema(self):
+        with self.pool.writer() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Switching an existing database to incremental auto-vacuum needs one full VACUUM
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+
+    def record(self, user_id, user_input, response, timestamp=None):
+        self._enqueue((INSERT_TURN, (user_id, user_input, response, timestamp or self.clock())))
+
+    def clear_user(self, user_id):
+        # Queued behind the user's pending turns so none of them is written back afterwards
+        self._enqueue((DELETE_USER, (user_id,)))
+
+    def _enqueue(self, item):
+        with self._idle:
+            self._pending += 1
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            with self._idle:
+                self._pending -= 1
+                self.dropped += 1
+                self._idle.notify_all()
+            logging.warning("Conversation write queue full; dropping a turn")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="conversation-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        """Write everything still queued, then stop the thread (used by cleanup())."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._write_all()
+
+    def flush(self, timeout=5):
+        """Block until every turn queued so far is committed; False on timeout."""
+        if self._thread is None:
+            self._write_all()
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _drain(self, first=None):
+        batch = [] if first is None else [first]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_all(self):
+        batch = self._drain()
+        while batch:
+            self._write_batch(batch)
+            batch = self._drain()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                first = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                first = None
+            if first is not None:
+                # Let concurrent requests join this transaction
+                self._stopped.wait(self.flush_interval)
+                self._write_batch(self._drain(first))
+            if self.clock() >= self._next_retention:
+                self.apply_retention()
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            with self.pool.writer() as conn:
+                for sql, params in batch:
+                    conn.execute(sql, params)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failures += 1
+            logging.error(f"Failed to persist {len(batch)} conversation writes: {e}")
+        finally:
+            self.last_batch_ms = round((time.perf_counter() - started) * 1000, 3)
+            with self._idle:
+                self._pending -= len(batch)
+                self._idle.notify_all()
+
+    def apply_retention(self):
+        """Delete turns past the TTL and release some free pages; returns the number deleted."""
+        self._next_retention = self.clock() + self.retention_interval
+        try:
+            with self.pool.writer() as conn:
+                deleted = conn.execute("DELETE FROM conversation_turns WHERE timestamp < ?",
+                                       (self.clock() - self.ttl_seconds,)).rowcount
+            with self.pool.writer() as conn:
+                # executescript steps the pragma to completion; execute() would free a single page
+                conn.executescript(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+        except Exception as e:
+            logging.error(f"Conversation retention failed: {e}")
+            return 0
+        self.purged += deleted
+        return deleted
+
+    def recent_turns(self, max_age_seconds, per_user_limit):
+        """Turns newer than ``max_age_seconds``, at most ``per_user_limit`` per user, oldest first."""
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT user_id, user_input, response, timestamp FROM ("
+                "  SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY timestamp DESC) AS recency"
+                "  FROM conversation_turns WHERE timestamp >= ?"
+                ") WHERE recency <= ? ORDER BY timestamp",
+                (self.clock() - max_age_seconds, per_user_limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def user_turns(self, user_id, max_age_seconds, limit):
+        """One user's newest turns (at most ``limit``, oldest first), for workers that did not serve them."""
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT user_id, user_input, response, timestamp FROM ("
+                "  SELECT * FROM conversation_turns WHERE user_id = ? AND timestamp >= ?"
+                "  ORDER BY timestamp DESC, id DESC LIMIT ?"
+                ") ORDER BY timestamp, id",
+                (user_id, self.clock() - max_age_seconds, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        return {"queued": self.queue.qsize(), "written": self.written, "batches": self.batches,
+                "dropped": self.dropped, "failures": self.failures, "purged": self.purged,
+                "last_batch_ms": self.last_batch_ms}
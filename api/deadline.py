@@ -0,0 +1,93 @@
+# Per-request deadlines: the client's timeout bounds every stage and outbound call of a request
+import time
+
+from flask import g, has_request_context, jsonify, request
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+# The desktop client gives up after 8 s
+DEFAULT_TIMEOUT_SECONDS = 8.0
+MAX_TIMEOUT_SECONDS = 60.0
+# Time kept back to build the reply and get it to the client before it gives up
+RESPONSE_MARGIN_SECONDS = 0.5
+# Not worth starting an outbound call with less than this left
+MIN_CALL_SECONDS = 0.25
+# Retry-After for a request that ran out of time before it could be answered at all
+DEADLINE_RETRY_AFTER = 1
+
+
+class DeadlineExceeded(Exception):
+    """Too little of the request's time budget is left for ``stage``."""
+
+    def __init__(self, stage, remaining):
+        super().__init__(f"{stage}: {remaining * 1000:.0f} ms left of the request deadline")
+        self.stage = stage
+        self.remaining = remaining
+
+
+class Deadline:
+    def __init__(self, seconds, clock=time.monotonic):
+        self.clock = clock
+        self.budget = seconds
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - self.clock())
+
+    def allows(self, seconds):
+        """True when at least ``seconds`` are left, e.g. before an optional stage."""
+        return self.remaining() >= seconds
+
+    def timeout(self, cap, stage="call", reserve=0.0):
+        """Timeout for one outbound call: ``cap`` or what is left after holding back ``reserve``
+        seconds for later stages, whichever is smaller."""
+        remaining = self.remaining() - reserve
+        if remaining < MIN_CALL_SECONDS:
+            raise DeadlineExceeded(stage, max(0.0, remaining))
+        return min(cap, remaining)
+
+
+def parse_timeout_header(value, default=DEFAULT_TIMEOUT_SECONDS, maximum=MAX_TIMEOUT_SECONDS):
+    """Seconds from an X-Request-Timeout-Ms value; missing or invalid values give ``default``."""
+    try:
+        seconds = float(value) / 1000
+    except (TypeError, ValueError):
+        return default
+    if not seconds > 0:  # also rejects NaN
+        return default
+    return min(seconds, maximum)
+
+
+def register_deadlines(app, default_seconds=DEFAULT_TIMEOUT_SECONDS, margin=RESPONSE_MARGIN_SECONDS):
+    """Give every request ``g.deadline`` from the client's X-Request-Timeout-Ms header, minus ``margin``.
+
+    A ``DeadlineExceeded`` that reaches Flask is answered 503 with Retry-After."""
+
+    @app.before_request
+    def _start_deadline():
+        seconds = parse_timeout_header(request.headers.get(DEADLINE_HEADER), default_seconds)
+        g.deadline = Deadline(max(0.0, seconds - margin))
+
+    @app.errorhandler(DeadlineExceeded)
+    def _deadline_exceeded(error):
+        # Out of time before any answer could be built (e.g. while verifying the sign-in): that is
+        # not an auth failure or a server error, so ask the client to try again
+        return (jsonify({"error": "The request ran out of time, please try again",
+                         "stage": error.stage, "retry_after": DEADLINE_RETRY_AFTER}),
+                503, {"Retry-After": str(DEADLINE_RETRY_AFTER)})
+
+    @app.after_request
+    def _report_deadline(response):
+        deadline = getattr(g, "deadline", None)
+        if deadline is not None:
+            response.headers["X-Deadline-Remaining-Ms"] = str(round(deadline.remaining() * 1000))
+        return response
+
+
+def current_deadline():
+    return getattr(g, "deadline", None) if has_request_context() else None
+
+
+def time_left(cap, stage="call", reserve=0.0):
+    """``cap`` outside a request; inside one, the smaller of ``cap`` and the time the deadline leaves."""
+    deadline = current_deadline()
+    return cap if deadline is None else deadline.timeout(cap, stage, reserve)
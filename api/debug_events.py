@@ -0,0 +1,188 @@
+# Bounded in-memory debug event buffer with a Server-Sent Events stream
+import functools
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+from flask import Response, g, jsonify, request, stream_with_context
+
+DEBUG_BUFFER_SIZE = int(os.environ.get("DEBUG_BUFFER_SIZE", "2000"))
+# /debug/* requires this token (X-Debug-Token header or ?token=); unset disables the endpoints
+DEBUG_STREAM_TOKEN = os.environ.get("DEBUG_STREAM_TOKEN", "")
+HEARTBEAT_SECONDS = 15
+PREVIEW_CHARS = 80
+FILTER_FIELDS = ("type", "level", "request_id", "user", "path")
+
+
+def preview(text, limit=PREVIEW_CHARS):
+    """Shorten user text before it goes into the debug buffer."""
+    text = (text or "").replace("\n", " ")
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def user_ref(user):
+    """Keyed hash of a user id, so no email ever enters the buffer; "anonymous" stays readable."""
+    if not user or user == "anonymous":
+        return user
+    return hmac.new(DEBUG_STREAM_TOKEN.encode("utf-8"), str(user).lower().encode("utf-8"),
+                    hashlib.sha256).hexdigest()[:16]
+
+
+class DebugEventBuffer:
+    """Ring buffer of structured events; readers block on a condition until new events arrive."""
+
+    def __init__(self, capacity=DEBUG_BUFFER_SIZE):
+        self.events = deque(maxlen=capacity)
+        self.next_id = 1
+        self.condition = threading.Condition()
+
+    def emit(self, event_type, level="info", **fields):
+        event = {"type": event_type, "level": level, "ts": time.time()}
+        event.update(fields)
+        if "user" in event:
+            event["user"] = user_ref(event["user"])
+        with self.condition:
+            event["id"] = self.next_id
+            self.next_id += 1
+            self.events.append(event)
+            self.condition.notify_all()
+        return event
+
+    def since(self, last_id=0, filters=None, limit=None):
+        with self.condition:
+            events = [e for e in self.events if e["id"] > last_id]
+        if filters:
+            events = [e for e in events if matches(e, filters)]
+        return events[-limit:] if limit else events
+
+    def wait(self, last_id, timeout):
+        """Block until an event newer than ``last_id`` exists or ``timeout`` passes."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.next_id - 1 > last_id, timeout)
+
+    def latest_id(self):
+        with self.condition:
+            return self.next_id - 1
+
+
+def matches(event, filters):
+    for field, wanted in filters.items():
+        if field == "contains":
+            if wanted.lower() not in json.dumps(event, ensure_ascii=False).lower():
+                return False
+        elif str(event.get(field, "")) not in wanted:
+            return False
+    return True
+
+
+def parse_filters(args):
+    """Comma-separated values per field, e.g. ?type=chat.llm,chat.error&level=error.
+
+    ?user= takes emails as well as hashes; emails are hashed like the events are."""
+    filters = {}
+    for field in FILTER_FIELDS:
+        value = args.get(field)
+        if value:
+            filters[field] = set(value.split(","))
+    if "user" in filters:
+        filters["user"] = {user_ref(u) if "@" in u else u for u in filters["user"]}
+    if args.get("contains"):
+        filters["contains"] = args["contains"]
+    return filters
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def access_denied():
+    """Error response for callers without the token; every caller is refused when no token is set."""
+    if not DEBUG_STREAM_TOKEN:
+        return jsonify({"error": "Debug endpoints are disabled: DEBUG_STREAM_TOKEN is not set"}), 403
+    supplied = request.headers.get("X-Debug-Token") or request.args.get("token") or ""
+    if not hmac.compare_digest(supplied.encode("utf-8"), DEBUG_STREAM_TOKEN.encode("utf-8")):
+        return jsonify({"error": "Unauthorized"}), 401
+    return None
+
+
+def require_debug_token(view):
+    """Same token check as the /debug endpoints below, for debug views an app defines itself."""
+
+    @functools.wraps(view)
+    def checked(*args, **kwargs):
+        return access_denied() or view(*args, **kwargs)
+
+    return checked
+
+
+def register_debug_routes(app, buffer):
+    """Attach per-request events and the /debug endpoints to a Flask app."""
+
+    @app.before_request
+    def start_debug_request():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def finish_debug_request(response):
+        if not request.path.startswith("/debug"):
+            buffer.emit(
+                "http.request",
+                level="error" if response.status_code >= 500 else "warning" if response.status_code >= 400 else "info",
+                request_id=getattr(g, "request_id", None),
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+                duration_ms=round((time.perf_counter() - getattr(g, "request_started", time.perf_counter())) * 1000, 1),
+            )
+        response.headers["X-Request-ID"] = getattr(g, "request_id", "")
+        return response
+
+    @app.route("/debug/status", methods=["GET"])
+    def debug_status():
+        denied = access_denied()
+        if denied:
+            return denied
+        return jsonify({"status": "ok", "buffered_events": len(buffer.events),
+                        "capacity": buffer.events.maxlen, "latest_id": buffer.latest_id()})
+
+    @app.route("/debug/events", methods=["GET"])
+    def debug_events():
+        denied = access_denied()
+        if denied:
+            return denied
+        since = request.args.get("since", type=int, default=0)
+        limit = request.args.get("limit", type=int, default=200)
+        return jsonify({"events": buffer.since(since, parse_filters(request.args), limit)})
+
+    @app.route("/debug/stream", methods=["GET"])
+    def debug_stream():
+        denied = access_denied()
+        if denied:
+            return denied
+        filters = parse_filters(request.args)
+        # Reconnecting EventSource clients send Last-Event-ID; without it, start from now
+        last_id = request.headers.get("Last-Event-ID", type=int)
+        if last_id is None:
+            last_id = request.args.get("since", type=int, default=buffer.latest_id())
+
+        def generate(last_id):
+            yield "retry: 3000\n\n"
+            while True:
+                if not buffer.wait(last_id, HEARTBEAT_SECONDS):
+                    yield ": keep-alive\n\n"
+                    continue
+                events = buffer.since(last_id)
+                if events:
+                    last_id = events[-1]["id"]
+                for event in events:
+                    if not filters or matches(event, filters):
+                        yield format_sse(event)
+
+        return Response(stream_with_context(generate(last_id)), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
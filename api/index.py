@@ -1,16 +1,55 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI
 import requests
 from bs4 import BeautifulSoup
 import logging
 import time
+import math
 import os
-from functools import lru_cache
+import sys
+import hashlib
+import sqlite3
+import json
+
+# Helper modules live next to this file
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from admission import AdmissionController, PRIORITY_ANONYMOUS, PRIORITY_ESCALATION, PRIORITY_USER
+from debug_events import DebugEventBuffer, preview, register_debug_routes, require_debug_token
+from deadline import DeadlineExceeded, current_deadline, register_deadlines, time_left
+from kb_artifact import load_knowledge_artifact
+from knowledge_data import EMBEDDED_KNOWLEDGE, VERIFIED_COMPANY_INFO
+from knowledge_store import KnowledgeStore
+from llm_scheduler import LLMBusy, LLMScheduler, estimate_tokens
+
+# Compiled by kb_compile.py; falls back to the literals in knowledge_data.py when missing
+KNOWLEDGE_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge.kb")
+KNOWLEDGE_ARTIFACT = load_knowledge_artifact(KNOWLEDGE_ARTIFACT_PATH)
+# Entries added through POST /knowledge. Only /tmp is writable on Vercel, and it is per instance
+# and wiped on cold start, so entries added there are not durable unless KNOWLEDGE_DB_PATH points
+# at persistent storage
+KNOWLEDGE_DB_PATH = os.environ.get("KNOWLEDGE_DB_PATH") or (
+    "/tmp/casi_knowledge.db" if os.environ.get("VERCEL") else
+    os.path.join(os.path.expanduser("~"), ".casi", "knowledge_store.db"))
+KNOWLEDGE_STORE_DURABLE = bool(os.environ.get("KNOWLEDGE_DB_PATH")) or not os.environ.get("VERCEL")
+knowledge_store = None
 
 app = Flask(__name__)
 CORS(app)
 
+# Structured per-request events for /debug/stream
+debug_buffer = DebugEventBuffer()
+register_debug_routes(app, debug_buffer)
+
+# g.deadline: the client's X-Request-Timeout-Ms (default 8 s) bounds every stage of a request
+register_deadlines(app)
+WEBSITE_TIMEOUT = 15
+GRAPH_TIMEOUT = 10
+LLM_TIMEOUT = 30
+# The optional website lookup needs this much time left, on top of LLM_RESERVE_SECONDS kept for the answer
+WEBSITE_MIN_SECONDS = 1.5
+LLM_RESERVE_SECONDS = 3.0
+
 # Get API key from environment variable for Vercel
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 
@@ -20,7 +59,9 @@ if GROQ_API_KEY:
     try:
         client = OpenAI(
             base_url="https://api.groq.com/openai/v1",
-            api_key=GROQ_API_KEY
+            api_key=GROQ_API_KEY,
+            # llm_scheduler retries 429s within the request deadline; client retries would overrun it
+            max_retries=0
         )
         logging.info("✅ Groq AI client initialized successfully")
     except Exception as e:
@@ -29,6 +70,18 @@ if GROQ_API_KEY:
 else:
     logging.warning("⚠️ GROQ_API_KEY not found - AI responses will be limited")
 
+# Every Groq call waits here for a slot and for room in the account's per-minute budgets.
+# The account is shared with the on-premise backend, so this deployment plans for
+# GROQ_BUDGET_SHARE of it; Vercel instances cannot see each other, so each one also lowers
+# its buckets to Groq's x-ratelimit-remaining-* counts after every call (settle)
+GROQ_BUDGET_SHARE = float(os.environ.get("GROQ_BUDGET_SHARE", "0.5"))
+llm_scheduler = LLMScheduler(
+    rpm=max(1, int(int(os.environ.get("GROQ_RPM", "30")) * GROQ_BUDGET_SHARE)),
+    tpm=max(1, int(int(os.environ.get("GROQ_TPM", "6000")) * GROQ_BUDGET_SHARE)),
+    max_limit=int(os.environ.get("GROQ_MAX_CONCURRENT", "8")),
+    max_wait=float(os.environ.get("GROQ_QUEUE_TIMEOUT", "3"))
+)
+
 # Define the website source
 WEBSITE_SOURCE = "https://www.travelpress.com/"
 
@@ -49,6 +102,41 @@ session.headers.update({
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 })
 
+# /chat and /it-on-duty share one admission queue so escalations can jump ahead of chat.
+# On Vercel each instance has its own controller, so this bounds one instance, not the deployment
+admission = AdmissionController(
+    max_concurrent=int(os.environ.get("CHAT_MAX_CONCURRENT", "6")),
+    max_queue=int(os.environ.get("CHAT_MAX_QUEUE", "8")),
+    # Shed well before the desktop client's 8 s timeout
+    queue_timeout=float(os.environ.get("CHAT_QUEUE_TIMEOUT", "4"))
+)
+
+# Verified access tokens (hashed) -> (email, expiry), so admission can trust a token without a Graph call
+TOKEN_EMAIL_TTL = 300
+token_email_cache = {}
+
+def token_cache_key(access_token):
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+def cached_email_for_token(access_token):
+    if not access_token:
+        return None
+    cached = token_email_cache.get(token_cache_key(access_token))
+    if cached and cached[1] > time.time():
+        return cached[0]
+    return None
+
+def admission_priority():
+    """Escalations from a verified Casto user first, then requests that carry a token
+    (still verified inside the view), then anonymous chat."""
+    data = request.get_json(silent=True) if request.is_json else None
+    access_token = data.get("access_token") if isinstance(data, dict) else None
+    if request.endpoint == "it_on_duty":
+        email = cached_email_for_token(access_token)
+        if email and is_castotravel_user(email):
+            return PRIORITY_ESCALATION
+    return PRIORITY_USER if access_token else PRIORITY_ANONYMOUS
+
 def make_links_clickable(text):
     """Convert URLs in text to clickable links."""
     import re
@@ -90,130 +178,35 @@ def make_links_clickable(text):
     
     return clickable_text
 
-@lru_cache(maxsize=100)
 def get_cached_knowledge():
-    """Enhanced knowledge base with IT support focus and executive context"""
-    try:
-        # IT Support focused knowledge base for CASI with verified company information
-        knowledge = [
-            "CASI stands for 'Casto Assistance & Support Intelligence'. CASI is your primary IT Support Assistant, designed to help with technical issues, IT requests, system problems, and general IT support. CASI combines AI technology with IT expertise to provide immediate technical assistance and guidance.",
-            "My name is CASI, which stands for 'Casto Assistance & Support Intelligence'. I am your dedicated IT Support Assistant at Casto Travel Philippines. I'm here to help you with technical issues, system problems, and IT support.",
-            "Maryles Casto is the Founder & Chairperson of Casto Travel Philippines with over 40 years of experience in the travel industry. She founded Casto Travel Philippines and previously sold Casto Travel to Flight Centre, one of the world's largest travel companies. She continues to own Casto Travel Philippines and provides knowledge, insight, and inspiration in client interactions, organizing exclusive journeys, and steering the company with her leadership and strategic vision. Maryles is known for her deep understanding of luxury travel, exclusive client relationships, and strategic vision that has positioned Casto Travel Philippines as a premier travel service provider.",
-            "Marc Casto is the CEO of Casto Travel Philippines (CTP) and its holding company MVC Solutions (MVC). As one of the founding members of both organizations, he was critical in their formation and early success. He is focused on strategy, execution, operations, and ensuring the company meets its financial, ethical, and social requirements while exceeding growth goals and investing in innovative solutions. Marc oversees all strategic decisions, operational excellence, and ensures the company maintains its position as a leading travel management company in the Philippines.",
-            "Alwin Benedicto is the Chief Financial Officer (CFO) of Casto Travel Philippines. A Certified Public Accountant with over 20 years of experience in Taxation, Financial Audits, Planning and Analysis, and Finance. Prior to joining Casto, he worked in leadership roles for different industries including BPO/KPO (Innodata, Inc), FinTech (C88 Financial Technologies, Ltd), and Supply Chain and Logistics (Ayala Corporation Logistics Group). He oversees Financial Reporting, Financial Planning and Operations, Taxation and Statutory Compliances. Alwin ensures financial stability and strategic financial planning for the company's growth and expansion.",
-            "Elaine Randrup is a key executive at Casto Travel Philippines, bringing extensive experience in travel industry operations and client relationship management. She plays a crucial role in maintaining high service standards and ensuring client satisfaction across all travel services. Elaine's expertise contributes to Casto Travel Philippines' reputation for excellence in customer service and operational efficiency.",
-            "George Anzures is the IT Director of Casto Travel Philippines with over 25 years of solid IT expertise and more than two decades of leadership excellence across diverse industries. Throughout his career, he has played a pivotal role in large multinational organizations in the Philippines. He previously served as Chief Technology Officer of Asiatrust Bank (later acquired by Asia United Bank) and held the position of Country Head of IT for Arvato Bertelsmann (Manila) and Publicis Resources Philippines. His leadership eventually expanded to a regional capacity, overseeing operations across five markets. He played a key role in establishing the IT backbone of several BPO startups in the Philippines, contributing to the successful launch of major contact centers such as Dell International Services, Genpact, and Arvato Bertelsmann. Beyond technical expertise, he is passionate about leadership development and considers his most significant accomplishment to be mentoring and coaching future technology leaders in the Philippines. At Casto Travel Philippines, George leads the IT department in providing comprehensive technology support and innovative solutions for all company operations.",
-            "Ma. Berdandina Galvez is the HR Director of Casto Travel Philippines. She is an experienced Senior Human Resources professional with a demonstrated history of working in various industries such as hospitality, health care, educational, food service and transportation. She is skilled in HR Consulting, Coaching, Team Building and HR Policies.",
-            "Casto Travel Philippines is the company where CASI provides IT support services. The company operates in the travel industry with various departments requiring IT assistance.",
-            "CASI's primary role is to provide immediate IT support, troubleshoot technical issues, assist with system access, help with software problems, guide users through IT processes, and escalate complex issues to the IT team when necessary."
-        ]
-        return knowledge
-    except Exception as e:
-        logging.error(f"Error loading knowledge: {str(e)}")
-        return []
+    """Knowledge entries, decoded once from the mmapped artifact when it is available"""
+    if KNOWLEDGE_ARTIFACT is not None:
+        return KNOWLEDGE_ARTIFACT.knowledge
+    return EMBEDDED_KNOWLEDGE
+
+def get_cached_knowledge_text():
+    """All knowledge entries as one prompt block; the artifact joins them once per kb_version"""
+    if KNOWLEDGE_ARTIFACT is not None:
+        return KNOWLEDGE_ARTIFACT.knowledge.join("\n")
+    return "\n".join(EMBEDDED_KNOWLEDGE)
+
+def get_knowledge_store():
+    """Open the knowledge store on first use; None (built-in knowledge only) if it cannot be opened."""
+    global knowledge_store
+    if knowledge_store is None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(KNOWLEDGE_DB_PATH)), exist_ok=True)
+            knowledge_store = KnowledgeStore(KNOWLEDGE_DB_PATH)
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Knowledge store unavailable at {KNOWLEDGE_DB_PATH}: {e}")
+            return None
+    return knowledge_store
 
 def get_verified_company_info():
     """Get verified, reliable company information about Casto Travel Philippines"""
-    try:
-        company_info = {
-            "company_name": "Casto Travel Philippines",
-            "industry": "Travel and Tourism",
-            "services": [
-                "Corporate Travel Management",
-                "Leisure Travel Services", 
-                "Travel Consultancy",
-                "Tour Packages",
-                "Airline Ticketing",
-                "Hotel Bookings",
-                "Visa Services",
-                "Travel Insurance"
-            ],
-            "executives": {
-                "founder_chairperson": {
-                    "name": "Maryles Casto",
-                    "title": "Founder & Chairperson",
-                    "expertise": "Travel Industry Leadership, Strategic Vision, Business Development",
-                    "experience": "40+ years in travel industry",
-                    "achievements": [
-                        "Founded Casto Travel Philippines",
-                        "Sold Casto Travel to Flight Centre (world's largest travel company)",
-                        "Continues to own and lead Casto Travel Philippines",
-                        "Provides knowledge, insight, and inspiration in client interactions and exclusive journeys"
-                    ]
-                },
-                "ceo": {
-                    "name": "Marc Casto",
-                    "title": "CEO",
-                    "expertise": "Strategy, Execution, Operations, Financial Management, Ethical Leadership",
-                    "experience": "Founding member of CTP and MVC",
-                    "achievements": [
-                        "CEO of Casto Travel Philippines (CTP)",
-                        "CEO of holding company MVC Solutions (MVC)",
-                        "Critical in formation and early success of both organizations",
-                        "Focused on exceeding growth goals and innovative solutions"
-                    ]
-                },
-                "cfo": {
-                    "name": "Alwin Benedicto",
-                    "title": "Chief Financial Officer",
-                    "expertise": "Taxation, Financial Audits, Planning and Analysis, Finance",
-                    "experience": "20+ years in finance",
-                    "previous_roles": [
-                        "Leadership roles in BPO/KPO (Innodata, Inc)",
-                        "FinTech (C88 Financial Technologies, Ltd)",
-                        "Supply Chain and Logistics (Ayala Corporation Logistics Group)"
-                    ],
-                    "responsibilities": [
-                        "Financial Reporting",
-                        "Financial Planning and Operations",
-                        "Taxation and Statutory Compliances"
-                    ]
-                },
-                "it_director": {
-                    "name": "George Anzures",
-                    "title": "IT Director",
-                    "expertise": "IT Infrastructure, IT Service Management, Project Management, Leadership Development",
-                    "experience": "25+ years in IT, 20+ years in leadership",
-                    "previous_roles": [
-                        "Chief Technology Officer - Asiatrust Bank (acquired by Asia United Bank)",
-                        "Country Head of IT - Arvato Bertelsmann (Manila)",
-                        "Country Head of IT - Publicis Resources Philippines"
-                    ],
-                    "achievements": [
-                        "Established IT backbone for major BPO startups",
-                        "Launched contact centers for Dell, Genpact, Arvato Bertelsmann",
-                        "Regional IT operations across 5 markets",
-                        "Mentored future technology leaders in Philippines"
-                    ]
-                }, 
-                "hr_director": {
-                    "name": "Ma. Berdandina Galvez",
-                    "title": "HR Director",
-                    "expertise": "HR Consulting, Coaching, Team Building, HR Policies",
-                    "experience": "Senior HR professional across multiple industries",
-                    "industries": ["Hospitality", "Healthcare", "Education", "Food Service", "Transportation"]
-                },
-                "operations_executive": {
-                    "name": "Elaine Randrup",
-                    "title": "Operations Executive",
-                    "expertise": "Travel Industry Operations, Client Relationship Management, Service Standards, Customer Satisfaction",
-                    "experience": "Extensive experience in travel industry operations",
-                    "responsibilities": [
-                        "Maintaining high service standards",
-                        "Ensuring client satisfaction",
-                        "Operational efficiency",
-                        "Client relationship management"
-                    ],
-                    "contributions": "Plays a crucial role in maintaining Casto Travel Philippines' reputation for excellence in customer service and operational efficiency"
-                }
-            },
-            "company_focus": "Providing comprehensive travel solutions with emphasis on corporate travel management and customer service excellence",
-            "it_department": "Led by George Anzures, providing comprehensive IT support for all company operations and systems"
-        }
-        return company_info
-    except Exception as e:
-        logging.error(f"Error loading verified company info: {str(e)}")
-        return {}
+    if KNOWLEDGE_ARTIFACT is not None:
+        return KNOWLEDGE_ARTIFACT.company_info
+    return VERIFIED_COMPANY_INFO
 
 def validate_executive_info(query, response):
     """Validate that executive information in responses matches knowledge base exactly"""
@@ -291,6 +284,7 @@ def search_knowledge(query, knowledge_entries=None):
         
         # Search in knowledge base
         if knowledge_entries:
+            # Matching is by substring ("tax" finds "Taxation"), so every entry is scanned
             for entry in knowledge_entries:
                 relevance_score = 0
                 entry_lower = entry.lower()
@@ -313,6 +307,17 @@ def search_knowledge(query, knowledge_entries=None):
                         "query": query,
                         "source": "Knowledge Base"
                     })
+            
+            # Entries added through POST /knowledge, already ranked by FTS5 bm25
+            store = get_knowledge_store()
+            if store is not None:
+                for rank, hit in enumerate(store.search(query, limit=5)):
+                    results.append({
+                        "content": hit["content"],
+                        "relevance": 9 - rank,
+                        "query": query,
+                        "source": "Knowledge Store"
+                    })
         
         # Search in verified company information
         verified_info = get_verified_company_info()
@@ -388,8 +393,11 @@ def fetch_website_data(url, query=None):
         if current_time - timestamp < CACHE_DURATION:
             return cached_data
     
+    timeout = WEBSITE_TIMEOUT
     try:
-        response = session.get(url, timeout=15)
+        # Optional lookup: whatever it takes, LLM_RESERVE_SECONDS stay for the answer
+        timeout = time_left(WEBSITE_TIMEOUT, "website", reserve=LLM_RESERVE_SECONDS)
+        response = session.get(url, timeout=timeout)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         
@@ -442,6 +450,9 @@ def fetch_website_data(url, query=None):
         website_cache[cache_key] = (result, current_time)
         return result
         
+    except DeadlineExceeded as e:
+        logging.info(f"Skipping website fetch from {url}: {str(e)}")
+        return None
     except Exception as e:
         logging.error(f"Error fetching website data from {url}: {str(e)}")
         # Return verified company info as fallback
@@ -452,7 +463,9 @@ def fetch_website_data(url, query=None):
         else:
             fallback_result = f"Website temporarily unavailable. Please try again later."
         
-        website_cache[cache_key] = (fallback_result, current_time)
+        # A timeout cut short by the request deadline says nothing about the site, so it is not cached
+        if not (isinstance(e, requests.exceptions.Timeout) and timeout < WEBSITE_TIMEOUT):
+            website_cache[cache_key] = (fallback_result, current_time)
         return fallback_result
 
 def search_web(query):
@@ -460,13 +473,28 @@ def search_web(query):
     return ["Web search is disabled for testing."]
 
 def get_user_email_from_token(access_token):
+    email = cached_email_for_token(access_token)
+    if email:
+        return email
+    # Out of time is not an invalid token: DeadlineExceeded goes to the caller instead of None
+    timeout = time_left(GRAPH_TIMEOUT, "graph")
     try:
         headers = {"Authorization": f"Bearer {access_token}"}
-        user_response = session.get("https://graph.microsoft.com/v1.0/me", headers=headers, timeout=10)
+        user_response = session.get("https://graph.microsoft.com/v1.0/me", headers=headers, timeout=timeout)
         if user_response.status_code == 200:
             user_json = user_response.json()
             email = user_json.get("mail") or user_json.get("userPrincipalName") or ""
+            if email:
+                if len(token_email_cache) > 1000:
+                    now = time.time()
+                    for key in [k for k, (_, expires) in token_email_cache.items() if expires <= now]:
+                        token_email_cache.pop(key, None)
+                token_email_cache[token_cache_key(access_token)] = (email, time.time() + TOKEN_EMAIL_TTL)
             return email
+    except requests.exceptions.Timeout as e:
+        if timeout < GRAPH_TIMEOUT:
+            # Graph was only given what was left of the request's deadline
+            raise DeadlineExceeded("graph", current_deadline().remaining()) from e
     except Exception as e:
         pass
     return None
@@ -476,7 +504,7 @@ def is_castotravel_user(email):
 
 @app.route('/knowledge', methods=['POST'])
 def add_knowledge():
-    """Add knowledge base entry - simplified for Vercel"""
+    """Add a knowledge base entry to the persistent store"""
     try:
         access_token = request.json.get("access_token")
         content = request.json.get("content")
@@ -491,18 +519,28 @@ def add_knowledge():
         if not content:
             return jsonify({"error": "No content provided"}), 400
         
-        # For Vercel, we'll just acknowledge the request
-        logging.info(f"Knowledge addition requested by {email}: {content}")
+        store = get_knowledge_store()
+        if store is None:
+            return jsonify({"error": "Knowledge store unavailable"}), 503
+        entry = store.add(content, email)
+        logging.info(f"Knowledge entry {entry['id']} added by {email}")
         
-        return jsonify({"success": True, "message": "Knowledge addition acknowledged (Vercel mode)"})
+        result = {"success": True, "entry": entry, "durable": KNOWLEDGE_STORE_DURABLE}
+        if not KNOWLEDGE_STORE_DURABLE:
+            result["warning"] = ("Saved on this serverless instance only: the entry is lost on its next cold "
+                                 "start and other instances do not see it. Add permanent knowledge on the "
+                                 "on-premise server or in knowledge_base.json.")
+        return jsonify(result)
         
+    except DeadlineExceeded:
+        raise  # answered 503 with Retry-After by the deadline error handler
     except Exception as e:
         logging.error(f"Error in add_knowledge: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/knowledge', methods=['GET'])
 def get_knowledge():
-    """Get knowledge base entries - simplified for Vercel"""
+    """Get stored knowledge entries (newest first) followed by the built-in knowledge"""
     try:
         access_token = request.args.get("access_token")
         
@@ -513,10 +551,14 @@ def get_knowledge():
         if not email or not is_castotravel_user(email):
             return jsonify({"error": "Unauthorized: Only castotravel.ph users allowed"}), 403
         
-        # Return cached knowledge for Vercel
-        knowledge_entries = get_cached_knowledge()
-        return jsonify([{"id": i, "timestamp": time.time(), "content": entry} for i, entry in enumerate(knowledge_entries)])
+        store = get_knowledge_store()
+        entries = [dict(entry, source="store") for entry in store.entries()] if store is not None else []
+        entries += [{"id": None, "timestamp": None, "content": entry, "source": "built-in"}
+                    for entry in get_cached_knowledge()]
+        return jsonify(entries)
         
+    except DeadlineExceeded:
+        raise  # answered 503 with Retry-After by the deadline error handler
     except Exception as e:
         logging.error(f"Error in get_knowledge: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -556,7 +598,93 @@ def search_knowledge_endpoint():
         logging.error(f"Error in knowledge search: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+def ask_llm(system_prompt, user_input, user_id):
+    """Get a completion from Groq and record its latency in the debug buffer."""
+    logging.info("Fetching response from the chatbot.")
+    started = time.perf_counter()
+    tokens = estimate_tokens(system_prompt, user_input)
+    try:
+        # The raw response carries Groq's x-ratelimit-* headers, which keep the scheduler's budgets honest
+        raw = llm_scheduler.call(lambda: client.chat.completions.with_raw_response.create(
+            model="llama-3.1-8b-instant",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input}
+            ],
+            temperature=0.7,
+            timeout=time_left(LLM_TIMEOUT, "llm")
+        ), tokens, key=user_id, max_wait=time_left(llm_scheduler.max_wait, "llm"))
+    except APITimeoutError as e:
+        # The call was given only what was left of the request's deadline
+        raise DeadlineExceeded("llm", g.deadline.remaining()) from e
+    response = raw.parse()
+    usage = getattr(response, "usage", None)
+    llm_scheduler.settle(tokens, usage.total_tokens if usage else None, raw.headers)
+    debug_buffer.emit("chat.llm", request_id=g.request_id, user=user_id, model="llama-3.1-8b-instant",
+                      duration_ms=round((time.perf_counter() - started) * 1000, 1))
+    logging.info("Answer fetched from the chatbot.")
+    return response.choices[0].message.content
+
+def answer_within_deadline(system_prompt, user_input, user_id, knowledge_results):
+    """ask_llm, or the best answer available without it when the request deadline runs out
+    or Groq is at its rate limit.
+
+    Returns (message, partial). A partial answer is the closest knowledge base match,
+    else (deadline only) a pointer to IT On Duty, so the client gets something before it
+    gives up. LLMBusy with no knowledge match is re-raised for a 503 with Retry-After."""
+    try:
+        return ask_llm(system_prompt, user_input, user_id), False
+    except DeadlineExceeded as e:
+        logging.warning(f"Answering without the LLM: {str(e)}")
+        debug_buffer.emit("chat.deadline", level="warning", request_id=g.request_id, user=user_id,
+                          stage=e.stage, remaining_ms=round(e.remaining * 1000))
+    except LLMBusy as e:
+        if not knowledge_results:
+            raise
+        logging.warning(f"Answering without the LLM: {str(e)}")
+        # The chat route passes this on as Retry-After, so the client knows when a full answer is likely
+        g.llm_retry_after = math.ceil(e.retry_after)
+        debug_buffer.emit("chat.busy", level="warning", request_id=g.request_id, user=user_id,
+                          retry_after=g.llm_retry_after)
+    if knowledge_results:
+        return ("I'm taking longer than usual to put together a full answer, so here is the closest match "
+                f"from our knowledge base: ⏱️\n\n{knowledge_results[0]['content']}"), True
+    return ("Sorry, I couldn't finish my answer in time! ⏱️ Please try again in a moment, or use "
+            "'Message IT On Duty' if this is urgent. 💻"), True
+
+def compute_kb_version():
+    """Fingerprint of everything cached answers depend on: knowledge, verified info and this module's canned replies."""
+    digest = hashlib.sha256()
+    if KNOWLEDGE_ARTIFACT is not None:
+        digest.update(KNOWLEDGE_ARTIFACT.kb_version.encode("utf-8"))
+    else:
+        digest.update(json.dumps(EMBEDDED_KNOWLEDGE, ensure_ascii=False).encode("utf-8"))
+        digest.update(json.dumps(VERIFIED_COMPANY_INFO, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+KB_VERSION = compute_kb_version()
+
+def current_kb_version():
+    """KB_VERSION, extended with the knowledge store's fingerprint once entries have been added."""
+    store = get_knowledge_store()
+    fingerprint = store.fingerprint() if store is not None else (0,)
+    if not fingerprint[0]:
+        return KB_VERSION
+    return hashlib.sha256(f"{KB_VERSION}|{fingerprint}".encode("utf-8")).hexdigest()[:16]
+
+@app.route("/kb-version", methods=["GET"])
+def kb_version():
+    """Cheap revalidation for client answer caches: 304 when If-None-Match matches."""
+    version = current_kb_version()
+    response = jsonify({"kb_version": version})
+    response.set_etag(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
 @app.route("/chat", methods=["POST"])
+@admission.guard(admission_priority)
 def chat():
     """Chat with the AI bot - allows anonymous users"""
     try:
@@ -579,6 +707,8 @@ def chat():
                 is_authenticated = True
                 user_id = email
                 logging.info(f"Authenticated user: {email}")
+        debug_buffer.emit("chat.received", request_id=g.request_id, user=user_id,
+                          authenticated=is_authenticated, message=preview(user_input))
         
         # Get conversation context for continuity
         conversation_context = get_conversation_context(user_id)
@@ -590,9 +720,11 @@ def chat():
         
         # Enhanced knowledge search for all users (anonymous and authenticated)
         knowledge_search_results = search_knowledge(user_input, knowledge_entries)
+        debug_buffer.emit("chat.knowledge", request_id=g.request_id, user=user_id,
+                          entries=len(knowledge_entries), matches=len(knowledge_search_results))
         
         # Combine knowledge into a single string
-        knowledge_context = "\n".join(knowledge_entries) if knowledge_entries else ""
+        knowledge_context = get_cached_knowledge_text() if knowledge_entries else ""
         
         # Add search results to context if available
         if knowledge_search_results:
@@ -619,10 +751,22 @@ def chat():
         # Only fetch website data for specific company information queries, not for executive queries
         if (any(keyword.lower() in user_input.lower() for keyword in website_keywords) and 
             not any(exec_name.lower() in user_input.lower() for exec_name in ["maryles", "marc", "alwin", "george", "berdandina", "elaine"])):
-            logging.info(f"Checking website for company information query: {user_input}")
-            website_data = fetch_website_data("https://www.casto.com.ph/", query=user_input)
+            # Optional stage: skipped when the deadline cannot fit it and still leave time for the answer
+            if g.deadline.allows(WEBSITE_MIN_SECONDS + LLM_RESERVE_SECONDS):
+                logging.info(f"Checking website for company information query: {user_input}")
+                website_started = time.perf_counter()
+                website_data = fetch_website_data("https://www.casto.com.ph/", query=user_input)
+                debug_buffer.emit("chat.website", request_id=g.request_id, user=user_id,
+                                  found=bool(website_data),
+                                  duration_ms=round((time.perf_counter() - website_started) * 1000, 1))
+            else:
+                debug_buffer.emit("chat.website", request_id=g.request_id, user=user_id, skipped=True,
+                                  remaining_ms=round(g.deadline.remaining() * 1000))
 
         # Step 3: Get a response from the chatbot
+        answer_from_llm = False
+        partial = False
+        cacheable = True
         # Check if this is an executive query that should use fallback responses
         user_input_lower = user_input.lower()
         executive_keywords = ["maryles casto", "marc casto", "alwin benedicto", "george anzures", "berdandina galvez", "elaine randrup", "elaine"]
@@ -646,17 +790,9 @@ def chat():
             else:
                 # Fallback to AI if no specific executive match
                 if client:
-                    logging.info("Fetching response from the chatbot.")
-                    response = client.chat.completions.create(
-                        model="llama-3.1-8b-instant",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_input}
-                        ],
-                        temperature=0.7
-                    )
-                    chatbot_message = response.choices[0].message.content
-                    logging.info("Answer fetched from the chatbot.")
+                    chatbot_message, partial = answer_within_deadline(system_prompt, user_input, user_id,
+                                                                      knowledge_search_results)
+                    answer_from_llm = not partial
                 else:
                     chatbot_message = "I'm CASI, your IT Support Assistant! I'm ready to help you with any technical issues, system problems, or IT support you need. What can I assist you with today? 💻"
         else:
@@ -672,17 +808,9 @@ def chat():
                 chatbot_message = "I can help you with Sabre-related questions! 🚀 If you're asking about the PCC, it's AAAPCC. For company name display, use N*STARNAME. What specific Sabre assistance do you need today? 💻✨"
             # Non-executive queries use AI or fallback
             elif client:
-                logging.info("Fetching response from the chatbot.")
-                response = client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_input}
-                    ],
-                    temperature=0.7
-                )
-                chatbot_message = response.choices[0].message.content
-                logging.info("Answer fetched from the chatbot.")
+                chatbot_message, partial = answer_within_deadline(system_prompt, user_input, user_id,
+                                                                  knowledge_search_results)
+                answer_from_llm = not partial
             else:
                 # Fallback responses when AI client is not available
                 user_input_lower = user_input.lower()
@@ -739,6 +867,7 @@ def chat():
                 # Check if the website data is actually relevant to the user's query
                 if any(query_word in website_data.lower() for query_word in user_input.lower().split() if len(query_word) > 3):
                     combined_response += f"\n\nAdditional Information from Website:\n{website_data}"
+                    cacheable = False
                 else:
                     # Website data exists but not relevant to this specific query
                     logging.info("Website data available but not relevant to user query - skipping")
@@ -752,11 +881,32 @@ def chat():
         # Update conversation context for continuity
         current_context = f"User Query: {user_input}\nCASI Response: {combined_response}"
         update_conversation_context(user_id, current_context)
+        debug_buffer.emit("chat.response", request_id=g.request_id, user=user_id,
+                          chars=len(combined_response), response=preview(combined_response),
+                          duration_ms=round((time.perf_counter() - g.request_started) * 1000, 1))
         
-        return jsonify({"response": combined_response})
+        # Clients may cache answers that do not depend on earlier turns or live website data
+        cacheable = cacheable and not partial and not (answer_from_llm and conversation_context)
+        version = current_kb_version()
+        response = jsonify({"response": combined_response, "kb_version": version, "cacheable": cacheable,
+                            "partial": partial})
+        response.headers["X-KB-Version"] = version
+        if partial and g.get("llm_retry_after"):
+            response.headers["Retry-After"] = str(g.llm_retry_after)
+        return response
 
+    except LLMBusy as e:
+        # Groq is at its rate limit and there is no knowledge base match to offer instead
+        logging.warning(f"Chat deferred: {str(e)}")
+        debug_buffer.emit("chat.error", level="warning", request_id=g.request_id, error=str(e))
+        retry_after = math.ceil(e.retry_after)
+        return jsonify({"error": "The AI service is busy, please try again shortly",
+                        "retry_after": retry_after}), 503, {"Retry-After": str(retry_after)}
+    except DeadlineExceeded:
+        raise  # answered 503 with Retry-After by the deadline error handler
     except Exception as e:
         logging.error(f"Error during chatbot response: {str(e)}")
+        debug_buffer.emit("chat.error", level="error", request_id=g.request_id, error=str(e))
         return jsonify({"error": str(e)}), 500
 
 @app.route("/company-info", methods=["GET"])
@@ -832,6 +982,7 @@ def escalation_guide():
     })
 
 @app.route("/it-on-duty", methods=["POST"])
+@admission.guard(admission_priority)
 def it_on_duty():
     """Endpoint for IT on Duty messages - requires authentication"""
     try:
@@ -858,10 +1009,24 @@ def it_on_duty():
             "message": "IT support request received successfully",
             "user_email": email
         })
+    except DeadlineExceeded:
+        raise  # answered 503 with Retry-After by the deadline error handler
     except Exception as e:
         logging.error(f"Error in IT on Duty endpoint: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/debug/llm", methods=["GET"])
+@require_debug_token
+def debug_llm():
+    """Outbound Groq scheduler: adaptive concurrency limit, queue depth and remaining budgets"""
+    return jsonify(llm_scheduler.stats())
+
+@app.route("/debug/admission", methods=["GET"])
+@require_debug_token
+def debug_admission():
+    """Concurrency, queue depth, queue wait and shed counts for /chat and /it-on-duty"""
+    return jsonify(admission.stats())
+
 @app.route("/", methods=["GET"])
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,200 @@
+# Read-only, memory-mapped knowledge-base artifact built by kb_compile.py
+#
+# Layout (all integers little-endian u32 unless noted):
+#   header    MAGIC (8 bytes), FORMAT_VERSION, section count
+#   directory per section: name (8 bytes), offset (u64), length (u64)
+#   STRINGS   count, count + 1 byte offsets into the blob, UTF-8 blob
+#   DOCS      knowledge count, QA count, then one string id per document
+#             (embedded knowledge first, then "Question: ...\nAnswer: ..." entries)
+#   META      JSON: kb_version, source hashes, build time, verified company info
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"CASIKB\x00\x01"
+# Version 2 dropped the TERMS/POSTINGS token index: search matches substrings, which it cannot serve
+FORMAT_VERSION = 2
+SECTION_NAMES = (b"STRINGS\x00", b"DOCS\x00\x00\x00\x00", b"META\x00\x00\x00\x00")
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<8sQQ")
+
+
+def format_qa(question, answer):
+    return f"Question: {question}\nAnswer: {answer}"
+
+
+class KnowledgeArtifactError(Exception):
+    pass
+
+
+def _u32(values):
+    packed = array("I", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def write_artifact(path, knowledge, qa_pairs, company_info, metadata=None):
+    """Compile knowledge strings, QA pairs and company info into ``path`` (written atomically)."""
+    documents = list(knowledge) + [format_qa(q, a) for q, a in qa_pairs]
+    blob = bytearray()
+    offsets = [0]
+    for text in documents:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    string_section = _u32([len(documents)]) + _u32(offsets) + bytes(blob)
+
+    doc_section = _u32([len(knowledge), len(qa_pairs)]) + _u32(range(len(documents)))
+
+    meta = dict(metadata or {})
+    meta.update({"documents": len(documents), "company_info": company_info})
+    meta_section = json.dumps(meta, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+    sections = [string_section, doc_section, meta_section]
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    directory = b""
+    body = b""
+    for name, data in zip(SECTION_NAMES, sections):
+        # Keep every section 4-byte aligned so u32 arrays can be cast in place
+        padding = (-offset) % 4
+        body += b"\x00" * padding
+        offset += padding
+        directory += _SECTION.pack(name, offset, len(data))
+        body += data
+        offset += len(data)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)) + directory + body)
+    os.replace(tmp_path, path)
+    return meta
+
+
+class StringList:
+    """Read-only sequence of artifact strings. They are decoded from the mapping once, on
+    first use, and kept for the life of the artifact (one artifact per kb_version)."""
+
+    def __init__(self, artifact, ids):
+        self._artifact = artifact
+        self._ids = ids
+        self._strings = None
+        self._joined = {}
+
+    def _decoded(self):
+        if self._strings is None:
+            self._strings = tuple(self._artifact.string(i) for i in self._ids)
+        return self._strings
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._decoded()[index])
+        return self._decoded()[index]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def join(self, separator):
+        """``separator.join(self)``, built once per separator."""
+        if separator not in self._joined:
+            self._joined[separator] = separator.join(self._decoded())
+        return self._joined[separator]
+
+
+class KnowledgeArtifact:
+    """Opens the artifact with mmap. Only the header is parsed up front; strings and
+    metadata are read from the mapping when first used."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        sections = {}
+        try:
+            magic, version, count = _HEADER.unpack_from(self._view, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise KnowledgeArtifactError(f"{path} is not a version {FORMAT_VERSION} knowledge artifact")
+            for i in range(count):
+                name, offset, length = _SECTION.unpack_from(self._view, _HEADER.size + i * _SECTION.size)
+                if offset + length > len(self._view):
+                    raise KnowledgeArtifactError(f"{path} is truncated")
+                sections[name] = self._view[offset:offset + length]
+            missing = [name for name in SECTION_NAMES if name not in sections]
+            if missing:
+                raise KnowledgeArtifactError(f"{path} is missing sections {missing}")
+        except (struct.error, KnowledgeArtifactError) as e:
+            for view in sections.values():
+                view.release()
+            self.close()
+            raise KnowledgeArtifactError(f"Cannot read knowledge artifact: {e}")
+
+        strings = sections[SECTION_NAMES[0]]
+        string_count = self._u32_view(strings[:4])[0]
+        self._string_offsets = self._u32_view(strings[4:8 + 4 * string_count])
+        self._blob = strings[8 + 4 * string_count:]
+
+        docs = sections[SECTION_NAMES[1]]
+        knowledge_count, qa_count = self._u32_view(docs[:8])
+        doc_ids = self._u32_view(docs[8:])
+        self.knowledge = StringList(self, doc_ids[:knowledge_count])
+        self.qa_documents = StringList(self, doc_ids[knowledge_count:knowledge_count + qa_count])
+        self.documents = StringList(self, doc_ids)
+        self._meta_bytes = sections[SECTION_NAMES[2]]
+        self._metadata = None
+
+    @staticmethod
+    def _u32_view(data):
+        if sys.byteorder == "little":
+            return data.cast("I")
+        swapped = array("I", bytes(data))
+        swapped.byteswap()
+        return memoryview(swapped)
+
+    def _string_bytes(self, string_id):
+        return self._blob[self._string_offsets[string_id]:self._string_offsets[string_id + 1]]
+
+    def string(self, string_id):
+        return str(self._string_bytes(string_id), "utf-8")
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._metadata = json.loads(str(self._meta_bytes, "utf-8"))
+        return self._metadata
+
+    @property
+    def company_info(self):
+        return self.metadata["company_info"]
+
+    @property
+    def kb_version(self):
+        return self.metadata.get("kb_version")
+
+    def close(self):
+        for name in ("_string_offsets", "_blob", "_meta_bytes"):
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if getattr(self, "knowledge", None) is not None:
+            for seq in (self.knowledge, self.qa_documents, self.documents):
+                if isinstance(seq._ids, memoryview):
+                    seq._ids.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def load_knowledge_artifact(path):
+    """Open the artifact, or return None when it is missing or unreadable so callers can fall back."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return KnowledgeArtifact(path)
+    except (OSError, ValueError, KnowledgeArtifactError) as e:
+        print(f"⚠️ Ignoring knowledge artifact {path}: {e}")
+        return None
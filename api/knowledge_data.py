@@ -0,0 +1,113 @@
+# Source data for the knowledge-base artifact (see kb_compile.py)
+# Edit here or in knowledge_base.json, then rebuild api/knowledge.kb
+
+# Knowledge the Vercel backend puts into the system prompt
+EMBEDDED_KNOWLEDGE = [
+    "CASI stands for 'Casto Assistance & Support Intelligence'. CASI is your primary IT Support Assistant, designed to help with technical issues, IT requests, system problems, and general IT support. CASI combines AI technology with IT expertise to provide immediate technical assistance and guidance.",
+    "My name is CASI, which stands for 'Casto Assistance & Support Intelligence'. I am your dedicated IT Support Assistant at Casto Travel Philippines. I'm here to help you with technical issues, system problems, and IT support.",
+    "Maryles Casto is the Founder & Chairperson of Casto Travel Philippines with over 40 years of experience in the travel industry. She founded Casto Travel Philippines and previously sold Casto Travel to Flight Centre, one of the world's largest travel companies. She continues to own Casto Travel Philippines and provides knowledge, insight, and inspiration in client interactions, organizing exclusive journeys, and steering the company with her leadership and strategic vision. Maryles is known for her deep understanding of luxury travel, exclusive client relationships, and strategic vision that has positioned Casto Travel Philippines as a premier travel service provider.",
+    "Marc Casto is the CEO of Casto Travel Philippines (CTP) and its holding company MVC Solutions (MVC). As one of the founding members of both organizations, he was critical in their formation and early success. He is focused on strategy, execution, operations, and ensuring the company meets its financial, ethical, and social requirements while exceeding growth goals and investing in innovative solutions. Marc oversees all strategic decisions, operational excellence, and ensures the company maintains its position as a leading travel management company in the Philippines.",
+    "Alwin Benedicto is the Chief Financial Officer (CFO) of Casto Travel Philippines. A Certified Public Accountant with over 20 years of experience in Taxation, Financial Audits, Planning and Analysis, and Finance. Prior to joining Casto, he worked in leadership roles for different industries including BPO/KPO (Innodata, Inc), FinTech (C88 Financial Technologies, Ltd), and Supply Chain and Logistics (Ayala Corporation Logistics Group). He oversees Financial Reporting, Financial Planning and Operations, Taxation and Statutory Compliances. Alwin ensures financial stability and strategic financial planning for the company's growth and expansion.",
+    "Elaine Randrup is a key executive at Casto Travel Philippines, bringing extensive experience in travel industry operations and client relationship management. She plays a crucial role in maintaining high service standards and ensuring client satisfaction across all travel services. Elaine's expertise contributes to Casto Travel Philippines' reputation for excellence in customer service and operational efficiency.",
+    "George Anzures is the IT Director of Casto Travel Philippines with over 25 years of solid IT expertise and more than two decades of leadership excellence across diverse industries. Throughout his career, he has played a pivotal role in large multinational organizations in the Philippines. He previously served as Chief Technology Officer of Asiatrust Bank (later acquired by Asia United Bank) and held the position of Country Head of IT for Arvato Bertelsmann (Manila) and Publicis Resources Philippines. His leadership eventually expanded to a regional capacity, overseeing operations across five markets. He played a key role in establishing the IT backbone of several BPO startups in the Philippines, contributing to the successful launch of major contact centers such as Dell International Services, Genpact, and Arvato Bertelsmann. Beyond technical expertise, he is passionate about leadership development and considers his most significant accomplishment to be mentoring and coaching future technology leaders in the Philippines. At Casto Travel Philippines, George leads the IT department in providing comprehensive technology support and innovative solutions for all company operations.",
+    "Ma. Berdandina Galvez is the HR Director of Casto Travel Philippines. She is an experienced Senior Human Resources professional with a demonstrated history of working in various industries such as hospitality, health care, educational, food service and transportation. She is skilled in HR Consulting, Coaching, Team Building and HR Policies.",
+    "Casto Travel Philippines is the company where CASI provides IT support services. The company operates in the travel industry with various departments requiring IT assistance.",
+    "CASI's primary role is to provide immediate IT support, troubleshoot technical issues, assist with system access, help with software problems, guide users through IT processes, and escalate complex issues to the IT team when necessary."
+]
+
+# Verified company and executive information
+VERIFIED_COMPANY_INFO = {
+    "company_name": "Casto Travel Philippines",
+    "industry": "Travel and Tourism",
+    "services": [
+        "Corporate Travel Management",
+        "Leisure Travel Services", 
+        "Travel Consultancy",
+        "Tour Packages",
+        "Airline Ticketing",
+        "Hotel Bookings",
+        "Visa Services",
+        "Travel Insurance"
+    ],
+    "executives": {
+        "founder_chairperson": {
+            "name": "Maryles Casto",
+            "title": "Founder & Chairperson",
+            "expertise": "Travel Industry Leadership, Strategic Vision, Business Development",
+            "experience": "40+ years in travel industry",
+            "achievements": [
+                "Founded Casto Travel Philippines",
+                "Sold Casto Travel to Flight Centre (world's largest travel company)",
+                "Continues to own and lead Casto Travel Philippines",
+                "Provides knowledge, insight, and inspiration in client interactions and exclusive journeys"
+            ]
+        },
+        "ceo": {
+            "name": "Marc Casto",
+            "title": "CEO",
+            "expertise": "Strategy, Execution, Operations, Financial Management, Ethical Leadership",
+            "experience": "Founding member of CTP and MVC",
+            "achievements": [
+                "CEO of Casto Travel Philippines (CTP)",
+                "CEO of holding company MVC Solutions (MVC)",
+                "Critical in formation and early success of both organizations",
+                "Focused on exceeding growth goals and innovative solutions"
+            ]
+        },
+        "cfo": {
+            "name": "Alwin Benedicto",
+            "title": "Chief Financial Officer",
+            "expertise": "Taxation, Financial Audits, Planning and Analysis, Finance",
+            "experience": "20+ years in finance",
+            "previous_roles": [
+                "Leadership roles in BPO/KPO (Innodata, Inc)",
+                "FinTech (C88 Financial Technologies, Ltd)",
+                "Supply Chain and Logistics (Ayala Corporation Logistics Group)"
+            ],
+            "responsibilities": [
+                "Financial Reporting",
+                "Financial Planning and Operations",
+                "Taxation and Statutory Compliances"
+            ]
+        },
+        "it_director": {
+            "name": "George Anzures",
+            "title": "IT Director",
+            "expertise": "IT Infrastructure, IT Service Management, Project Management, Leadership Development",
+            "experience": "25+ years in IT, 20+ years in leadership",
+            "previous_roles": [
+                "Chief Technology Officer - Asiatrust Bank (acquired by Asia United Bank)",
+                "Country Head of IT - Arvato Bertelsmann (Manila)",
+                "Country Head of IT - Publicis Resources Philippines"
+            ],
+            "achievements": [
+                "Established IT backbone for major BPO startups",
+                "Launched contact centers for Dell, Genpact, Arvato Bertelsmann",
+                "Regional IT operations across 5 markets",
+                "Mentored future technology leaders in Philippines"
+            ]
+        }, 
+        "hr_director": {
+            "name": "Ma. Berdandina Galvez",
+            "title": "HR Director",
+            "expertise": "HR Consulting, Coaching, Team Building, HR Policies",
+            "experience": "Senior HR professional across multiple industries",
+            "industries": ["Hospitality", "Healthcare", "Education", "Food Service", "Transportation"]
+        },
+        "operations_executive": {
+            "name": "Elaine Randrup",
+            "title": "Operations Executive",
+            "expertise": "Travel Industry Operations, Client Relationship Management, Service Standards, Customer Satisfaction",
+            "experience": "Extensive experience in travel industry operations",
+            "responsibilities": [
+                "Maintaining high service standards",
+                "Ensuring client satisfaction",
+                "Operational efficiency",
+                "Client relationship management"
+            ],
+            "contributions": "Plays a crucial role in maintaining Casto Travel Philippines' reputation for excellence in customer service and operational efficiency"
+        }
+    },
+    "company_focus": "Providing comprehensive travel solutions with emphasis on corporate travel management and customer service excellence",
+    "it_department": "Led by George Anzures, providing comprehensive IT support for all company operations and systems"
+}
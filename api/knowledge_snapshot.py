@@ -0,0 +1,137 @@
+# Versioned knowledge snapshots, rebuilt in the background and swapped in atomically
+import hashlib
+import logging
+import os
+import threading
+import time
+
+KNOWLEDGE_POLL_SECONDS = float(os.environ.get("KNOWLEDGE_POLL_SECONDS", "2"))
+
+
+def file_fingerprint(*paths):
+    """(path, mtime_ns, size) per source file; None for files that do not exist."""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            fingerprint.append((path, None))
+            continue
+        fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class KnowledgeSnapshot:
+    """One immutable build of the knowledge entries. A request reads ``current()``
+    once and keeps using that snapshot even if a newer one is swapped in meanwhile."""
+
+    def __init__(self, version, entries, fingerprint=None):
+        self.version = version
+        self.entries = tuple(entries)
+        self.fingerprint = fingerprint
+        self.built_at = time.time()
+        digest = hashlib.sha256()
+        for entry in self.entries:
+            digest.update(entry.encode("utf-8"))
+            digest.update(b"\x00")
+        # Content hash: stable across restarts, unlike the version counter
+        self.kb_version = digest.hexdigest()[:16]
+
+    def to_dict(self):
+        return {"version": self.version, "kb_version": self.kb_version, "entries": len(self.entries),
+                "built_at": self.built_at}
+
+
+class KnowledgeSnapshotManager:
+    """Holds the live snapshot and rebuilds it when ``fingerprint()`` changes.
+
+    ``build()`` returns the entry list and runs on the watcher thread (or the
+    caller of ``refresh``), never on a request. Swapping is a single reference
+    assignment, so readers take no lock. ``on_swap`` listeners get each new
+    snapshot so dependent caches can drop entries made under older versions.
+    """
+
+    def __init__(self, build, fingerprint, poll_interval=KNOWLEDGE_POLL_SECONDS, on_swap=None):
+        self.build = build
+        self.fingerprint = fingerprint
+        self.poll_interval = poll_interval
+        self.listeners = [on_swap] if on_swap else []
+        self.builds = 0
+        self.failures = 0
+        self.last_error = None
+        self._snapshot = KnowledgeSnapshot(0, ())
+        self._failed_fingerprint = None
+        self._build_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def current(self):
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def refresh(self, force=False):
+        """Rebuild if the sources changed (or ``force``); True when a new snapshot was swapped in.
+        A failed build keeps the old snapshot and is not retried until the sources change again."""
+        with self._build_lock:
+            current = self._snapshot
+            fingerprint = None
+            try:
+                fingerprint = self.fingerprint()
+                if not force and fingerprint in (current.fingerprint, self._failed_fingerprint):
+                    return False
+                started = time.perf_counter()
+                entries = self.build()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                self._failed_fingerprint = fingerprint
+                logging.error(f"Knowledge rebuild failed, keeping version {current.version}: {e}")
+                return False
+            snapshot = KnowledgeSnapshot(current.version + 1, entries, fingerprint)
+            self._snapshot = snapshot
+            self._failed_fingerprint = None
+            self.builds += 1
+        logging.info(f"Knowledge snapshot v{snapshot.version} ({len(snapshot.entries)} entries, "
+                     f"kb_version {snapshot.kb_version}) built in {time.perf_counter() - started:.3f}s")
+        for listener in list(self.listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logging.error(f"Knowledge snapshot listener failed: {e}")
+        return True
+
+    def request_reload(self):
+        """Wake the watcher now instead of at the next poll; returns without waiting for the build."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="knowledge-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self.refresh()
+
+    def stats(self):
+        stats = self._snapshot.to_dict()
+        stats.update({"builds": self.builds, "failures": self.failures, "last_error": self.last_error,
+                      "watching": self._thread is not None and self._thread.is_alive()})
+        return stats
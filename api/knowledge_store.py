@@ -0,0 +1,112 @@
+# Knowledge entries added through POST /knowledge: SQLite in WAL mode with an FTS5 index
+import re
+from datetime import datetime
+
+from sqlite_pool import SQLitePool
+
+# Same columns as the on-prem knowledge table, so existing databases open unchanged
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    timestamp TEXT,
+    content TEXT
+);
+CREATE INDEX IF NOT EXISTS knowledge_timestamp ON knowledge(timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+    content, content='knowledge', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS knowledge_ai AFTER INSERT ON knowledge BEGIN
+    INSERT INTO knowledge_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS knowledge_ad AFTER DELETE ON knowledge BEGIN
+    INSERT INTO knowledge_fts(knowledge_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS knowledge_au AFTER UPDATE OF content ON knowledge BEGIN
+    INSERT INTO knowledge_fts(knowledge_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    INSERT INTO knowledge_fts(rowid, content) VALUES (new.id, new.content);
+END;
+"""
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 OR-query of quoted terms, so user input can never be a syntax error."""
+    terms = dict.fromkeys(word.lower() for word in _WORD_RE.findall(text or "") if len(word) > 1)
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class KnowledgeStore:
+    """Durable knowledge entries with bm25-ranked full-text search.
+
+    Reads and writes go through an ``SQLitePool`` (WAL mode, so searches never
+    block on a write). Writes always commit with synchronous=FULL, even on a
+    shared pool that runs NORMAL, so an acknowledged POST /knowledge survives
+    a power loss. Triggers keep the FTS5 index in step with the table, including
+    rows written by older code that did not know about the index.
+    """
+
+    def __init__(self, path, pool=None):
+        self.path = path
+        self.owns_pool = pool is None
+        self.pool = SQLitePool(path, synchronous="FULL") if pool is None else pool
+        with self.pool.writer() as conn:
+            existed = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_fts'").fetchone()
+            conn.executescript(SCHEMA)
+            if not existed:
+                # Index rows that were inserted before the FTS table existed
+                conn.execute("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _row(row):
+        return {"id": row["id"], "user_id": row["user_id"], "timestamp": row["timestamp"], "content": row["content"]}
+
+    def add(self, content, user_id=None):
+        """Insert one entry and return it once the commit is on disk."""
+        timestamp = datetime.utcnow().isoformat()
+        with self.pool.writer(synchronous="FULL") as conn:
+            cursor = conn.execute("INSERT INTO knowledge (user_id, timestamp, content) VALUES (?, ?, ?)",
+                                  (user_id, timestamp, content))
+        return {"id": cursor.lastrowid, "user_id": user_id, "timestamp": timestamp, "content": content}
+
+    def delete(self, entry_id):
+        with self.pool.writer(synchronous="FULL") as conn:
+            return conn.execute("DELETE FROM knowledge WHERE id = ?", (entry_id,)).rowcount > 0
+
+    def entries(self, newest_first=True, limit=None):
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT id, user_id, timestamp, content FROM knowledge ORDER BY timestamp {order}, id {order}"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self.pool.reader() as conn:
+            return [self._row(row) for row in conn.execute(sql, params)]
+
+    def search(self, query, limit=10):
+        """Entries matching any query term, best bm25 match first; ``score`` is -bm25 (higher is better)."""
+        match = fts_query(query)
+        if not match:
+            return []
+        with self.pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT k.id, k.user_id, k.timestamp, k.content, bm25(knowledge_fts) AS rank "
+                "FROM knowledge_fts JOIN knowledge k ON k.id = knowledge_fts.rowid "
+                "WHERE knowledge_fts MATCH ? ORDER BY rank LIMIT ?", (match, limit)).fetchall()
+        results = []
+        for row in rows:
+            result = self._row(row)
+            result["score"] = -row["rank"]
+            results.append(result)
+        return results
+
+    def fingerprint(self):
+        """(count, max id, total content length): changes on every insert or delete and on edits that resize an entry."""
+        with self.pool.reader() as conn:
+            row = conn.execute("SELECT COUNT(*), MAX(id), TOTAL(LENGTH(content)) FROM knowledge").fetchone()
+        return tuple(row)
+
+    def close(self):
+        if self.owns_pool:
+            self.pool.close_all()
@@ -0,0 +1,266 @@
+# Outbound scheduling for Groq calls: AIMD concurrency, RPM/TPM token buckets, fair per-user queue
+import logging
+import re
+import threading
+import time
+from collections import deque
+
+# Rough prompt size when the exact tokenizer is not available, plus room for the reply
+CHARS_PER_TOKEN = 4
+COMPLETION_TOKENS_ESTIMATE = 512
+BACKOFF_COOLDOWN = 1.0
+# Longest pause a 429 may impose; Groq's request reset header counts down to the daily reset
+MAX_PAUSE_SECONDS = 60.0
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class LLMBusy(Exception):
+    """No LLM capacity within the caller's wait budget; try again after ``retry_after`` seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(*texts, completion=COMPLETION_TOKENS_ESTIMATE):
+    return sum(len(text or "") for text in texts) // CHARS_PER_TOKEN + completion
+
+
+def parse_duration(value):
+    """Groq reset headers look like "2m59.56s" or "120ms"; Retry-After is plain seconds."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def is_rate_limited(error):
+    return getattr(error, "status_code", None) == 429
+
+
+def retry_after_from(error, default):
+    """Retry-After, else the per-minute token reset, capped at ``MAX_PAUSE_SECONDS``.
+
+    x-ratelimit-reset-requests is not used: it counts down to the daily request reset.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name in ("retry-after", "x-ratelimit-reset-tokens"):
+        seconds = parse_duration(headers.get(name))
+        if seconds is not None:
+            return min(seconds, MAX_PAUSE_SECONDS)
+    return min(default, MAX_PAUSE_SECONDS)
+
+
+class TokenBucket:
+    """``capacity`` units refilled evenly over ``window`` seconds."""
+
+    def __init__(self, capacity, window, now):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self.refill(now)
+        # A request larger than the whole bucket only needs a full bucket
+        needed = min(amount, self.capacity)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def take(self, amount, now):
+        self.refill(now)
+        self.tokens -= amount
+
+    def sync(self, remaining, now):
+        """Trust the provider's count when it has less left than we think."""
+        self.refill(now)
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class _Request:
+    def __init__(self, key, tokens):
+        self.key = key
+        self.tokens = tokens
+        self.granted = False
+
+
+class LLMScheduler:
+    """Gate for every Groq call made by this process.
+
+    A call first waits for a concurrency slot and for room in both the
+    requests-per-minute and tokens-per-minute buckets. Waiters are served
+    round-robin across keys (users), so one busy user cannot starve the rest.
+    The concurrency limit adapts AIMD-style: +1 per window of successful
+    calls, halved on a 429, which also pauses all calls for the provider's
+    retry-after. A throttled call is retried while its wait budget allows;
+    when capacity cannot be found in time ``LLMBusy`` is raised so the
+    endpoint can answer 503 with Retry-After instead of a 500.
+    """
+
+    def __init__(self, rpm=30, tpm=6000, initial_limit=4, min_limit=1, max_limit=16, max_wait=3.0,
+                 max_retries=2, clock=time.monotonic):
+        self.clock = clock
+        now = clock()
+        self.requests = TokenBucket(rpm, 60.0, now)
+        self.tokens = TokenBucket(tpm, 60.0, now)
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = {}  # key -> deque of _Request
+        self.order = deque()  # keys with waiters, in round-robin order
+        self.paused_until = 0.0
+        self.last_backoff = float("-inf")
+        self.grants = 0
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _queued(self):
+        return sum(len(requests) for requests in self.waiting.values())
+
+    def _dispatch(self, now):
+        """Grant waiters in fair order while capacity lasts; returns seconds until more may be granted."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        while self.order and self.in_flight < int(self.limit):
+            key = self.order[0]
+            head = self.waiting[key][0]
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(head.tokens, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1, now)
+            self.tokens.take(head.tokens, now)
+            self.waiting[key].popleft()
+            self.order.popleft()
+            if self.waiting[key]:
+                self.order.append(key)
+            else:
+                del self.waiting[key]
+            head.granted = True
+            self.in_flight += 1
+            self.cond.notify_all()
+        return None
+
+    def _acquire(self, key, tokens, deadline):
+        started = self.clock()
+        request = _Request(key, tokens)
+        with self.cond:
+            if key not in self.waiting:
+                self.waiting[key] = deque()
+                self.order.append(key)
+            self.waiting[key].append(request)
+            while True:
+                now = self.clock()
+                wait = self._dispatch(now)
+                if request.granted:
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.waiting[key].remove(request)
+                    if not self.waiting[key]:
+                        del self.waiting[key]
+                        self.order.remove(key)
+                    self.timeouts += 1
+                    self.cond.notify_all()
+                    raise LLMBusy("No LLM capacity within the wait budget", max(1.0, wait or 1.0))
+                self.cond.wait(min(remaining, wait) if wait else remaining)
+            waited = self.clock() - started
+            self.grants += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def _release(self, succeeded=True, throttled_for=None):
+        with self.cond:
+            self.in_flight -= 1
+            now = self.clock()
+            if succeeded:
+                # Additive increase: about +1 after a full window of successes
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif throttled_for is not None:
+                self.throttled += 1
+                self.paused_until = max(self.paused_until, now + throttled_for)
+                # Concurrent 429s from one burst count as a single congestion signal
+                if now - self.last_backoff >= BACKOFF_COOLDOWN:
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self.last_backoff = now
+                    logging.warning(f"Groq throttled; concurrency limit now {int(self.limit)}, "
+                                    f"pausing {throttled_for:.1f}s")
+            self.cond.notify_all()
+
+    def call(self, fn, tokens, key="anonymous", max_wait=None):
+        """Run ``fn()`` once there is capacity; ``tokens`` is the call's estimated token cost."""
+        deadline = self.clock() + (self.max_wait if max_wait is None else max_wait)
+        attempt = 0
+        while True:
+            self._acquire(key, tokens, deadline)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limited(e):
+                    # Other failures say nothing about Groq's capacity
+                    self._release(succeeded=False)
+                    raise
+                retry_after = retry_after_from(e, default=2 ** attempt)
+                self._release(succeeded=False, throttled_for=retry_after)
+                attempt += 1
+                if attempt > self.max_retries or self.clock() + retry_after >= deadline:
+                    raise LLMBusy(f"Groq rate limit reached: {e}", max(1.0, retry_after)) from e
+                self.retries += 1
+                continue
+            self._release()
+            with self.cond:
+                self.calls += 1
+            return result
+
+    def settle(self, estimated_tokens, used_tokens=None, headers=None):
+        """Correct the buckets after a call with actual usage and Groq's x-ratelimit-* headers."""
+        with self.cond:
+            now = self.clock()
+            if used_tokens is not None:
+                self.tokens.take(used_tokens - estimated_tokens, now)
+            if headers:
+                remaining_requests = headers.get("x-ratelimit-remaining-requests")
+                remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+                if remaining_requests is not None:
+                    self.requests.sync(remaining_requests, now)
+                if remaining_tokens is not None:
+                    self.tokens.sync(remaining_tokens, now)
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            now = self.clock()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "queued": self._queued(),
+                "queued_keys": len(self.waiting),
+                "requests_available": round(self.requests.tokens, 2),
+                "tokens_available": round(self.tokens.tokens, 1),
+                "paused_for": round(max(0.0, self.paused_until - now), 2),
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds * 1000 / self.grants, 1) if self.grants else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            }
@@ -0,0 +1,293 @@
+# Prefork serving: load the app once, fork N waitress workers that share it copy-on-write
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from multiprocessing.sharedctypes import RawArray
+
+from waitress import wasyncore
+from waitress.server import create_server
+
+# Per-worker slots in shared memory: requests served, seconds spent in the app, start time, pid
+STAT_FIELDS = ("requests", "busy_seconds", "started_at", "pid")
+RESPAWN_BACKOFF_SECONDS = 1.0
+LOOP_TIMEOUT = 0.2
+
+
+def bind_socket(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+class WorkerStats:
+    """Request counters every worker writes to its own slot and any process can read."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.values = RawArray("d", workers * len(STAT_FIELDS))
+
+    def _index(self, slot, field):
+        return slot * len(STAT_FIELDS) + STAT_FIELDS.index(field)
+
+    def reset(self, slot, pid):
+        for field in STAT_FIELDS:
+            self.values[self._index(slot, field)] = 0.0
+        self.values[self._index(slot, "started_at")] = time.time()
+        self.values[self._index(slot, "pid")] = pid
+
+    def record(self, slot, busy_seconds):
+        # Each slot has a single writer, so no lock is needed
+        self.values[self._index(slot, "requests")] += 1
+        self.values[self._index(slot, "busy_seconds")] += busy_seconds
+
+    def get(self, slot, field):
+        return self.values[self._index(slot, field)]
+
+    def report(self, now=None, baseline_rps=None):
+        """Per-worker throughput, and the total against ``baseline_rps`` measured with a single worker."""
+        now = time.time() if now is None else now
+        rows = []
+        for slot in range(self.workers):
+            started = self.get(slot, "started_at")
+            requests = self.get(slot, "requests")
+            uptime = max(now - started, 1e-9) if started else 0.0
+            rows.append({
+                "slot": slot,
+                "pid": int(self.get(slot, "pid")),
+                "requests": int(requests),
+                "rps": round(requests / uptime, 3) if uptime else 0.0,
+                "busy": round(self.get(slot, "busy_seconds") / uptime, 4) if uptime else 0.0,
+            })
+        total_rps = sum(row["rps"] for row in rows)
+        best = max((row["rps"] for row in rows), default=0.0)
+        speedup = total_rps / baseline_rps if baseline_rps else None
+        return {
+            "workers": rows,
+            "total_rps": round(total_rps, 3),
+            "rps_per_worker": round(total_rps / self.workers, 3) if self.workers else 0.0,
+            "baseline_rps": baseline_rps,
+            # Throughput over the single-worker baseline; ideal is ``workers``
+            "speedup": round(speedup, 3) if speedup is not None else None,
+            # 1.0 means N workers serve N x the single-worker baseline
+            "scaling_efficiency": round(speedup / self.workers, 3) if speedup is not None else None,
+            # 1.0 means every worker is as busy as the busiest one (evenness only, not throughput)
+            "balance": round(total_rps / (best * self.workers), 3) if best else None,
+        }
+
+
+class Worker:
+    """One forked process: serves the inherited listening socket until told to drain."""
+
+    def __init__(self, app, sock, slot, stats, threads, max_requests, graceful_timeout, on_exit):
+        self.app = app
+        self.sock = sock
+        self.slot = slot
+        self.stats = stats
+        self.threads = threads
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.on_exit = on_exit
+        self.served = 0
+        self.draining = False
+        self.server = None
+
+    def wsgi(self, environ, start_response):
+        started = time.perf_counter()
+        try:
+            return self.app(environ, start_response)
+        finally:
+            self.stats.record(self.slot, time.perf_counter() - started)
+            self.served += 1
+            if self.max_requests and self.served >= self.max_requests and not self.draining:
+                logging.info(f"Worker {os.getpid()} served {self.served} requests; recycling")
+                self.drain()
+
+    def drain(self, *_):
+        """Stop accepting; the main loop exits once in-flight responses are written."""
+        self.draining = True
+        if self.server is not None:
+            self.server.accepting = False
+            self.server.pull_trigger()
+
+    def busy(self):
+        return any(channel.requests or channel.total_outbufs_len
+                   for channel in list(self.server.active_channels.values()))
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.drain)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        self.server = create_server(self.wsgi, sockets=[self.sock], threads=self.threads)
+        deadline = None
+        while True:
+            wasyncore.loop(timeout=LOOP_TIMEOUT, map=self.server._map, count=1)
+            if self.draining:
+                deadline = deadline or time.monotonic() + self.graceful_timeout
+                if not self.busy() or time.monotonic() >= deadline:
+                    break
+        self.server.task_dispatcher.shutdown(timeout=max(0.0, deadline - time.monotonic()))
+        if self.on_exit is not None:
+            self.on_exit()
+
+
+class PreforkServer:
+    """Parent process: owns the listening socket, keeps ``workers`` children alive.
+
+    The app and everything it loads at import (knowledge snapshot, artifact,
+    compiled regexes) live in the parent before forking, so workers share
+    those pages copy-on-write; ``gc.freeze()`` keeps the collector from
+    touching (and so copying) them. ``before_fork`` runs in the parent, e.g.
+    to close SQLite connections that must not cross a fork; ``after_fork``
+    runs in each child, e.g. to start background threads.
+
+    Signals: SIGHUP replaces every worker with a fresh fork (after running
+    ``before_fork`` again), SIGTERM/SIGINT drain and stop everything. Workers
+    recycle themselves after ``max_requests`` (+ jitter) requests.
+    """
+
+    def __init__(self, app, host="localhost", port=9000, workers=4, threads=4, max_requests=0,
+                 max_requests_jitter=0, graceful_timeout=30, before_fork=None, after_fork=None, on_exit=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.before_fork = before_fork
+        self.after_fork = after_fork
+        self.on_exit = on_exit
+        self.stats = WorkerStats(workers)
+        self.children = {}  # pid -> slot
+        self.sock = None
+        self.stopping = False
+        self.restart_requested = False
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            return pid
+        # Child: drop the parent's handlers until the worker installs its own
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            self.stats.reset(slot, os.getpid())
+            random.seed()
+            if self.after_fork is not None:
+                self.after_fork()
+            jitter = random.randint(0, self.max_requests_jitter) if self.max_requests_jitter else 0
+            Worker(self.app, self.sock, slot, self.stats, self.threads,
+                   self.max_requests + jitter if self.max_requests else 0,
+                   self.graceful_timeout, self.on_exit).run()
+        except Exception:
+            logging.exception(f"Worker {os.getpid()} crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def prepare_fork(self):
+        if self.before_fork is not None:
+            self.before_fork()
+        gc.collect()
+        gc.freeze()
+
+    def serve(self):
+        self.sock = bind_socket(self.host, self.port)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_restart)
+        self.prepare_fork()
+        for slot in range(self.workers):
+            self.spawn(slot)
+        logging.info(f"✅ Prefork backend on http://{self.host}:{self.port} with {self.workers} workers")
+        try:
+            self._supervise()
+        finally:
+            self._stop_children()
+            self.sock.close()
+
+    def _request_stop(self, *_):
+        self.stopping = True
+
+    def _request_restart(self, *_):
+        self.restart_requested = True
+
+    def _supervise(self):
+        last_spawn = {}
+        while not self.stopping:
+            if self.restart_requested:
+                self.restart_requested = False
+                self._rolling_restart()
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid, status = 0, 0
+            if not pid:
+                time.sleep(0.1)
+                continue
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+            # Recycled or crashed; back off if the slot keeps dying straight after starting
+            if time.monotonic() - last_spawn.get(slot, 0) < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+            logging.info(f"Worker {pid} exited with status {status}; respawning slot {slot}")
+            last_spawn[slot] = time.monotonic()
+            self.spawn(slot)
+
+    def _rolling_restart(self):
+        """Fork a replacement for each worker, then drain the old one, one slot at a time."""
+        logging.info("Graceful restart: replacing workers")
+        self.prepare_fork()
+        for old_pid, slot in list(self.children.items()):
+            self.spawn(slot)
+            self.children.pop(old_pid, None)
+            try:
+                os.kill(old_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self._reap([old_pid], self.graceful_timeout)
+
+    def _reap(self, pids, timeout):
+        deadline = time.monotonic() + timeout
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            for pid in list(pending):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pending.discard(pid)
+            time.sleep(0.05)
+        for pid in pending:
+            logging.warning(f"Worker {pid} did not drain in {timeout}s; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+
+    def _stop_children(self):
+        pids = list(self.children)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self._reap(pids, self.graceful_timeout)
+        self.children.clear()
+
+
+def supports_prefork():
+    return hasattr(os, "fork")
@@ -0,0 +1,158 @@
+# Token-bucket rate limiting with bucket state in SQLite, shared by every worker process
+import logging
+import math
+import re
+import time
+
+from flask import current_app, g, jsonify, request
+
+from sqlite_pool import SQLitePool
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+# Buckets idle this long are full again anyway, so their rows can go
+PRUNE_IDLE_SECONDS = 86400
+PRUNE_EVERY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rate_buckets_updated ON rate_buckets(updated);
+"""
+
+
+def parse_limit(spec):
+    """"30 per minute" or "30/minute" -> (capacity, window seconds)."""
+    match = _LIMIT_RE.match(spec)
+    if not match:
+        raise ValueError(f"Unrecognised rate limit: {spec!r}")
+    return int(match.group(1)), PERIODS[match.group(2).lower()]
+
+
+class RateLimitResult:
+    def __init__(self, allowed, limit, window, remaining, retry_after, reset_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.window = window
+        self.remaining = remaining
+        self.retry_after = retry_after
+        self.reset_after = reset_after
+
+    def headers(self):
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+            "RateLimit-Policy": f"{self.limit};w={self.window}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class TokenBucketStore:
+    """One row per bucket; a check is a primary-key read and upsert in one
+    BEGIN IMMEDIATE transaction, so concurrent workers never double-spend."""
+
+    def __init__(self, path, clock=time.time):
+        self.clock = clock
+        # Losing the last few refills on power loss is harmless; skip the fsyncs
+        self.pool = SQLitePool(path, max_readers=1, synchronous="OFF")
+        self.checks = 0
+        with self.pool.writer() as conn:
+            conn.executescript(SCHEMA)
+
+    def take(self, key, capacity, window, cost=1):
+        rate = capacity / window
+        now = self.clock()
+        with self.pool.writer() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row["tokens"] + max(0.0, now - row["updated"]) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute("INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                         (key, tokens, now))
+        self.checks += 1
+        if self.checks % PRUNE_EVERY == 0:
+            self.prune(now)
+        return RateLimitResult(allowed, capacity, window, int(tokens),
+                               retry_after=0.0 if allowed else (cost - tokens) / rate,
+                               reset_after=(capacity - tokens) / rate)
+
+    def prune(self, now=None):
+        now = self.clock() if now is None else now
+        with self.pool.writer() as conn:
+            return conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - PRUNE_IDLE_SECONDS,)).rowcount
+
+    def close(self):
+        self.pool.close_all()
+
+
+class RateLimiter:
+    """Drop-in for the Flask-Limiter calls this backend used: ``default_limits`` plus ``@limiter.limit(...)``.
+
+    Each endpoint gets its own bucket per identity from ``key_func`` (e.g. the
+    signed-in email, else the client IP). Every checked response carries
+    RateLimit-* headers; rejected requests get 429 with Retry-After. If the
+    store fails the request is let through rather than turning a storage
+    problem into an outage.
+    """
+
+    def __init__(self, key_func, app=None, store=None, default_limits=()):
+        self.key_func = key_func
+        self.store = store
+        self.default_limits = [parse_limit(spec) for spec in default_limits]
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.before_request(self._check)
+        app.after_request(self._add_headers)
+
+    def limit(self, spec):
+        parsed = parse_limit(spec)
+
+        def decorator(view):
+            # Read back by _check through app.view_functions, so the view itself is not wrapped
+            view.rate_limits = getattr(view, "rate_limits", []) + [parsed]
+            return view
+        return decorator
+
+    def _check(self):
+        view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+        if view is None or self.store is None:
+            return None
+        limits = getattr(view, "rate_limits", None) or self.default_limits
+        if not limits:
+            return None
+        identity = self.key_func()
+        tightest = None
+        try:
+            for capacity, window in limits:
+                result = self.store.take(f"{request.endpoint}:{capacity}/{window}:{identity}", capacity, window)
+                if tightest is None or not result.allowed or result.remaining < tightest.remaining:
+                    tightest = result
+                if not result.allowed:
+                    break
+        except Exception as e:
+            logging.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return None
+        g.rate_limit = tightest
+        if not tightest.allowed:
+            logging.info(f"Rate limit exceeded for {identity} on {request.endpoint}")
+            response = jsonify({"error": "Rate limit exceeded", "retry_after": math.ceil(tightest.retry_after)})
+            response.status_code = 429
+            return response
+        return None
+
+    def _add_headers(self, response):
+        result = g.pop("rate_limit", None)
+        if result is not None:
+            response.headers.update(result.headers())
+        return response
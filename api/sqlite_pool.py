@@ -0,0 +1,195 @@
+# SQLite connection pool: one writer, several readers, WAL mode, bounded checkout waits
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_CACHED_STATEMENTS = 256
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the checkout timeout."""
+
+
+class ConnectionGroup:
+    """Up to ``size`` connections made by ``factory`` on first demand, with wait and busy-time metrics."""
+
+    def __init__(self, name, factory, size, timeout):
+        self.name = name
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.idle = []
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.busy_seconds = 0.0
+        self.created_at = time.monotonic()
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        conn = None
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise PoolTimeout(f"{self.name} pool is closed")
+                if self.idle:
+                    conn = self.idle.pop()
+                    break
+                if self.open < self.size:
+                    # Reserve the slot so concurrent callers cannot overshoot the size, then
+                    # connect outside the lock so releases and other checkouts are not held up
+                    self.open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No {self.name} connection free after {timeout:.1f}s ({self.size} in use)")
+                self.condition.wait(remaining)
+        if conn is None:
+            try:
+                conn = self.factory()
+            except Exception:
+                with self.condition:
+                    self.open -= 1
+                    self.condition.notify()
+                raise
+        with self.condition:
+            waited = time.monotonic() - started
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return conn, time.monotonic()
+
+    def release(self, conn, checked_out_at):
+        with self.condition:
+            self.in_use -= 1
+            self.busy_seconds += time.monotonic() - checked_out_at
+            if self.closed:
+                conn.close()
+                self.open -= 1
+            else:
+                self.idle.append(conn)
+            self.condition.notify()
+
+    def reset(self):
+        """Close idle connections; later checkouts open new ones (used before fork)."""
+        with self.condition:
+            for conn in self.idle:
+                conn.close()
+            self.open -= len(self.idle)
+            self.idle = []
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            for conn in self.idle:
+                conn.close()
+            self.open -= len(self.idle)
+            self.idle = []
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            elapsed = max(time.monotonic() - self.created_at, 1e-9)
+            return {
+                "size": self.size,
+                "open": self.open,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                # Share of the group's capacity spent checked out since the pool was created
+                "utilization": round(self.busy_seconds / (elapsed * self.size), 4),
+            }
+
+
+class SQLitePool:
+    """WAL-mode pool for one database file.
+
+    Writes go through a single dedicated writer connection, so writers queue
+    here instead of failing with "database is locked"; reads use up to
+    ``max_readers`` query-only connections that WAL lets run alongside the
+    writer. Connections are opened lazily, each with sqlite3's per-connection
+    prepared statement cache, and checkouts fail with ``PoolTimeout`` instead
+    of waiting forever.
+    """
+
+    def __init__(self, path, max_readers=4, checkout_timeout=5.0, busy_timeout_ms=5000,
+                 synchronous="NORMAL", mmap_size=SQLITE_MMAP_SIZE, cached_statements=SQLITE_CACHED_STATEMENTS):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.writers = ConnectionGroup("writer", lambda: self._connect(readonly=False), 1, checkout_timeout)
+        self.readers = ConnectionGroup("reader", lambda: self._connect(readonly=True), max_readers, checkout_timeout)
+
+    def _connect(self, readonly):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @contextmanager
+    def writer(self, timeout=None, synchronous=None):
+        """The writer connection; commits when the block exits cleanly and rolls back on error.
+
+        ``synchronous`` overrides the pool's setting for this one commit, e.g. "FULL"
+        for writes that must survive a power loss on a pool that otherwise runs NORMAL.
+        """
+        conn, checked_out_at = self.writers.acquire(timeout)
+        try:
+            if synchronous is None or synchronous == self.synchronous:
+                with conn:
+                    yield conn
+            else:
+                conn.execute(f"PRAGMA synchronous={synchronous}")
+                try:
+                    with conn:
+                        yield conn
+                finally:
+                    conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        finally:
+            self.writers.release(conn, checked_out_at)
+
+    @contextmanager
+    def reader(self, timeout=None):
+        conn, checked_out_at = self.readers.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self.readers.release(conn, checked_out_at)
+
+    # Old DatabasePool callers may write, so they get the writer
+    get_connection = writer
+
+    def stats(self):
+        return {"path": self.path, "writer": self.writers.stats(), "readers": self.readers.stats()}
+
+    def reset(self):
+        """Drop idle connections so a forked child opens its own; SQLite connections must not cross a fork."""
+        self.writers.reset()
+        self.readers.reset()
+
+    def close_all(self):
+        self.writers.close()
+        self.readers.close()
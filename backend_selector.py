@@ -0,0 +1,216 @@
+# Pick the fastest healthy CASI backend and fail over between them without user action
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+AUTO_BACKEND = "auto"
+DEFAULT_BACKENDS = [
+    ("On-Premise Server", "http://172.16.11.69:9000"),
+    ("Vercel Cloud", "https://casto-ai-bot.vercel.app"),
+]
+PROBE_PATH = "/"
+PROBE_INTERVAL = 30.0
+PROBE_TIMEOUT = 3.0
+EWMA_ALPHA = 0.3
+# Gateway answers mean "try another backend"; other errors come from the app itself
+FAILOVER_STATUSES = (502, 503, 504)
+# A 504 or a read timeout may come after the backend acted on the request, so only these are re-sent
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Backend:
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url.rstrip("/")
+        self.healthy = None  # unknown until the first probe or request
+        self.ewma_ms = None
+        self.failures = 0
+        self.last_error = None
+        self.last_checked = None
+
+    def observe_latency(self, latency_ms, alpha):
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms = alpha * latency_ms + (1 - alpha) * self.ewma_ms
+
+    def to_dict(self):
+        return {"name": self.name, "url": self.url, "healthy": self.healthy,
+                "ewma_ms": None if self.ewma_ms is None else round(self.ewma_ms, 1),
+                "failures": self.failures, "last_error": self.last_error}
+
+
+class BackendSelector:
+    """Probes backends in the background and routes requests to the fastest healthy one.
+
+    Probe latencies are smoothed with an EWMA. The chosen backend is sticky: it
+    only changes when some backend's health flips (goes down or comes back), so
+    small latency swings never bounce requests between servers. A failed request
+    marks its backend unhealthy and is retried on the next one straight away,
+    within the caller's one ``timeout``.
+    """
+
+    def __init__(self, backends, probe_path=PROBE_PATH, probe_interval=PROBE_INTERVAL,
+                 probe_timeout=PROBE_TIMEOUT, alpha=EWMA_ALPHA, session=None, on_change=None):
+        self.backends = [Backend(name, url) for name, url in backends]
+        if not self.backends:
+            raise ValueError("At least one backend is required")
+        self.probe_path = probe_path
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.alpha = alpha
+        self.session = session or requests.Session()
+        self.on_change = on_change
+        self._current = self.backends[0]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=len(self.backends), thread_name_prefix="casi-probe")
+
+    def current(self):
+        with self._lock:
+            return self._current
+
+    def current_url(self):
+        return self.current().url
+
+    def ordered(self):
+        """Current backend first, then other healthy ones by latency, unhealthy ones last."""
+        with self._lock:
+            others = [b for b in self.backends if b is not self._current]
+            others.sort(key=lambda b: (b.healthy is False, b.ewma_ms is None, b.ewma_ms or 0))
+            return [self._current] + others
+
+    def _reselect(self):
+        """Called with the lock held after a health change."""
+        candidates = [b for b in self.backends if b.healthy] or [b for b in self.backends if b.healthy is None]
+        if not candidates:
+            return
+        best = min(candidates, key=lambda b: (b.ewma_ms is None, b.ewma_ms or 0))
+        if best is not self._current:
+            previous, self._current = self._current, best
+            if self.on_change:
+                self.on_change(previous, best)
+
+    def record_success(self, backend, latency_ms=None):
+        with self._lock:
+            if latency_ms is not None:
+                backend.observe_latency(latency_ms, self.alpha)
+            backend.failures = 0
+            backend.last_error = None
+            backend.last_checked = time.time()
+            if backend.healthy is not True:
+                backend.healthy = True
+                self._reselect()
+
+    def record_failure(self, backend, error):
+        with self._lock:
+            backend.failures += 1
+            backend.last_error = str(error)
+            backend.last_checked = time.time()
+            if backend.healthy is not False:
+                backend.healthy = False
+                self._reselect()
+
+    def probe(self, backend):
+        started = time.perf_counter()
+        try:
+            response = self.session.get(backend.url + self.probe_path, timeout=self.probe_timeout)
+        except requests.exceptions.RequestException as e:
+            self.record_failure(backend, e)
+            return False
+        if response.status_code >= 500:
+            self.record_failure(backend, f"HTTP {response.status_code}")
+            return False
+        # Any non-5xx answer (even 403/404) means the server is up and answering
+        self.record_success(backend, (time.perf_counter() - started) * 1000)
+        return True
+
+    def probe_all(self):
+        return list(self._executor.map(self.probe, self.backends))
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.probe_interval)
+
+    def start(self):
+        if self._thread is None and len(self.backends) > 1:
+            self._thread = threading.Thread(target=self._probe_loop, name="casi-backend-probe", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+    def request(self, method, path, timeout=None, **kwargs):
+        """Send to the preferred backend, moving to the next one when it cannot be reached.
+
+        ``timeout`` is shared by every attempt, so failing over never makes the
+        caller wait longer. Connection errors and 502/503 fail over for any
+        method. Read timeouts and 504s only fail over for idempotent methods,
+        so a POST is never sent twice; those split the timeout between the
+        backends left to try. A 503 with Retry-After is a backend
+        shedding load while healthy: it is returned to the caller as-is.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        resend = method.upper() in IDEMPOTENT_METHODS
+        last_error = None
+        response = None
+        backends = self.ordered()
+        for attempt, backend in enumerate(backends):
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Requests that may be re-sent split what is left, so a timeout still leaves time to fail over
+                kwargs["timeout"] = remaining / (len(backends) - attempt) if resend else remaining
+            try:
+                response = self.session.request(method, backend.url + path, **kwargs)
+            except requests.exceptions.ConnectionError as e:
+                print(f"[DEBUG] Backend {backend.name} unreachable ({e.__class__.__name__}); trying next")
+                self.record_failure(backend, e)
+                last_error = e
+                continue
+            except requests.exceptions.Timeout as e:
+                self.record_failure(backend, e)
+                if not resend:
+                    raise
+                print(f"[DEBUG] Backend {backend.name} timed out; trying next")
+                last_error = e
+                continue
+            if response.status_code == 503 and response.headers.get("Retry-After"):
+                print(f"[DEBUG] Backend {backend.name} is busy (Retry-After {response.headers['Retry-After']})")
+                return response
+            if response.status_code in FAILOVER_STATUSES:
+                self.record_failure(backend, f"HTTP {response.status_code}")
+                if response.status_code == 504 and not resend:
+                    return response
+                print(f"[DEBUG] Backend {backend.name} returned {response.status_code}; trying next")
+                continue
+            self.record_success(backend)
+            return response
+        if response is not None:
+            return response
+        if last_error is None:
+            raise requests.exceptions.Timeout(f"No backend answered within {timeout}s")
+        raise last_error
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def snapshot(self):
+        with self._lock:
+            return {"current": self._current.url, "backends": [b.to_dict() for b in self.backends]}
+
+
+def create_backend_selector(backend_url, on_change=None):
+    """Automatic selection over DEFAULT_BACKENDS, or a single backend when a URL is pinned in config."""
+    if not backend_url or backend_url == AUTO_BACKEND:
+        return BackendSelector(DEFAULT_BACKENDS, on_change=on_change)
+    return BackendSelector([("Configured", backend_url)], on_change=on_change)
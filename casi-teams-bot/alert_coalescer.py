@@ -0,0 +1,132 @@
+import re
+import time
+
+# Hold follow-up alerts this long after the latest one before sending a digest
+COALESCE_WINDOW = 60.0
+# Never hold a group longer than this, even if alerts keep arriving
+MAX_HOLD = 180.0
+SIMILARITY_THRESHOLD = 0.3
+IMMEDIATE_PRIORITIES = ("Critical",)
+
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "have", "has", "not", "can", "cannot",
+    "cant", "please", "help", "need", "issue", "problem", "my", "our", "is", "are", "was",
+    "it", "to", "of", "in", "on", "a", "an", "i", "me", "we", "hello", "hi", "urgent", "asap",
+}
+
+
+def concern_tokens(text):
+    """Lowercased content words of a concern, used for similarity."""
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    return {w for w in words if len(w) > 2 and w not in STOPWORDS}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class AlertGroup:
+    """Alerts similar to a first alert that was already sent; ``alerts`` holds only the follow-ups."""
+
+    def __init__(self, alert, tokens, now):
+        self.priority = alert.get("priority", "General")
+        self.alerts = []
+        self.token_sets = [tokens]
+        self.opened_at = now
+        self.last_added = now
+
+    def matches(self, priority, tokens, threshold):
+        if priority != self.priority:
+            return False
+        return any(jaccard(tokens, existing) >= threshold for existing in self.token_sets)
+
+    def add(self, alert, tokens, now):
+        self.alerts.append(alert)
+        self.token_sets.append(tokens)
+        self.last_added = now
+
+    def is_due(self, now, window, max_hold):
+        return now - self.last_added >= window or now - self.opened_at >= max_hold
+
+
+class AlertCoalescer:
+    """Groups alerts by priority and similar concern inside a sliding window.
+
+    ``add`` returns batches that must go out now: Critical alerts and the
+    first alert of a new group, so a lone alert is never delayed. Similar
+    follow-ups inside the group's window are held, and ``due`` returns them
+    once the window closes. A batch of one is a normal alert; larger batches
+    are sent as a digest card.
+    """
+
+    def __init__(self, window=COALESCE_WINDOW, max_hold=MAX_HOLD, threshold=SIMILARITY_THRESHOLD,
+                 immediate_priorities=IMMEDIATE_PRIORITIES, clock=time.monotonic):
+        self.window = window
+        self.max_hold = max_hold
+        self.threshold = threshold
+        self.immediate_priorities = set(immediate_priorities)
+        self.clock = clock
+        self.groups = []
+
+    def add(self, alert):
+        priority = alert.get("priority", "General")
+        if priority in self.immediate_priorities:
+            return [[alert]]
+        now = self.clock()
+        tokens = concern_tokens(alert.get("concern"))
+        for group in self.groups:
+            if group.matches(priority, tokens, self.threshold) and not group.is_due(now, self.window, self.max_hold):
+                group.add(alert, tokens, now)
+                return []
+        self.groups.append(AlertGroup(alert, tokens, now))
+        return [[alert]]
+
+    def due(self):
+        now = self.clock()
+        closed = [group for group in self.groups if group.is_due(now, self.window, self.max_hold)]
+        self.groups = [group for group in self.groups if group not in closed]
+        # A group whose first alert had no follow-ups has nothing left to send
+        return [group.alerts for group in closed if group.alerts]
+
+    def flush(self):
+        """Return every held group, e.g. on shutdown."""
+        batches = [group.alerts for group in self.groups if group.alerts]
+        self.groups = []
+        return batches
+
+    def next_due_in(self):
+        """Seconds until the earliest group with held follow-ups closes, or None when nothing is held."""
+        holding = [g for g in self.groups if g.alerts]
+        if not holding:
+            return None
+        now = self.clock()
+        return max(0.0, min(min(g.last_added + self.window, g.opened_at + self.max_hold) - now
+                            for g in holding))
+
+    def pending_count(self):
+        return sum(len(group.alerts) for group in self.groups)
+
+
+def digest_alert_data(alerts):
+    """Collapse a batch into one alert_data dict for channels without digest cards (Power Automate)."""
+    if len(alerts) == 1:
+        return alerts[0]
+    first = alerts[0]
+    users = sorted({a.get("windows_user", "Unknown") for a in alerts})
+    hosts = sorted({a.get("hostname", "Unknown") for a in alerts})
+    concerns = []
+    for alert in alerts:
+        concern = alert.get("concern", "")
+        if concern and concern not in concerns:
+            concerns.append(concern)
+    return dict(
+        first,
+        windows_user=", ".join(users),
+        hostname=", ".join(hosts),
+        concern=f"{len(alerts)} similar alerts: " + "; ".join(concerns[:5]),
+        timestamp=alerts[-1].get("timestamp", first.get("timestamp")),
+    )
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+
+MAX_ATTEMPTS = 6
+BASE_DELAY = 5.0
+MAX_DELAY = 300.0
+
+PENDING = "pending"
+# Claimed by the relay (held in the coalescer or being delivered)
+CLAIMED = "claimed"
+DELIVERED = "delivered"
+FAILED = "failed"
+
+
+class AlertQueue:
+    """Durable SQLite queue for the relay. Claimed rows go back to pending on restart."""
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    delivered_at REAL,
+                    last_error TEXT
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_due ON alerts (status, next_attempt_at)")
+            # Anything claimed when the relay stopped was never confirmed delivered
+            self._conn.execute("UPDATE alerts SET status = ? WHERE status = ?", (PENDING, CLAIMED))
+
+    def put(self, alert, idempotency_key=None):
+        """Store an alert. Returns ``(alert_id, created)``; duplicates keep the original row."""
+        payload = json.dumps(alert, sort_keys=True, ensure_ascii=False)
+        key = idempotency_key or hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO alerts (idempotency_key, payload, next_attempt_at, enqueued_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            row = self._conn.execute("SELECT id FROM alerts WHERE idempotency_key = ?", (key,)).fetchone()
+        return row["id"], cursor.rowcount == 1
+
+    def claim_due(self, limit=50):
+        """Mark due pending alerts as claimed and return them as (id, alert, enqueued_at)."""
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, payload, enqueued_at FROM alerts WHERE status = ? AND next_attempt_at <= ? "
+                "ORDER BY id LIMIT ?",
+                (PENDING, now, limit),
+            ).fetchall()
+            self._conn.executemany("UPDATE alerts SET status = ? WHERE id = ?",
+                                   [(CLAIMED, row["id"]) for row in rows])
+        return [(row["id"], json.loads(row["payload"]), row["enqueued_at"]) for row in rows]
+
+    def ack(self, alert_ids):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE alerts SET status = ?, delivered_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(DELIVERED, now, alert_id) for alert_id in alert_ids],
+            )
+
+    def nack(self, alert_ids, error):
+        """Schedule a retry with jittered exponential backoff, or fail after max attempts."""
+        now = time.time()
+        with self._lock, self._conn:
+            for alert_id in alert_ids:
+                attempts = self._conn.execute(
+                    "SELECT attempts FROM alerts WHERE id = ?", (alert_id,)).fetchone()["attempts"] + 1
+                if attempts >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE alerts SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+                        (FAILED, attempts, error, alert_id))
+                    continue
+                delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1))) * random.uniform(0.5, 1.0)
+                self._conn.execute(
+                    "UPDATE alerts SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (PENDING, attempts, now + delay, error, alert_id))
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM alerts GROUP BY status").fetchall()
+        counts = {PENDING: 0, CLAIMED: 0, DELIVERED: 0, FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def prune(self, older_than_days=7):
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM alerts WHERE status IN (?, ?) AND enqueued_at < ?",
+                               (DELIVERED, FAILED, cutoff))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from alert_coalescer import AlertCoalescer, digest_alert_data
+from alert_queue import AlertQueue
+
+# Load environment variables
+load_dotenv()
+
+RELAY_HOST = os.getenv("RELAY_HOST", "localhost")
+RELAY_PORT = int(os.getenv("RELAY_PORT", "3978"))
+RELAY_QUEUE_PATH = os.getenv(
+    "RELAY_QUEUE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "relay_queue.db"))
+# Batches delivered to Teams / Power Automate at the same time
+DELIVERY_CONCURRENCY = int(os.getenv("RELAY_DELIVERY_CONCURRENCY", "4"))
+POLL_INTERVAL = 1.0
+LATENCY_SAMPLES = 1000
+
+
+def load_power_automate_sender():
+    """Power Automate fallback lives in the desktop client's power_automate_config.py."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        from power_automate_config import send_power_automate_alert
+        return send_power_automate_alert
+    except ImportError:
+        print("⚠️ Power Automate fallback not available")
+        return None
+
+
+class AlertRelay:
+    """Accepts alerts into a durable queue and delivers them with bounded concurrency."""
+
+    def __init__(self, queue, connector, power_automate=None, coalescer=None,
+                 concurrency=DELIVERY_CONCURRENCY, poll_interval=POLL_INTERVAL):
+        self.queue = queue
+        self.connector = connector
+        self.power_automate = power_automate
+        self.coalescer = coalescer or AlertCoalescer()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        # Senders and SQLite calls block, so they run here instead of on the event loop
+        self.executor = ThreadPoolExecutor(max_workers=concurrency + 1, thread_name_prefix="relay")
+        self.batches = None
+        self.wake = None
+        self.tasks = []
+        self.in_flight = 0
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+        self.delivered_by_channel = Counter()
+        self.digests_sent = 0
+        self.started_at = time.time()
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def start(self, app=None):
+        self.batches = asyncio.Queue()
+        self.wake = asyncio.Event()
+        await self.run_blocking(self.queue.prune)
+        self.tasks = [asyncio.create_task(self.dispatch_loop())]
+        self.tasks += [asyncio.create_task(self.delivery_worker()) for _ in range(self.concurrency)]
+        print(f"🚀 Alert relay started with {self.concurrency} delivery workers")
+
+    async def stop(self, app=None):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+        # Held and in-flight alerts stay claimed and are re-queued on the next start
+        self.queue.close()
+
+    async def handle_send_alert(self, request):
+        try:
+            alert = await request.json()
+        except Exception:
+            return web.json_response({"status": "error", "message": "Invalid JSON"}, status=400)
+        if not isinstance(alert, dict) or not alert.get("concern"):
+            return web.json_response({"status": "error", "message": "concern is required"}, status=400)
+        alert_id, created = await self.run_blocking(
+            self.queue.put, alert, request.headers.get("Idempotency-Key"))
+        if created:
+            self.wake.set()
+        return web.json_response(
+            {"status": "queued", "id": alert_id, "duplicate": not created,
+             "timestamp": datetime.now().isoformat()},
+            status=202)
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats(await self.run_blocking(self.queue.counts)))
+
+    async def handle_health(self, request):
+        return web.json_response({"status": "ok", "uptime_s": round(time.time() - self.started_at)})
+
+    def stats(self, queue_counts):
+        latencies = sorted(self.latencies_ms)
+        latency = {"count": len(latencies)}
+        if latencies:
+            latency.update({
+                "avg": round(sum(latencies) / len(latencies), 1),
+                "p50": round(latencies[len(latencies) // 2], 1),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                "max": round(latencies[-1], 1),
+            })
+        return {
+            "queue": queue_counts,
+            "held_in_coalescer": self.coalescer.pending_count(),
+            "batches_waiting": self.batches.qsize() if self.batches else 0,
+            "in_flight": self.in_flight,
+            "delivered_by_channel": dict(self.delivered_by_channel),
+            "digests_sent": self.digests_sent,
+            "delivery_latency_ms": latency,
+        }
+
+    async def dispatch_loop(self):
+        """Move due alerts from the durable queue through the coalescer into delivery batches."""
+        while True:
+            try:
+                for alert_id, alert, enqueued_at in await self.run_blocking(self.queue.claim_due):
+                    tagged = dict(alert, _relay_id=alert_id, _enqueued_at=enqueued_at)
+                    for batch in self.coalescer.add(tagged):
+                        self.batches.put_nowait(batch)
+                for batch in self.coalescer.due():
+                    self.batches.put_nowait(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Relay dispatch error: {e}")
+            next_due = self.coalescer.next_due_in()
+            timeout = self.poll_interval if next_due is None else min(self.poll_interval, next_due)
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+
+    async def delivery_worker(self):
+        while True:
+            batch = await self.batches.get()
+            self.in_flight += 1
+            try:
+                await self.deliver(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Relay delivery error: {e}")
+                await self.run_blocking(self.queue.nack, [a["_relay_id"] for a in batch], str(e))
+            finally:
+                self.in_flight -= 1
+
+    async def deliver(self, batch):
+        alert_ids = [alert["_relay_id"] for alert in batch]
+        alerts = [{k: v for k, v in alert.items() if not k.startswith("_relay")
+                   and k != "_enqueued_at"} for alert in batch]
+        if len(alerts) == 1:
+            result = await self.run_blocking(self.connector.send_alert_to_teams, alerts[0])
+        else:
+            result = await self.run_blocking(self.connector.send_digest_to_teams, alerts)
+        channel = "teams" if result.get("status") == "success" else None
+        if channel is None and self.power_automate:
+            if await self.run_blocking(self.power_automate, digest_alert_data(alerts)):
+                channel = "power_automate"
+        if channel is None:
+            await self.run_blocking(self.queue.nack, alert_ids, result.get("message", "delivery failed"))
+            print(f"❌ Relay could not deliver {len(alerts)} alert(s); will retry")
+            return
+        await self.run_blocking(self.queue.ack, alert_ids)
+        now = time.time()
+        self.latencies_ms.extend((now - alert["_enqueued_at"]) * 1000 for alert in batch)
+        self.delivered_by_channel[channel] += len(batch)
+        if len(batch) > 1:
+            self.digests_sent += 1
+        print(f"✅ Relay delivered {len(batch)} alert(s) via {channel}")
+
+
+RELAY_KEY = web.AppKey("relay", AlertRelay)
+
+
+def create_app(queue_path=RELAY_QUEUE_PATH, connector=None, power_automate=None, coalescer=None,
+               concurrency=DELIVERY_CONCURRENCY, poll_interval=POLL_INTERVAL):
+    if connector is None:
+        from teams_connector_cards import teams_connector
+        connector = teams_connector
+    relay = AlertRelay(AlertQueue(queue_path), connector, power_automate, coalescer, concurrency, poll_interval)
+    app = web.Application()
+    app[RELAY_KEY] = relay
+    app.router.add_post("/api/send-alert", relay.handle_send_alert)
+    app.router.add_get("/api/stats", relay.handle_stats)
+    app.router.add_get("/api/health", relay.handle_health)
+    app.on_startup.append(relay.start)
+    app.on_cleanup.append(relay.stop)
+    return app
+
+
+if __name__ == "__main__":
+    print(f"🤖 CASI alert relay listening on http://{RELAY_HOST}:{RELAY_PORT}")
+    web.run_app(create_app(power_automate=load_power_automate_sender()), host=RELAY_HOST, port=RELAY_PORT)
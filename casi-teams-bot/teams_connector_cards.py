@@ -1,50 +1,94 @@
 import json
+import random
 import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 import os
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 # Load environment variables
 load_dotenv()
 
+# Teams throttles webhooks with 429; retry with backoff, honouring Retry-After
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 30.0
+REQUEST_TIMEOUT = 30
+# Upper bound on all attempts and waits for one webhook
+TARGET_DEADLINE = 45
+
+# Card theme color by priority
+PRIORITY_COLORS = {
+    'Low': '00FF00',      # Green
+    'General': '0076D7',  # Blue
+    'High': 'FF8C00',     # Orange
+    'Critical': 'FF0000'  # Red
+}
+
 class TeamsConnectorCards:
-    def __init__(self):
+    def __init__(self, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT, target_deadline=TARGET_DEADLINE):
         # Get Teams webhook URLs from environment
         self.channel_webhook = os.getenv("TEAMS_CHANNEL_WEBHOOK", "")
         self.group_chat_webhook = os.getenv("TEAMS_GROUP_CHAT_WEBHOOK", "")
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.target_deadline = target_deadline
+        # One pooled session keeps TLS connections to Teams alive between alerts
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="teams-send")
         
     def send_alert_to_teams(self, alert_data):
         """Send IT alert to Teams using Connector Cards"""
         try:
             # Create Teams connector card with CASI branding
             connector_card = self.create_connector_card(alert_data)
-            
-            # Send to both Teams locations
-            success_count = 0
-            
-            # Send to Teams Channel
+            return self.send_card_to_teams(connector_card)
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to create Teams connector card: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            }
+    
+    def send_digest_to_teams(self, alerts):
+        """Send one digest card for a burst of similar IT alerts"""
+        try:
+            connector_card = self.create_digest_card(alerts)
+            return self.send_card_to_teams(connector_card)
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to create Teams digest card: {str(e)}",
+                "timestamp": datetime.now().isoformat()
+            }
+    
+    def send_card_to_teams(self, connector_card):
+        """Send a card to every configured Teams location concurrently"""
+        try:
+            targets = {}
             if self.channel_webhook:
-                channel_sent = self.send_to_teams_channel(connector_card)
-                if channel_sent:
-                    success_count += 1
-                    print("✅ Message sent to Teams Channel successfully")
-                else:
-                    print("❌ Failed to send to Teams Channel")
-            
-            # Send to Teams Group Chat
+                targets["channel"] = self.executor.submit(
+                    self.post_card, "Teams Channel", self.channel_webhook, connector_card)
             if self.group_chat_webhook:
-                group_sent = self.send_to_group_chat(connector_card)
-                if group_sent:
-                    success_count += 1
-                    print("✅ Message sent to Group Chat successfully")
-                else:
-                    print("❌ Failed to send to Group Chat")
+                targets["group_chat"] = self.executor.submit(
+                    self.post_card, "Group Chat", self.group_chat_webhook, connector_card)
+            target_results = {name: future.result() for name, future in targets.items()}
+            success_count = sum(1 for result in target_results.values() if result["sent"])
             
             if success_count > 0:
                 return {
                     "status": "success",
                     "message": f"Alert sent to {success_count} Teams location(s) via Connector Cards",
                     "connector_card": connector_card,
+                    "targets": target_results,
                     "timestamp": datetime.now().isoformat()
                 }
             else:
@@ -52,13 +96,14 @@ class TeamsConnectorCards:
                     "status": "error",
                     "message": "Failed to send to any Teams location",
                     "connector_card": connector_card,
+                    "targets": target_results,
                     "timestamp": datetime.now().isoformat()
                 }
                 
         except Exception as e:
             return {
                 "status": "error",
-                "message": f"Failed to create Teams connector card: {str(e)}",
+                "message": f"Failed to send Teams connector card: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
     
@@ -71,21 +116,8 @@ class TeamsConnectorCards:
         concern = alert_data.get('concern', 'No concern specified')
         timestamp = alert_data.get('timestamp', datetime.now().isoformat())
         
-        # Format timestamp
-        try:
-            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            formatted_time = dt.strftime("%m/%d/%Y %H:%M")
-        except:
-            formatted_time = timestamp
-        
-        # Set theme color based on priority
-        priority_colors = {
-            'Low': '00FF00',      # Green
-            'General': '0076D7',  # Blue
-            'High': 'FF8C00',     # Orange
-            'Critical': 'FF0000'  # Red
-        }
-        theme_color = priority_colors.get(priority, '0076D7')
+        formatted_time = self.format_timestamp(timestamp)
+        theme_color = PRIORITY_COLORS.get(priority, '0076D7')
         
         # Create clean, minimal connector card
         connector_card = {
@@ -97,67 +129,129 @@ class TeamsConnectorCards:
         
         return connector_card
     
+    def create_digest_card(self, alerts):
+        """Create one card summarising a burst of similar alerts"""
+        priority = alerts[0].get('priority', 'General')
+        concerns = []
+        for alert in alerts:
+            concern = alert.get('concern', 'No concern specified')
+            if concern not in concerns:
+                concerns.append(concern)
+        facts = [
+            {
+                "name": f"{alert.get('windows_user', 'Unknown')} ({alert.get('hostname', 'Unknown')})",
+                "value": f"{self.format_timestamp(alert.get('timestamp', datetime.now().isoformat()))} - "
+                         f"{alert.get('concern', 'No concern specified')}"
+            }
+            for alert in alerts
+        ]
+        users = {alert.get('windows_user', 'Unknown') for alert in alerts}
+        return {
+            "type": "MessageCard",
+            "themeColor": PRIORITY_COLORS.get(priority, '0076D7'),
+            "title": f"🚨 IT On Duty Digest - {len(alerts)} alerts from {len(users)} user(s) - {priority} Priority",
+            "text": "**Reported concerns:** " + "; ".join(concerns[:5]),
+            "sections": [{"activityTitle": "Affected users and hostnames", "facts": facts}]
+        }
+    
+    @staticmethod
+    def format_timestamp(timestamp):
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            return dt.strftime("%m/%d/%Y %H:%M")
+        except Exception:
+            return timestamp
+    
     def send_to_teams_channel(self, connector_card):
         """Send connector card to Teams channel"""
-        try:
-            if not self.channel_webhook:
-                print("❌ No Teams channel webhook configured")
-                return False
-            
-            print(f"📤 Sending connector card to Teams Channel...")
-            
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
-                self.channel_webhook,
-                headers=headers,
-                json=connector_card,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                print("✅ Connector card sent to Teams Channel successfully")
-                return True
-            else:
-                print(f"❌ Failed to send to Teams Channel: {response.status_code} - {response.text}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error sending to Teams Channel: {e}")
+        if not self.channel_webhook:
+            print("❌ No Teams channel webhook configured")
             return False
+        return self.post_card("Teams Channel", self.channel_webhook, connector_card)["sent"]
     
     def send_to_group_chat(self, connector_card):
         """Send connector card to Teams group chat"""
-        try:
-            if not self.group_chat_webhook:
-                print("❌ No Teams group chat webhook configured")
-                return False
-            
-            print(f"📤 Sending connector card to Group Chat...")
-            
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
-                self.group_chat_webhook,
-                headers=headers,
-                json=connector_card,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                print("✅ Connector card sent to Group Chat successfully")
-                return True
-            else:
-                print(f"❌ Failed to send to Group Chat: {response.status_code} - {response.text}")
-                return False
-                
-        except Exception as e:
-            print(f"❌ Error sending to Group Chat: {e}")
+        if not self.group_chat_webhook:
+            print("❌ No Teams group chat webhook configured")
             return False
+        return self.post_card("Group Chat", self.group_chat_webhook, connector_card)["sent"]
+    
+    def post_card(self, target, webhook_url, connector_card):
+        """POST a card to one webhook, retrying only when Teams cannot have accepted it.
+
+        A 429 or a refused or timed-out connect is retried; a read timeout, dropped
+        connection or 5xx may follow an accepted card, so retrying those could post
+        it twice. All attempts and waits for the target fit in ``target_deadline`` seconds.
+        Returns {"sent", "status_code", "attempts", "latency_ms"} for the target.
+        """
+        started = time.monotonic()
+        deadline = started + self.target_deadline
+        status_code = None
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            try:
+                print(f"📤 Sending connector card to {target}...")
+                timeout = min(self.timeout, max(0.1, deadline - time.monotonic()))
+                response = self.session.post(webhook_url, json=connector_card, timeout=timeout)
+                status_code = response.status_code
+                if status_code == 200:
+                    print(f"✅ Connector card sent to {target} successfully")
+                    break
+                print(f"❌ Failed to send to {target}: {status_code} - {response.text}")
+                if status_code != 429:
+                    break
+                retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+            except requests.exceptions.RequestException as e:
+                if self.never_sent(e):
+                    print(f"❌ Error sending to {target}: {e}")
+                else:
+                    print(f"❌ Error sending to {target}, not retrying (Teams may have accepted it): {e}")
+                    break
+            if attempt > self.max_retries:
+                break
+            delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+            if time.monotonic() + delay >= deadline:
+                print(f"⌛ Giving up on {target}: no time left for another attempt")
+                break
+            print(f"⏳ Retrying {target} in {delay:.1f}s (attempt {attempt + 1})")
+            time.sleep(delay)
+        return {
+            "sent": status_code == 200,
+            "status_code": status_code,
+            "attempts": attempt,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+    
+    @staticmethod
+    def backoff_delay(attempt):
+        """Exponential backoff with jitter."""
+        delay = min(MAX_BACKOFF, BACKOFF_BASE * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+    
+    @staticmethod
+    def never_sent(error):
+        """True when the request failed before reaching Teams (connect timeout or refused)."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+    
+    @staticmethod
+    def parse_retry_after(value):
+        """Retry-After is either delta-seconds or an HTTP date."""
+        if not value:
+            return None
+        try:
+            return min(MAX_BACKOFF, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return min(MAX_BACKOFF, max(0.0, retry_at.timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
     
     def get_bot_info(self):
         """Get bot information"""
@@ -0,0 +1,213 @@
+# Append-only chat history store for the CASI desktop client
+import json
+import os
+import threading
+import time
+
+# Retention policy applied during compaction
+HISTORY_MAX_MESSAGES = 500
+HISTORY_MAX_AGE_DAYS = 30
+# Compact once the log holds this many more lines than the retention limit
+COMPACT_SLACK = 250
+TAIL_CHUNK_SIZE = 64 * 1024
+
+
+class ChatHistoryStore:
+    """JSONL history log: O(1) appends, tail reads and background compaction."""
+
+    def __init__(self, path, max_messages=HISTORY_MAX_MESSAGES, max_age_days=HISTORY_MAX_AGE_DAYS,
+                 compact_slack=COMPACT_SLACK):
+        self.path = path
+        self.max_messages = max_messages
+        self.max_age_days = max_age_days
+        self.compact_slack = compact_slack
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._compact_thread = None
+        self._line_count = None
+        self._tail_checked = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def append(self, text, sender):
+        """Append one message as a single JSON line and fsync it."""
+        record = {"text": text, "sender": sender, "ts": time.time()}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._tail_checked:
+                if self._ends_with_partial_line():
+                    line = "\n" + line
+                self._tail_checked = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if self._line_count is not None:
+                self._line_count += 1
+            needs_compaction = self._needs_compaction()
+        if needs_compaction:
+            self.compact_in_background()
+        return record
+
+    def load_tail(self, limit=50):
+        """Return the last ``limit`` messages without reading the whole file."""
+        if limit <= 0 or not os.path.exists(self.path):
+            return []
+        with self._lock:
+            lines = self._read_tail_lines(limit)
+        messages = []
+        for line in lines:
+            record = self._parse_line(line)
+            if record is not None:
+                messages.append(record)
+        return messages[-limit:]
+
+    def clear(self):
+        """Drop all stored history."""
+        with self._lock:
+            self._atomic_write([])
+            self._line_count = 0
+
+    def compact_in_background(self):
+        """Start a compaction thread unless one is already running."""
+        with self._lock:
+            if self._compacting:
+                return self._compact_thread
+            self._compacting = True
+            self._compact_thread = threading.Thread(target=self._run_compaction, daemon=True)
+        self._compact_thread.start()
+        return self._compact_thread
+
+    def compact(self):
+        """Apply the retention policy and atomically replace the log.
+
+        The bulk of the file is read without holding the lock so appends keep
+        flowing; only lines appended during the read are copied under the lock.
+        """
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else None
+        if not os.path.exists(self.path):
+            return 0
+        with self._lock:
+            snapshot_size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            records = self._parse_block(f.read(snapshot_size))
+        with self._lock:
+            with open(self.path, "rb") as f:
+                f.seek(snapshot_size)
+                records.extend(self._parse_block(f.read()))
+            if cutoff is not None:
+                records = [r for r in records if r.get("ts", 0) >= cutoff]
+            if self.max_messages:
+                records = records[-self.max_messages:]
+            self._atomic_write(records)
+            self._line_count = len(records)
+            return len(records)
+
+    def migrate_legacy_json(self, legacy_path):
+        """Import a pre-JSONL ``chat_history.json`` list once, then rename it."""
+        if not os.path.exists(legacy_path) or os.path.abspath(legacy_path) == os.path.abspath(self.path):
+            return 0
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to read legacy chat history: {e}")
+            return 0
+        records = []
+        now = time.time()
+        for msg in legacy if isinstance(legacy, list) else []:
+            if isinstance(msg, (list, tuple)) and len(msg) == 2:
+                records.append({"text": msg[0], "sender": msg[1], "ts": now})
+            elif isinstance(msg, dict):
+                records.append({"text": msg.get("text", ""), "sender": msg.get("sender", "bot"), "ts": now})
+        with self._lock:
+            existing = []
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    existing = [r for r in (self._parse_line(line) for line in f) if r is not None]
+            self._atomic_write(records + existing)
+            self._line_count = len(records) + len(existing)
+        os.replace(legacy_path, legacy_path + ".migrated")
+        return len(records)
+
+    def _run_compaction(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Chat history compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _needs_compaction(self):
+        if not self.max_messages:
+            return False
+        if self._line_count is None:
+            self._line_count = self._count_lines()
+        return self._line_count > self.max_messages + self.compact_slack
+
+    def _ends_with_partial_line(self):
+        """True if a crash left the last append without its newline."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _count_lines(self):
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(TAIL_CHUNK_SIZE), b""):
+                count += chunk.count(b"\n")
+        return count
+
+    def _read_tail_lines(self, limit):
+        """Read backwards in fixed-size chunks until ``limit`` lines are found."""
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= limit:
+                step = min(TAIL_CHUNK_SIZE, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+        lines = data.split(b"\n")
+        if position > 0:
+            lines = lines[1:]  # first line may be partial
+        return [line.decode("utf-8", errors="replace") for line in lines if line.strip()][-limit:]
+
+    def _atomic_write(self, records):
+        """Write to a temp file, fsync, then rename over the log."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _parse_block(self, data):
+        records = []
+        for line in data.decode("utf-8", errors="replace").split("\n"):
+            record = self._parse_line(line)
+            if record is not None:
+                records.append(record)
+        return records
+
+    @staticmethod
+    def _parse_line(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A torn final line from a crash mid-append is skipped
+            return None
+        if not isinstance(record, dict) or "text" not in record:
+            return None
+        record.setdefault("sender", "bot")
+        return record
@@ -0,0 +1,84 @@
+"""
+Chat scenarios collected from the sequential test scripts
+(test_all_names_and_ceo.py, test_case_variations.py, test_casi_identity.py)
+and the CEO/company checks now in golden_answers.json. Used by load_test.py
+to build a realistic traffic mix.
+"""
+
+import random
+
+PEOPLE = [
+    "Maryles Casto", "Marc Casto", "Luz Bagtas", "Elaine Randrup", "Alwin Benedicto",
+    "George Anzures", "Ma. Berdandina Galvez", "Berlin Torres", "Voltaire Villaflores",
+    "Victor Villaflores",
+]
+
+
+def case_variations(text):
+    """The casings the test scripts cycle through for every query."""
+    return [text, text.upper(), text.lower(), text.title()]
+
+
+def _variants(*texts):
+    return [variant for text in texts for variant in case_variations(text)]
+
+
+# weight is the relative share of traffic; expect lists substrings a good answer contains
+SCENARIOS = {
+    "people": {
+        "weight": 4,
+        "queries": _variants(*(f"Who is {name}?" for name in PEOPLE)) + _variants("Tell me about George"),
+        "expect": [],
+    },
+    "ceo": {
+        "weight": 2,
+        "queries": _variants("Who is the CEO?", "Who is the current CEO?", "Tell me about the CEO",
+                             "Who runs the company?"),
+        "expect": ["marc casto"],
+    },
+    "leadership": {
+        "weight": 1,
+        "queries": _variants("Who are the leaders?", "Who is in charge?", "Who runs Casto Travel?"),
+        "expect": [],
+    },
+    "company": {
+        "weight": 2,
+        "queries": _variants("What is Casto Travel?", "What services does Casto Travel offer?"),
+        "expect": [],
+    },
+    "identity": {
+        "weight": 2,
+        "queries": _variants("What is your name?", "Who are you?", "What does CASI stand for?",
+                             "What does your name mean?", "Who built you?", "Who created you?",
+                             "What are you?", "Tell me about yourself"),
+        "expect": ["casi"],
+    },
+}
+
+
+def is_meaningful(response_text):
+    """Same success check the test scripts use for a 200 response."""
+    return len(response_text) > 20 and "error" not in response_text.lower()
+
+
+class ScenarioMix:
+    """Weighted random choice of (scenario name, query) pairs."""
+
+    def __init__(self, scenarios=None, only=None, seed=None):
+        scenarios = scenarios or SCENARIOS
+        if only:
+            unknown = set(only) - set(scenarios)
+            if unknown:
+                raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = {name: scenarios[name] for name in only}
+        self.scenarios = scenarios
+        self.names = list(scenarios)
+        self.weights = [scenarios[name]["weight"] for name in self.names]
+        self.random = random.Random(seed)
+
+    def next(self):
+        name = self.random.choices(self.names, self.weights)[0]
+        return name, self.random.choice(self.scenarios[name]["queries"])
+
+    def expected(self, name):
+        return self.scenarios[name].get("expect", [])
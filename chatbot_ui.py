@@ -1,41 +1,68 @@
-from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QWidget, QSizePolicy, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QHBoxLayout, QLabel, QMessageBox, QScrollArea, QInputDialog, QFileDialog, QProgressBar, QCheckBox
-from PyQt5.QtCore import Qt, QRect, QEasingCurve, QTimer, QPoint, QSize, QPropertyAnimation, QObject, pyqtProperty
-from PyQt5.QtGui import QIcon, QFont, QPainter, QColor, QBrush, QPixmap, QPainterPath, QTextOption, QCursor
+import time
+_STARTUP_T0 = time.perf_counter()  # Reference point for startup timing
+
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QWidget, QSizePolicy, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QHBoxLayout, QLabel, QMessageBox, QScrollArea, QInputDialog, QFileDialog, QProgressBar, QCheckBox, QProgressDialog
+from PyQt5.QtCore import Qt, QRect, QRectF, QEasingCurve, QTimer, QTimeLine, QElapsedTimer, QPoint, QSize, QPropertyAnimation, QObject, pyqtProperty, pyqtSignal, QDir, QLockFile
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from PyQt5.QtGui import QIcon, QFont, QPainter, QPen, QColor, QBrush, QPixmap, QPainterPath, QTextOption, QCursor
 from PyQt5.QtWidgets import QGraphicsOpacityEffect, QGraphicsDropShadowEffect
 import sys
 import requests
 import json
-from PyQt5.QtCore import QTimer
+import math
 from PyQt5.QtGui import QLinearGradient
-import win32com.client
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import msal
 import os
 import getpass
 from datetime import datetime
-import base64
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
 from collections import Counter
 import re
-import atexit
-import psutil
-import ctypes
-from ctypes import wintypes
 import socket
 from urllib.parse import urlparse
+from chat_history_store import ChatHistoryStore
+from graph_upload import GraphMailSender
+from alert_dispatch import AlertChannel, AlertDispatcher
+from outbox import Outbox, STATUS_FAILED, STATUS_RETRYING, STATUS_SENT
+from backend_selector import create_backend_selector
+from answer_cache import AnswerCache
 from config import get_backend_url, get_client_id, get_tenant_id, get_admin_email, get_teams_webhook_url, get_single_instance_enabled
 import logging
 
-MUTEX_NAME = "Global\\CASIAppMutex"
-
-SINGLE_INSTANCE_PORT = 54321  # Pick any unused port
-_single_instance_socket = None  # Global socket to keep it open
-
-# Backend configuration - now loaded from config
+# Backend configuration - now loaded from config ("auto" picks the fastest healthy backend)
 BACKEND_URL = get_backend_url()
 
+def _on_backend_change(previous, current):
+    print(f"[DEBUG] Backend switched from {previous.name} ({previous.url}) to {current.name} ({current.url})")
+
+def response_backend(response):
+    """Base URL of the backend that answered; each backend has its own kb_version."""
+    parsed = urlparse(response.url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+backend_selector = create_backend_selector(BACKEND_URL, on_change=_on_backend_change)
+# Append-only chat history log under %APPDATA%/CASI; only the tail is loaded at startup
+CHAT_HISTORY_FILE_NAME = "chat_history.jsonl"
+CHAT_HISTORY_TAIL_SIZE = 50
+# Local CASI Teams bot relay; the custom bot and Azure bot channels both post here
+CASI_BOT_ALERT_URL = "http://localhost:3978/api/send-alert"
+# Tickets and IT-on-duty alerts are queued under %APPDATA%/CASI and delivered in the background
+OUTBOX_FILE_NAME = "outbox.db"
+# Answers keyed on the normalized question under %APPDATA%/CASI, checked against each backend's kb_version
+ANSWER_CACHE_FILE_NAME = "answer_cache.json"
+# How long a chat request may take; sent to the backend so it answers (at least partially) in time
+CHAT_REQUEST_TIMEOUT = 8
+
+_startup_milestones = {}
+
+def report_startup_milestone(name):
+    """Print the time from process start to a startup milestone (once per name)."""
+    if name in _startup_milestones:
+        return _startup_milestones[name]
+    elapsed_ms = (time.perf_counter() - _STARTUP_T0) * 1000
+    _startup_milestones[name] = elapsed_ms
+    print(f"[STARTUP] {name}: {elapsed_ms:.0f} ms")
+    return elapsed_ms
+
 def test_backend_connectivity():
     """Test if the backend is reachable and return detailed error information."""
     import socket
@@ -43,9 +70,10 @@ def test_backend_connectivity():
     
     # Parse the backend URL
     from urllib.parse import urlparse
-    parsed_url = urlparse(BACKEND_URL)
+    backend_url = backend_selector.current_url()
+    parsed_url = urlparse(backend_url)
     host = parsed_url.hostname
-    port = parsed_url.port or 80
+    port = parsed_url.port or (443 if parsed_url.scheme == "https" else 80)
     
     # Test 1: Basic socket connection
     try:
@@ -60,7 +88,7 @@ def test_backend_connectivity():
     
     # Test 2: HTTP request - try chat endpoint to check if backend is reachable
     try:
-        response = requests.post(f"{BACKEND_URL}/chat", json={"message": "test"}, timeout=10)
+        response = requests.post(f"{backend_url}/chat", json={"message": "test"}, timeout=10)
         if response.status_code == 403:
             # 403 means the endpoint exists but requires authentication - this is expected
             return True, "Backend is reachable (authentication required)"
@@ -69,9 +97,9 @@ def test_backend_connectivity():
         else:
             return False, f"Backend responded with status code: {response.status_code}"
     except requests.exceptions.ConnectionError:
-        return False, f"Connection refused: Backend at {BACKEND_URL} is not responding"
+        return False, f"Connection refused: Backend at {backend_url} is not responding"
     except requests.exceptions.Timeout:
-        return False, f"Connection timeout: Backend at {BACKEND_URL} is not responding within 10 seconds"
+        return False, f"Connection timeout: Backend at {backend_url} is not responding within 10 seconds"
     except requests.exceptions.RequestException as e:
         return False, f"Request failed: {str(e)}"
     except Exception as e:
@@ -95,7 +123,7 @@ def get_network_diagnostics():
     
     # Get backend hostname
     from urllib.parse import urlparse
-    parsed_url = urlparse(BACKEND_URL)
+    parsed_url = urlparse(backend_selector.current_url())
     backend_host = parsed_url.hostname
     
     # Test DNS resolution
@@ -123,39 +151,72 @@ def get_network_diagnostics():
     
     return diagnostics
 
-def already_running_socket():
-    """Returns True if another instance is running, False otherwise."""
-    global _single_instance_socket
-    
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    try:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind(("127.0.0.1", SINGLE_INSTANCE_PORT))
-        # Keep the socket open for the life of the app
-        _single_instance_socket = s
-        import atexit
-        atexit.register(lambda: _single_instance_socket.close() if _single_instance_socket else None)
-        print("[DEBUG] Socket bind successful - no other instance running")
-        return False  # No other instance running
-    except socket.error as e:
-        print(f"[DEBUG] Socket already in use: {e} - another instance is running")
-        return True  # Port is already in use
-    except Exception as e:
-        print(f"[DEBUG] Socket detection error: {e}")
-        return False  # Assume not running if we can't determine
-
-class SingleInstance:
-    def __init__(self, mutexname=MUTEX_NAME):
-        self.mutexname = mutexname
-        self.kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-        self.mutex = self.kernel32.CreateMutexW(None, wintypes.BOOL(False), self.mutexname)
-        self.last_error = ctypes.GetLastError()
-        # Debug print for troubleshooting
-        print(f"[DEBUG] Mutex created, last_error={self.last_error}")
-
-    def already_running(self):
-        # ERROR_ALREADY_EXISTS == 183
-        return self.last_error == 183
+class SingleInstanceGuard(QObject):
+    """Per-user local socket server; a second launch asks the running instance to show itself."""
+
+    activation_requested = pyqtSignal()
+    CONNECT_TIMEOUT_MS = 500
+    LOCK_TIMEOUT_MS = 2000
+
+    def __init__(self, name=None):
+        super().__init__()
+        self.name = name or f"CASI-SingleInstance-{getpass.getuser()}"
+        self.server = None
+        self.lock = None
+
+    def notify_running_instance(self, message=b"show"):
+        """Send ``message`` to a running instance. Returns True if one answered."""
+        socket_ = QLocalSocket()
+        socket_.connectToServer(self.name)
+        if not socket_.waitForConnected(self.CONNECT_TIMEOUT_MS):
+            return False
+        socket_.write(message + b"\n")
+        socket_.flush()
+        socket_.waitForBytesWritten(self.CONNECT_TIMEOUT_MS)
+        socket_.disconnectFromServer()
+        print(f"[DEBUG] Sent '{message.decode()}' to running instance")
+        return True
+
+    def listen(self):
+        """Become the running instance and accept activation requests from later launches.
+
+        Returns False when another launch holds the instance lock (it may still be
+        starting up and not listening yet); that launch owns the socket, so this one
+        must not remove it.
+        """
+        self.lock = QLockFile(os.path.join(QDir.tempPath(), f"{self.name}.lock"))
+        # Never stale by age; a lock whose process has died is still taken over
+        self.lock.setStaleLockTime(0)
+        if not self.lock.tryLock(self.LOCK_TIMEOUT_MS):
+            print("[DEBUG] Another instance holds the single instance lock")
+            return False
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        if not self.server.listen(self.name):
+            # We hold the lock, so no live instance owns the socket: it was left by a crash
+            QLocalServer.removeServer(self.name)
+            if not self.server.listen(self.name):
+                # Still the only instance (later launches fail the lock and exit), but they cannot show us
+                print(f"[DEBUG] Warning: single instance server failed: {self.server.errorString()}; "
+                      "later launches will exit without showing this window")
+                return True
+        self.server.newConnection.connect(self._on_new_connection)
+        print(f"[DEBUG] Single instance server listening on {self.name}")
+        return True
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda c=connection: self._read_message(c))
+            connection.disconnected.connect(connection.deleteLater)
+            if connection.bytesAvailable():
+                self._read_message(connection)
+
+    def _read_message(self, connection):
+        data = bytes(connection.readAll())
+        if b"show" in data:
+            print("[DEBUG] Activation requested by a second launch")
+            self.activation_requested.emit()
 
 class MultiLineInputDialog(QDialog):
     def __init__(self, title, label, parent=None, prefill_text=None):
@@ -325,7 +386,7 @@ def send_teams_message(message):
         print(f"Failed to send Teams message: {e}")
         return False
 
-def send_teams_message_as_casi_bot(message_data):
+def send_teams_message_as_casi_bot(message_data, timeout=30):
     """Send Teams message as CASI bot using webhook with bot identity."""
     try:
         # Create a message that will appear to come from CASI bot
@@ -394,7 +455,7 @@ def send_teams_message_as_casi_bot(message_data):
             TEAMS_WEBHOOK_URL, 
             headers=headers, 
             json=teams_message, 
-            timeout=30
+            timeout=timeout
         )
         
         if response.status_code == 200:
@@ -410,6 +471,26 @@ def send_teams_message_as_casi_bot(message_data):
 
 # Power Automate function removed - now using Azure Bot
 
+def deliver_helpdesk_email(payload, progress_callback=None):
+    """Outbox handler: send a helpdesk ticket through Microsoft Graph."""
+    access_token = get_user_token_silent(payload["client_id"], payload["tenant_id"])
+    if not access_token:
+        raise Exception("Office 365 sign-in required")
+    sender = GraphMailSender(access_token)
+    sender_email = sender.get_sender_address()
+    body = (
+        f"User request from CASI:\n"
+        f"Sender: {sender_email}\n"
+        f"Windows login: {payload['username']}\n"
+        f"Priority: {payload['priority']}\n\n"
+        f"Issue:\n{payload['user_message']}\n\n"
+        f"Conversation Summary:\n{payload['conversation_summary']}"
+    )
+    attachments = [payload["attachment_path"]] if payload.get("attachment_path") else []
+    return sender.send_mail(payload["to_email"], payload["subject"], body, attachments,
+                            progress_callback=progress_callback)
+
+
 
 class AnimatedButton(QPushButton):
     def __init__(self, text, parent=None):
@@ -504,13 +585,165 @@ class MinimizedWidget(QWidget):
 
         
 
+class TypingIndicator(QWidget):
+    """Paint-based typing indicator driven by a single QTimeLine.
+
+    The logo pulse, bubble glow and dots are all drawn in paintEvent from one
+    timeline frame, so there is no stylesheet churn or relayout per tick. The
+    timeline is paused whenever the widget is hidden (window hidden or minimized).
+
+    Idle CPU against the old four-timer indicator (measure_typing_indicator_cpu.py):
+    about 5x lower while shown and animating, and over 10x lower only when the
+    window is hidden, where the paused timeline costs nothing. Each shown frame
+    is still a wakeup and a repaint, so the frame rate sets the shown cost.
+    """
+    CYCLE_MS = 1600       # one pulse / dots cycle
+    FRAMES_PER_CYCLE = 4   # 2.5 repaints per second, each a blit of a cached frame
+    THINKING_MS = 2000    # "thinking" before switching to "typing"
+    DOT_COUNT = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("typing_indicator")
+        self.setFixedHeight(60)
+        self.setMinimumWidth(320)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+
+        logo = QPixmap(resource_path("CASInew-nbg.png"))
+        self.logo_pixmap = logo.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation) if not logo.isNull() else None
+        self.text_font = QFont("Segoe UI", 10)
+        self.dots_font = QFont("Segoe UI", 11)
+        self.frame = 0
+        self.elapsed = QElapsedTimer()
+        self.frame_cache = {}
+        self.frame_cache_width = None
+
+        self.timeline = QTimeLine(self.CYCLE_MS, self)
+        self.timeline.setFrameRange(0, self.FRAMES_PER_CYCLE - 1)
+        self.timeline.setUpdateInterval(self.CYCLE_MS // self.FRAMES_PER_CYCLE)
+        self.timeline.setCurveShape(QTimeLine.LinearCurve)
+        self.timeline.setLoopCount(0)  # loop forever
+        self.timeline.frameChanged.connect(self._on_frame)
+
+    def start(self):
+        """Start the animation with a short fade-in."""
+        self.elapsed.start()
+        effect = QGraphicsOpacityEffect(self)
+        effect.setOpacity(0.0)
+        self.setGraphicsEffect(effect)
+        fade = QPropertyAnimation(effect, b"opacity", self)
+        fade.setDuration(300)
+        fade.setStartValue(0.0)
+        fade.setEndValue(1.0)
+        fade.setEasingCurve(QEasingCurve.OutCubic)
+        # Drop the effect afterwards so repaints are not rendered off-screen
+        fade.finished.connect(lambda: self.setGraphicsEffect(None))
+        fade.start()
+        self._fade_anim = fade
+        if self.isVisible():
+            self.timeline.start()
+
+    def stop(self):
+        self.timeline.stop()
+
+    def showEvent(self, event):
+        if self.elapsed.isValid():
+            if self.timeline.state() == QTimeLine.Paused:
+                self.timeline.resume()
+            elif self.timeline.state() == QTimeLine.NotRunning:
+                self.timeline.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        if self.timeline.state() == QTimeLine.Running:
+            self.timeline.setPaused(True)
+        super().hideEvent(event)
+
+    def _on_frame(self, frame):
+        self.frame = frame
+        self.update()
+
+    def paintEvent(self, event):
+        # Text and antialiased shapes cost milliseconds per paint; each distinct frame is drawn
+        # once and later repaints only blit it
+        thinking = not self.elapsed.isValid() or self.elapsed.elapsed() < self.THINKING_MS
+        key = (self.frame, thinking)
+        if self.frame_cache_width != self.width():
+            self.frame_cache.clear()
+            self.frame_cache_width = self.width()
+        pixmap = self.frame_cache.get(key)
+        if pixmap is None:
+            pixmap = self._render_frame(self.frame, thinking)
+            self.frame_cache[key] = pixmap
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.end()
+
+    def _render_frame(self, frame, thinking):
+        pixmap = QPixmap(self.size() * self.devicePixelRatioF())
+        pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        phase = frame / float(self.FRAMES_PER_CYCLE)
+        pulse = (1 - math.cos(2 * math.pi * phase)) / 2  # 0 -> 1 -> 0 per cycle
+
+        # Logo with subtle breathing
+        scale = 0.98 + 0.04 * pulse
+        logo_rect = QRectF(16, 10, 40, 40)
+        painter.setPen(QPen(QColor("#e9ecef"), 1))
+        painter.setBrush(QColor("#ffffff"))
+        painter.drawEllipse(logo_rect.center(), 20 * scale, 20 * scale)
+        if self.logo_pixmap is not None:
+            size = 32 * scale
+            target = QRectF(logo_rect.center().x() - size / 2, logo_rect.center().y() - size / 2, size, size)
+            painter.drawPixmap(target, self.logo_pixmap, QRectF(self.logo_pixmap.rect()))
+
+        # Message bubble glow between the idle and highlight colours
+        bubble_rect = QRectF(68, 6, max(self.width() - 84, 200), 48)
+        painter.setPen(QPen(self._mix("#e9ecef", "#007bff", pulse), 1))
+        painter.setBrush(self._mix("#ffffff", "#f8f9ff", pulse))
+        painter.drawRoundedRect(bubble_rect, 18, 18)
+
+        text = "CASI is thinking" if thinking else "CASI is typing"
+        painter.setFont(self.text_font)
+        painter.setPen(self._mix("#6c757d", "#495057", pulse))
+        text_rect = bubble_rect.adjusted(20, 0, -20, 0)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+
+        # Wave of filled / empty dots after the text
+        filled = int(phase * self.DOT_COUNT)
+        dots = "".join("●" if i < filled else "○" for i in range(self.DOT_COUNT))
+        text_width = painter.fontMetrics().horizontalAdvance(text)
+        painter.setFont(self.dots_font)
+        painter.setPen(QColor("#6c757d"))
+        painter.drawText(text_rect.adjusted(text_width + 8, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter, dots)
+        painter.end()
+        return pixmap
+
+    @staticmethod
+    def _mix(start, end, t):
+        a, b = QColor(start), QColor(end)
+        return QColor(
+            int(a.red() + (b.red() - a.red()) * t),
+            int(a.green() + (b.green() - a.green()) * t),
+            int(a.blue() + (b.blue() - a.blue()) * t),
+        )
+
+
+class OutboxBridge(QObject):
+    """Carries outbox worker-thread events to the GUI thread."""
+
+    status_changed = pyqtSignal(int, str, str, str, int)
+    upload_progress = pyqtSignal(int, int)
+
+
 class ChatbotWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.gradient_shift = 0
-        self.gradient_timer = QTimer(self)
-        self.gradient_timer.start(40)
         self.conversation_history = []
+        self.history_store = ChatHistoryStore(os.path.join(os.getenv("APPDATA"), "CASI", CHAT_HISTORY_FILE_NAME))
+        self.answer_cache = AnswerCache(os.path.join(os.getenv("APPDATA"), "CASI", ANSWER_CACHE_FILE_NAME))
         self.user_first_name = "User"
         self.default_user_pixmap = get_circular_pixmap("default_user.png", 36)
         self.user_pixmap = self.default_user_pixmap
@@ -518,13 +751,37 @@ class ChatbotWidget(QWidget):
         self.normal_size = (460, 580)  # Current size
         self.maximized_size = (600, 750)  # Larger size for maximize
         self.last_position = None  # Store last position for system tray restore
-        self.initUI()
+        self.ui_built = False  # initUI runs on first expand, not at startup
+        self.pending_status_messages = []  # Outbox updates that arrive before the UI exists
+        self.upload_progress_dialog = None
+        self.outbox_bridge = OutboxBridge()
+        self.outbox_bridge.status_changed.connect(self.on_outbox_status)
+        self.outbox_bridge.upload_progress.connect(self.on_upload_progress)
+        self.outbox = Outbox(os.path.join(os.getenv("APPDATA"), "CASI", OUTBOX_FILE_NAME),
+                             on_status=self.outbox_bridge.status_changed.emit)
+        self.alert_dispatcher = AlertDispatcher(self.build_alert_channels())
+        self.outbox.register("it_on_duty", self.deliver_it_on_duty_alert)
+        self.outbox.register(
+            "helpdesk_email",
+            lambda payload: deliver_helpdesk_email(payload, self.outbox_bridge.upload_progress.emit))
+        self.outbox.start()  # Resumes anything left pending by a previous run
         self.oldPos = self.pos()
-        self.typing_animation_timer = None
-        self.typing_dot_count = 0
-        
+        self.typing_indicator = None
+
+    def ensure_ui(self):
+        """Build the widget tree and load recent history the first time the window is shown."""
+        if self.ui_built:
+            return
+        self.ui_built = True
+        started = time.perf_counter()
+        self.initUI()
+        self.load_chat_history()
+        for message in self.pending_status_messages:
+            self.add_message_bubble(message, sender="bot")
+        self.pending_status_messages = []
         # Install event filter to detect window state changes
         self.installEventFilter(self)
+        print(f"[STARTUP] Main window built in {(time.perf_counter() - started) * 1000:.0f} ms")
 
     
     def fetch_user_profile(self, access_token):
@@ -577,6 +834,7 @@ class ChatbotWidget(QWidget):
             print(f"Failed to open link {url}: {e}")
 
     def fade_in(self, duration=350):
+        self.ensure_ui()
         self.setWindowOpacity(0)
         self.show()
         anim = QPropertyAnimation(self, b"windowOpacity")
@@ -1192,8 +1450,11 @@ class ChatbotWidget(QWidget):
 
     def minimize_widget(self):
         """Minimize the chatbot window to a small icon."""
-        self.fade_out()
-        QTimer.singleShot(300, self._show_minimized_widget)
+        if self.isVisible():
+            self.fade_out()
+            QTimer.singleShot(300, self._show_minimized_widget)
+        else:
+            self._show_minimized_widget()  # Startup: nothing to fade out
         
         # Show notification that app is minimized to system tray
         if hasattr(self, 'system_tray') and self.system_tray:
@@ -1207,7 +1468,9 @@ class ChatbotWidget(QWidget):
     def _show_minimized_widget(self):
         self.minimized_widget = MinimizedWidget(self)
         move_to_right_middle(self.minimized_widget)
-        self.minimized_widget.show()    
+        self.minimized_widget.show()
+        # Reported once the event loop is idle with the minimized widget on screen
+        QTimer.singleShot(0, lambda: report_startup_milestone("time-to-first-interaction"))
 
     def start_typing_animation(self):
         """Start the enhanced animated typing indicator for the bot."""
@@ -1236,41 +1499,62 @@ class ChatbotWidget(QWidget):
 
         # ADD THIS LINE:
         self.conversation_history.append((user_text, "user"))
+        self.save_chat_history(user_text, "user")
+
+        # Recently validated answers are shown at once, without a round trip. The cache is
+        # split by whether the request carries a token, so look up with the token we will send
+        access_token = self.get_access_token()
+        cached, state = self.answer_cache.lookup(user_text, bool(access_token))
+        if state == "fresh":
+            print("[DEBUG] Answer served from local cache")
+            self.display_bot_response(cached["answer"], cached["options"])
+            return
 
         # Show typing indicator
         self.show_typing_indicator()
 
         # Get bot response with typing delay
-        QTimer.singleShot(800, lambda: self.get_bot_response(user_text))  # Slight delay to show typing
+        QTimer.singleShot(800, lambda: self.get_bot_response(user_text, cached, access_token))  # Slight delay to show typing
+
+    def get_access_token(self):
+        """Access token for /chat, or None (anonymous mode) when not signed in or the token cannot be refreshed."""
+        cache_path = os.path.join(os.getenv("APPDATA"), "CASI", "token_cache.json")
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            access_token = get_user_token(get_client_id(), get_tenant_id(), cache_path)
+            print(f"[DEBUG] Access token obtained successfully")
+            return access_token
+        except Exception as e:
+            print(f"[DEBUG] Failed to get access token: {e}")
+            return None
 
-    def get_bot_response(self, user_text):
+    def revalidate_cached_answers(self, cached):
+        """Ask the backend whether the cached answer's kb_version is still current (a 304 costs no answer generation)."""
+        kb_version = cached["kb_version"]
+        try:
+            response = backend_selector.get("/kb-version", headers={"If-None-Match": f'"{kb_version}"'}, timeout=3)
+        except requests.exceptions.RequestException as e:
+            print(f"[DEBUG] Could not revalidate answer cache: {e}")
+            return False
+        backend = response_backend(response)
+        if response.status_code == 304 and backend == cached.get("backend", ""):
+            self.answer_cache.mark_validated(kb_version, backend)
+            return True
+        if response.status_code == 200:
+            self.answer_cache.observe_version(response.json().get("kb_version"), backend)
+        return False
+
+    def get_bot_response(self, user_text, cached=None, access_token=None):
         """Fetch and display the bot's response."""
         try:
-            print(f"[DEBUG] Attempting to connect to backend at: {BACKEND_URL}/chat")
-            
-            # Test backend connectivity first
-            is_connected, connection_msg = test_backend_connectivity()
-            if not is_connected:
-                print(f"[DEBUG] Backend connectivity test failed: {connection_msg}")
-                # Get network diagnostics for better error reporting
-                diagnostics = get_network_diagnostics()
-                diagnostic_text = "\n".join(diagnostics)
-                bot_response = f"Network Error: Cannot connect to the server.\n\nDiagnostics:\n{diagnostic_text}\n\nPlease check:\n1. Your network connection\n2. Firewall settings\n3. Contact IT if the issue persists."
-                options = []
-                self.display_bot_response(bot_response, options)
+            if cached is not None and self.revalidate_cached_answers(cached):
+                print("[DEBUG] Cached answer revalidated; knowledge base unchanged")
+                self.display_bot_response(cached["answer"], cached["options"])
                 return
-            
-            # Get access token if user is logged in
-            access_token = None
-            cache_path = os.path.join(os.getenv("APPDATA"), "CASI", "token_cache.json")
-            if os.path.exists(cache_path):
-                try:
-                    client_id = get_client_id()
-                    tenant_id = get_tenant_id()
-                    access_token = get_user_token(client_id, tenant_id, cache_path)
-                    print(f"[DEBUG] Access token obtained successfully")
-                except Exception as e:
-                    print(f"[DEBUG] Failed to get access token: {e}")
+
+            # The selector probes backends in the background, so no per-message connectivity test
+            print(f"[DEBUG] Attempting to connect to backend at: {backend_selector.current_url()}/chat")
             
             # Prepare request payload
             payload = {"message": user_text}
@@ -1280,8 +1564,9 @@ class ChatbotWidget(QWidget):
             else:
                 print(f"[DEBUG] Sending request without access token (anonymous mode)")
             
-            response = requests.post(f"{BACKEND_URL}/chat", json=payload, timeout=8)
-            print(f"[DEBUG] Backend response status: {response.status_code}")
+            response = backend_selector.post("/chat", json=payload, timeout=CHAT_REQUEST_TIMEOUT,
+                                             headers={"X-Request-Timeout-Ms": str(CHAT_REQUEST_TIMEOUT * 1000)})
+            print(f"[DEBUG] Backend response status: {response.status_code} from {response.url}")
             
             if response.status_code == 200:
                 response_data = response.json()
@@ -1293,9 +1578,20 @@ class ChatbotWidget(QWidget):
                     guest_message = response_data.get("message", "")
                     if guest_message:
                         bot_response = f"{bot_response}\n\n{guest_message}"
+
+                kb_version = response_data.get("kb_version")
+                backend = response_backend(response)
+                if kb_version and response_data.get("cacheable"):
+                    self.answer_cache.store(user_text, bool(access_token), bot_response, kb_version, options,
+                                            backend)
+                else:
+                    self.answer_cache.observe_version(kb_version, backend)
             else:
                 print(f"[DEBUG] Backend error response: {response.text}")
-                if response.status_code == 500:
+                if response.status_code == 503:
+                    retry_after = response.headers.get("Retry-After", "a few")
+                    bot_response = f"CASI is handling a lot of requests right now. Please try again in {retry_after} seconds. ⏳"
+                elif response.status_code == 500:
                     bot_response = "Error: Server error occurred. Please try again later."
                 elif response.status_code == 404:
                     bot_response = "Error: Backend endpoint not found. Please contact IT support."
@@ -1306,7 +1602,7 @@ class ChatbotWidget(QWidget):
             print(f"[DEBUG] Connection error: {e}")
             diagnostics = get_network_diagnostics()
             diagnostic_text = "\n".join(diagnostics)
-            bot_response = f"Connection Error: Cannot reach the server at {BACKEND_URL}.\n\nDiagnostics:\n{diagnostic_text}\n\nPossible solutions:\n1. Check your internet connection\n2. Contact IT to verify server status\n3. Check if you're on the correct network"
+            bot_response = f"Connection Error: Cannot reach any CASI server (last tried {backend_selector.current_url()}).\n\nDiagnostics:\n{diagnostic_text}\n\nPossible solutions:\n1. Check your internet connection\n2. Contact IT to verify server status\n3. Check if you're on the correct network"
             options = []
         except requests.exceptions.Timeout as e:
             print(f"[DEBUG] Timeout error: {e}")
@@ -1330,6 +1626,7 @@ class ChatbotWidget(QWidget):
         self.hide_typing_indicator()
         
         self.add_message_bubble(bot_response, sender="bot")
+        self.save_chat_history(bot_response, "bot")
 
         # Clear previous buttons
         while self.button_layout.count():
@@ -1376,27 +1673,22 @@ class ChatbotWidget(QWidget):
 
         clear_layout(self.chat_display_layout)
 
-    def save_chat_history(self):
-        """Save conversation history to a file."""
+    def save_chat_history(self, text, sender):
+        """Append one message to the persistent history log."""
         try:
-            with open(CHAT_HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.conversation_history, f, ensure_ascii=False, indent=2)
+            self.history_store.append(text, sender)
         except Exception as e:
             print(f"Failed to save chat history: {e}")
 
-    def load_chat_history(self):
-        """Load conversation history from a file."""
+    def load_chat_history(self, limit=CHAT_HISTORY_TAIL_SIZE):
+        """Load the most recent messages from the history log."""
         try:
-            if os.path.exists(CHAT_HISTORY_FILE):
-                with open(CHAT_HISTORY_FILE, "r", encoding="utf-8") as f:
-                    self.conversation_history = json.load(f)
-                    # Display loaded history
-                    for msg in self.conversation_history:
-                        if isinstance(msg, (list, tuple)) and len(msg) == 2:
-                            text, sender = msg
-                            self.add_message_bubble(text, sender=sender)
-                        elif isinstance(msg, dict):
-                            self.add_message_bubble(msg.get("text", ""), sender=msg.get("sender", "bot"))
+            self.history_store.migrate_legacy_json(LEGACY_CHAT_HISTORY_FILE)
+            records = self.history_store.load_tail(limit)
+            self.conversation_history = [(r["text"], r["sender"]) for r in records]
+            # Display loaded history
+            for text, sender in self.conversation_history:
+                self.add_message_bubble(text, sender=sender)
         except Exception as e:
             print(f"Failed to load chat history: {e}")
 
@@ -1749,260 +2041,25 @@ class ChatbotWidget(QWidget):
 
     def show_typing_indicator(self):
         """Show CASI typing indicator with enhanced clean design"""
-        # Create typing indicator container
-        typing_container = QWidget()
-        typing_container.setObjectName("typing_indicator")
-        typing_container.setFixedHeight(60)
-        
-        # Main layout with proper spacing
-        typing_layout = QHBoxLayout(typing_container)
-        typing_layout.setSpacing(12)
-        typing_layout.setContentsMargins(16, 8, 16, 8)
-        typing_layout.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-
-        # Enhanced CASI logo with modern styling
-        logo_container = QWidget()
-        logo_container.setFixedSize(40, 40)
-        logo_container.setObjectName("typing_logo_container")
-        
-        logo_label = QLabel(logo_container)
-        logo_pixmap = QPixmap("CASInew-nbg.png")
-        if not logo_pixmap.isNull():
-            logo_label.setPixmap(logo_pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        logo_label.setFixedSize(32, 32)
-        logo_label.move(4, 4)
-        
-        # Modern logo styling with subtle shadow and border
-        logo_container.setStyleSheet("""
-            QWidget#typing_logo_container {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                    stop:0 #ffffff, stop:1 #f8f9fa);
-                border: 1px solid #e9ecef;
-                border-radius: 20px;
-                box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-            }
-        """)
-
-        # Typing message with clean, modern design
-        typing_label = QLabel("CASI is thinking")
-        typing_label.setWordWrap(True)
-        typing_label.setMaximumWidth(450)  # Increased to match new message bubble width
-        typing_label.setMinimumWidth(280)   # Increased to match new message bubble width
-        typing_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        typing_label.setObjectName("typing_message")
-        
-        # Clean, modern styling
-        typing_label.setStyleSheet("""
-            QLabel#typing_message {
-                background: #ffffff;
-                color: #6c757d;
-                border: 1px solid #e9ecef;
-                border-radius: 18px;
-                padding: 16px 20px;  /* Increased padding to match message bubbles */
-                font-size: 14px;
-                font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
-                font-weight: 400;
-                line-height: 1.6;  /* Increased line height to match message bubbles */
-                min-height: 24px;
-            }
-        """)
-
-        # Animated typing dots
-        dots_label = QLabel("")
-        dots_label.setObjectName("typing_dots")
-        dots_label.setStyleSheet("""
-            QLabel#typing_dots {
-                color: #6c757d;
-                font-size: 16px;
-                font-weight: 300;
-                margin-left: 4px;
-            }
-        """)
-
-        # Add widgets to layout
-        typing_layout.addWidget(logo_container)
-        typing_layout.addWidget(typing_label)
-        typing_layout.addWidget(dots_label)
-        typing_layout.addStretch()
-
-        # Enhanced animation system with better timing
-        self.typing_animation_timer = QTimer()
-        self.typing_phase = 0
-        self.typing_dots_count = 0
-        self.thinking_timer = QTimer()
-        
-        def update_typing_animation():
-            # Phase 1: "thinking" (2 seconds)
-            # Phase 2: "typing" with animated dots (continuous)
-            if self.typing_phase == 0:
-                typing_label.setText("CASI is thinking")
-                self.typing_phase = 1
-                # Start thinking timer to transition to typing
-                self.thinking_timer.singleShot(2000, lambda: set_typing_phase())
-            elif self.typing_phase == 1:
-                # This will be handled by the thinking timer
-                pass
-            elif self.typing_phase == 2:
-                # Already in typing phase, just continue
-                pass
-        
-        def set_typing_phase():
-            if self.typing_phase == 1:  # Only change if still in thinking phase
-                typing_label.setText("CASI is typing")
-                self.typing_phase = 2
-        
-        self.typing_animation_timer.timeout.connect(update_typing_animation)
-        self.typing_animation_timer.start(1000)  # Slower for better user experience
-
-        # Subtle logo breathing animation
-        self.logo_breathing_timer = QTimer()
-        self.logo_scale = 1.0
-        self.logo_breathing_direction = 1
-        
-        def update_logo_breathing():
-            if self.logo_breathing_direction == 1:
-                self.logo_scale += 0.005
-                if self.logo_scale >= 1.02:
-                    self.logo_scale = 1.02
-                    self.logo_breathing_direction = -1
-            else:
-                self.logo_scale -= 0.005
-                if self.logo_scale <= 0.98:
-                    self.logo_scale = 0.98
-                    self.logo_breathing_direction = 1
-            
-            # Apply subtle scale effect
-            logo_container.setFixedSize(int(40 * self.logo_scale), int(40 * self.logo_scale))
-            logo_label.setFixedSize(int(32 * self.logo_scale), int(32 * self.logo_scale))
-            logo_label.move(int(4 * self.logo_scale), int(4 * self.logo_scale))
-        
-        self.logo_breathing_timer.timeout.connect(update_logo_breathing)
-        self.logo_breathing_timer.start(80)  # Very subtle breathing
-
-        # Enhanced typing dots animation with different characters
-        self.typing_dots_timer = QTimer()
-        self.dots_animation_phase = 0
-        self.dots_characters = ["●", "●", "●", "●"]
-        
-        def update_typing_dots():
-            # Create a wave-like dot animation
-            if self.typing_phase >= 1:
-                # Animate dots with different opacities
-                dots_text = ""
-                for i in range(4):
-                    if i < (self.dots_animation_phase % 4):
-                        dots_text += "●"  # Full opacity
-                    else:
-                        dots_text += "○"  # Empty circle for variety
-                dots_label.setText(dots_text)
-                self.dots_animation_phase += 1
-        
-        self.typing_dots_timer.timeout.connect(update_typing_dots)
-        self.typing_dots_timer.start(400)  # Slightly slower for better visibility
-        
-        # Enhanced message pulse effect using opacity and border changes
-        self.message_pulse_timer = QTimer()
-        self.message_pulse_phase = 0
-        
-        def update_message_pulse():
-            # Create a subtle breathing effect using border and background changes
-            if self.message_pulse_phase == 0:
-                # Phase 1: Subtle border glow with slight background change
-                typing_label.setStyleSheet("""
-                    QLabel#typing_message {
-                        background: #f8f9ff;
-                        color: #495057;
-                        border: 1px solid #007bff;
-                        border-radius: 18px;
-                        padding: 16px 20px;
-                        font-size: 14px;
-                        font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
-                        font-weight: 400;
-                        line-height: 1.6;
-                        min-height: 24px;
-                    }
-                """)
-                self.message_pulse_phase = 1
-            elif self.message_pulse_phase == 1:
-                # Phase 2: Return to normal with smooth transition
-                typing_label.setStyleSheet("""
-                    QLabel#typing_message {
-                        background: #ffffff;
-                        color: #6c757d;
-                        border: 1px solid #e9ecef;
-                        border-radius: 18px;
-                        padding: 16px 20px;
-                        font-size: 14px;
-                        font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
-                        font-weight: 400;
-                        line-height: 1.6;
-                        min-height: 24px;
-                    }
-                """)
-                self.message_pulse_phase = 0
-        
-        self.message_pulse_timer.timeout.connect(update_message_pulse)
-        self.message_pulse_timer.start(800)  # Slower, more subtle pulse
+        # Only one indicator at a time
+        self.hide_typing_indicator()
+        self.typing_indicator = TypingIndicator()
+        self.chat_display_layout.addWidget(self.typing_indicator)
+        self.typing_indicator.start()
 
-        # Add to chat display with enhanced styling
-        typing_container.setStyleSheet("""
-            QWidget#typing_indicator {
-                background: transparent;
-                margin: 8px 0px;
-                padding: 4px;
-                border-radius: 20px;
-            }
-        """)
-        
-        # Add subtle shadow effect using QGraphicsDropShadowEffect
-        shadow_effect = QGraphicsDropShadowEffect()
-        shadow_effect.setBlurRadius(15)
-        shadow_effect.setColor(QColor(0, 0, 0, 30))
-        shadow_effect.setOffset(0, 2)
-        typing_container.setGraphicsEffect(shadow_effect)
-        
-        self.chat_display_layout.addWidget(typing_container)
-        
-        # Add entrance animation with fade-in effect
-        fade_in_effect = QGraphicsOpacityEffect(typing_container)
-        typing_container.setGraphicsEffect(fade_in_effect)
-        fade_in_effect.setOpacity(0.0)
-        
-        # Animate fade in
-        fade_in_animation = QPropertyAnimation(fade_in_effect, b"opacity")
-        fade_in_animation.setDuration(300)
-        fade_in_animation.setStartValue(0.0)
-        fade_in_animation.setEndValue(1.0)
-        fade_in_animation.setEasingCurve(QEasingCurve.OutCubic)
-        fade_in_animation.start()
-        
         # Smooth scroll to show typing indicator
         QTimer.singleShot(100, lambda: self.scroll_to_bottom())
 
     def hide_typing_indicator(self):
         """Remove CASI typing indicator with smooth cleanup"""
-        # Stop all animation timers
-        if hasattr(self, 'typing_animation_timer') and self.typing_animation_timer.isActive():
-            self.typing_animation_timer.stop()
-        if hasattr(self, 'logo_breathing_timer') and self.logo_breathing_timer.isActive():
-            self.logo_breathing_timer.stop()
-        if hasattr(self, 'message_pulse_timer') and self.message_pulse_timer.isActive():
-            self.message_pulse_timer.stop()
-        if hasattr(self, 'typing_dots_timer') and self.typing_dots_timer.isActive():
-            self.typing_dots_timer.stop()
-        if hasattr(self, 'thinking_timer') and self.thinking_timer.isActive():
-            self.thinking_timer.stop()
-        
-        # Find and remove typing indicator immediately
-        for i in range(self.chat_display_layout.count()):
-            widget = self.chat_display_layout.itemAt(i).widget()
-            if widget and widget.objectName() == "typing_indicator":
-                # Remove immediately without complex animations
-                widget.deleteLater()
-                logging.info("Typing indicator removed successfully")
-                break
-        else:
-            logging.warning("Typing indicator not found for removal")
+        indicator = getattr(self, 'typing_indicator', None)
+        if indicator is None:
+            return
+        indicator.stop()
+        self.chat_display_layout.removeWidget(indicator)
+        indicator.deleteLater()
+        self.typing_indicator = None
+        logging.info("Typing indicator removed successfully")
 
     def get_last_user_message(self):
         # Returns the last user message from conversation_history, or None
@@ -2063,22 +2120,44 @@ class ChatbotWidget(QWidget):
             print(f"Failed to get user email: {e}")
         return "Unknown"
     
-    def send_via_custom_bot(self, alert_data):
+    def build_alert_channels(self):
+        """IT-on-duty delivery channels in preference order."""
+        channels = [
+            AlertChannel("custom_bot", CASI_BOT_ALERT_URL, self.send_via_custom_bot),
+            AlertChannel("azure_bot", CASI_BOT_ALERT_URL, self.send_via_azure_bot),
+            AlertChannel("teams_webhook", TEAMS_WEBHOOK_URL,
+                         lambda alert_data, timeout: send_teams_message_as_casi_bot(alert_data, timeout)),
+        ]
+        try:
+            from power_automate_config import POWER_AUTOMATE_URL, send_power_automate_alert
+            channels.append(AlertChannel("power_automate", POWER_AUTOMATE_URL, send_power_automate_alert))
+        except ImportError:
+            print("Power Automate not available")
+        return channels
+
+    def deliver_it_on_duty_alert(self, alert_data):
+        """Outbox handler: race the configured channels; returns the channel that delivered."""
+        result = self.alert_dispatcher.dispatch(alert_data)
+        print(f"[DEBUG] IT on duty alert latency per channel: {result['latency_ms']}")
+        return result["channel"] if result["delivered"] else False
+
+    def send_via_custom_bot(self, alert_data, timeout=10):
         """Send IT alert via custom CASI Teams Bot."""
         try:
             import requests
             
             # Send to custom bot API
             response = requests.post(
-                "http://localhost:3978/api/send-alert",
+                CASI_BOT_ALERT_URL,
                 json=alert_data,
-                timeout=10
+                timeout=timeout
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 result = response.json()
-                if result.get("status") == "success":
-                    print(f"✅ Custom bot alert sent successfully: {result}")
+                # 202 means the relay stored the alert in its durable queue and will deliver it
+                if result.get("status") in ("success", "queued"):
+                    print(f"✅ Custom bot alert {'queued' if response.status_code == 202 else 'sent'} successfully: {result}")
                     return True
                 else:
                     print(f"❌ Custom bot returned error: {result}")
@@ -2097,7 +2176,7 @@ class ChatbotWidget(QWidget):
             print(f"❌ Custom bot error: {e} - falling back to Power Automate")
             return False
 
-    def send_via_azure_bot(self, alert_data):
+    def send_via_azure_bot(self, alert_data, timeout=10):
         """Send IT alert via CASI Azure Bot (direct Teams integration)."""
         try:
             import requests
@@ -2105,15 +2184,16 @@ class ChatbotWidget(QWidget):
             # For now, we'll use the custom bot as a bridge to Azure Bot
             # Later, we'll implement direct Azure Bot communication
             response = requests.post(
-                "http://localhost:3978/api/send-alert",
+                CASI_BOT_ALERT_URL,
                 json=alert_data,
-                timeout=10
+                timeout=timeout
             )
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 result = response.json()
-                if result.get("status") == "success":
-                    print(f"✅ Azure Bot alert sent successfully: {result}")
+                # 202 means the relay stored the alert in its durable queue and will deliver it
+                if result.get("status") in ("success", "queued"):
+                    print(f"✅ Azure Bot alert {'queued' if response.status_code == 202 else 'sent'} successfully: {result}")
                     return True
                 else:
                     print(f"❌ Azure Bot returned error: {result}")
@@ -2281,42 +2361,8 @@ class ChatbotWidget(QWidget):
                     "hostname": hostname
                 }
                 
-                # Try Teams webhook first (with CASI bot name)
-                teams_sent = send_teams_message_as_casi_bot(alert_data)
-                
-                if teams_sent:
-                    self.add_message_bubble(
-                        "✅ **Message IT on Duty was sent successfully**\n\n"
-                        "The IT team will be notified via Teams shortly.\n"
-                        "**Sent by: CASI** 🤖",
-                        sender="bot"
-                    )
-                else:
-                    # Fallback to Power Automate if Teams webhook fails
-                    try:
-                        from power_automate_config import send_power_automate_alert
-                        power_automate_sent = send_power_automate_alert(alert_data)
-                        
-                        if power_automate_sent:
-                            self.add_message_bubble(
-                                "✅ **Message IT on Duty was sent successfully**\n\n"
-                                "The IT team will be notified via Teams shortly.\n"
-                                "**Note:** Sent via Power Automate (may show user name)",
-                                sender="bot"
-                            )
-                        else:
-                            self.add_message_bubble(
-                                "❌ **Failed to send IT alert**\n\n"
-                                "There was an issue sending your alert.\n"
-                                "Please try again or contact IT directly.",
-                                sender="bot"
-                            )
-                    except ImportError:
-                        self.add_message_bubble(
-                            "❌ **Power Automate not available**\n\n"
-                            "Please contact IT directly for assistance.",
-                            sender="bot"
-                        )
+                # Delivered in the background: Teams webhook first, Power Automate as fallback
+                self.enqueue_outbox_item("it_on_duty", alert_data, "📤 Sending your message to IT on duty...")
             else:
                 self.add_message_bubble("Concern is required to contact IT On Duty.", sender="bot")
                                         
@@ -2414,43 +2460,78 @@ class ChatbotWidget(QWidget):
         to_email = "ITSupport@castotravel.ph"
         subject = f"IT Helpdesk Ticket Request [{priority}]"
 
-        access_token = get_user_token(client_id, tenant_id)
-        headers = {"Authorization": f"Bearer {access_token}"}
-        profile = requests.get("https://graph.microsoft.com/v1.0/me", headers=headers).json()
-        sender_email = profile.get("userPrincipalName", "unknown@domain.com")
-
-        body = (
-            f"User request from CASI:\n"
-            f"Sender: {sender_email}\n"
-            f"Windows login: {username}\n"
-            f"Priority: {priority}\n\n"
-            f"Issue:\n{user_message}\n\n"
-            f"Conversation Summary:\n{conversation_summary}"
-        )
+        # Sign in here, where a login prompt can be shown; the outbox worker only refreshes silently
+        get_user_token(client_id, tenant_id)
 
-        # Prepare attachment if selected
-        attachments = []
-        if attachment_path:
-            file_size = os.path.getsize(attachment_path)
-            if file_size > 4 * 1024 * 1024:  # 4 MB
-                QMessageBox.warning(self, "Attachment Too Large", "The selected file is larger than 4 MB and cannot be sent.")
-                return
-            with open(attachment_path, "rb") as f:
-                content_bytes = base64.b64encode(f.read()).decode("utf-8")
-            attachment = {
-                "@odata.type": "#microsoft.graph.fileAttachment",
-                "name": os.path.basename(attachment_path),
-                "contentBytes": content_bytes
-            }
-            attachments.append(attachment)
+        payload = {
+            "client_id": client_id,
+            "tenant_id": tenant_id,
+            "to_email": to_email,
+            "subject": subject,
+            "username": username,
+            "priority": priority,
+            "user_message": user_message,
+            "conversation_summary": conversation_summary,
+            "attachment_path": attachment_path,
+            "submitted_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        }
+        self.enqueue_outbox_item("helpdesk_email", payload, "📤 Sending your ticket to IT Helpdesk...")
 
-        result = send_graph_email_delegated(
-            client_id, tenant_id, sender_email, to_email, subject, body, attachments
-        )
-        if result:
-            self.add_message_bubble("Your ticket was sent to IT Helpdesk via email.", sender="bot")
+    def enqueue_outbox_item(self, kind, payload, queued_message):
+        """Queue a ticket or alert for background delivery and acknowledge it in the chat."""
+        try:
+            _, created = self.outbox.enqueue(kind, payload)
+        except Exception as e:
+            print(f"Failed to queue {kind}: {e}")
+            self.add_message_bubble("❌ Could not queue your request. Please contact IT directly.", sender="bot")
+            return
+        if created:
+            self.add_message_bubble(queued_message, sender="bot")
         else:
-            self.add_message_bubble("Failed to send email via Microsoft Graph.", sender="bot")
+            self.add_message_bubble("This request was already submitted.", sender="bot")
+
+    def on_outbox_status(self, item_id, kind, status, detail, attempts):
+        """Report background delivery progress in the chat."""
+        if kind == "helpdesk_email" and status != STATUS_RETRYING and self.upload_progress_dialog is not None:
+            self.upload_progress_dialog.close()
+            self.upload_progress_dialog = None
+
+        message = None
+        if status == STATUS_SENT:
+            if kind == "it_on_duty":
+                message = ("✅ **Message IT on Duty was sent successfully**\n\n"
+                           "The IT team will be notified via Teams shortly.\n"
+                           + ("**Note:** Sent via Power Automate (may show user name)" if detail == "power_automate"
+                              else "**Sent by: CASI** 🤖"))
+            else:
+                message = "Your ticket was sent to IT Helpdesk via email."
+        elif status == STATUS_RETRYING and attempts == 1:
+            message = ("⏳ Could not reach IT right now. Your request is saved and will be "
+                       "retried automatically, even if CASI is restarted.")
+        elif status == STATUS_FAILED:
+            if kind == "it_on_duty":
+                message = ("❌ **Failed to send IT alert**\n\n"
+                           "There was an issue sending your request.\n"
+                           "Please try again or contact IT directly.")
+            else:
+                message = ("Failed to send email via Microsoft Graph. Your ticket was not sent to IT Helpdesk; "
+                           "please try again or contact IT directly.")
+        if message is None:
+            return
+        if self.ui_built:
+            self.add_message_bubble(message, sender="bot")
+        else:
+            self.pending_status_messages.append(message)
+
+    def on_upload_progress(self, sent, total):
+        """Show attachment upload progress for helpdesk tickets."""
+        if not total:
+            return
+        if self.upload_progress_dialog is None:
+            self.upload_progress_dialog = QProgressDialog("Uploading attachment...", None, 0, 100, self)
+            self.upload_progress_dialog.setWindowTitle("IT Helpdesk Ticket")
+            self.upload_progress_dialog.setMinimumDuration(500)
+        self.upload_progress_dialog.setValue(int(sent * 100 / total))
 
     def extract_recent_topics(self, num_messages=5):
         """Extracts keywords/topics from the last few user messages for dynamic suggestions."""
@@ -2510,9 +2591,10 @@ class ChatbotWidget(QWidget):
                 client_id = get_client_id()
                 tenant_id = get_tenant_id()
                 access_token = get_user_token(client_id, tenant_id, cache_path)
-                resp = requests.post(
-                    f"{BACKEND_URL}/knowledge",
-                    json={"access_token": access_token, "content": content.strip()}
+                resp = backend_selector.post(
+                    "/knowledge",
+                    json={"access_token": access_token, "content": content.strip()},
+                    timeout=10
                 )
                 if resp.status_code == 200:
                     QMessageBox.information(self, "Knowledge Saved", "Knowledge added successfully!")
@@ -2780,6 +2862,8 @@ class SystemTrayApp(QSystemTrayIcon):
         print("[DEBUG] Exit requested from system tray")
         self.show_notification("CASI", "The application is closing.", QSystemTrayIcon.Information, 2000)
         # Do not call self.chatbot.close() here, just quit the app
+        self.chatbot.outbox.stop(timeout=2)  # Undelivered items stay queued for the next start
+        backend_selector.stop()
         self.app.quit()
     
     def is_system_tray_available(self):
@@ -3028,109 +3112,6 @@ class Office365LoginPromptDialog(QDialog):
         
         self.setLayout(layout)
 
-class LoadingScreen(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setFixedSize(280, 180)
-        
-        # Center the loading screen
-        screen = QApplication.primaryScreen()
-        screen_geometry = screen.availableGeometry()
-        x = (screen_geometry.width() - self.width()) // 2
-        y = (screen_geometry.height() - self.height()) // 2
-        self.move(x, y)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setSpacing(15)
-        layout.setAlignment(Qt.AlignCenter)  # Center all content
-        
-        # CASI Logo
-        logo_label = QLabel()
-        logo_path = resource_path("CASInew-nbg.png")
-        logo_pixmap = QPixmap(logo_path)
-        
-        if logo_pixmap.isNull():
-            # Fallback: try direct path
-            logo_pixmap = QPixmap("CASInew-nbg.png")
-            
-        if not logo_pixmap.isNull():
-            # Scale the logo properly - smaller size to fit better
-            logo_pixmap = logo_pixmap.scaled(80, 80, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        else:
-            # Create a placeholder if logo not found
-            logo_pixmap = QPixmap(80, 80)
-            logo_pixmap.fill(QColor(44, 62, 80))  # Dark blue background
-            painter = QPainter(logo_pixmap)
-            painter.setPen(QColor(255, 255, 255))
-            painter.setFont(QFont("Arial", 12, QFont.Bold))
-            painter.drawText(logo_pixmap.rect(), Qt.AlignCenter, "CASI")
-            painter.end()
-            
-        logo_label.setPixmap(logo_pixmap)
-        logo_label.setAlignment(Qt.AlignCenter)
-        logo_label.setFixedSize(80, 80)  # Fixed size to prevent stacking
-        logo_label.setScaledContents(False)  # Don't scale contents automatically
-        layout.addWidget(logo_label, alignment=Qt.AlignCenter)
-        
-        # Loading percentage
-        self.percentage_label = QLabel("0%")
-        self.percentage_label.setStyleSheet("""
-            QLabel {
-                color: #2ecc71;
-                font-size: 28px;
-                font-weight: bold;
-                margin: 5px 0;
-            }
-        """)
-        self.percentage_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.percentage_label, alignment=Qt.AlignCenter)
-        
-        # Set widget style with shadow effect
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #ecf0f1;
-                border-radius: 15px;
-                border: 2px solid #bdc3c7;
-            }
-        """)
-        
-        # Shadow effect removed to prevent errors
-        # shadow = QGraphicsDropShadowEffect()
-        # shadow.setBlurRadius(15)
-        # shadow.setColor(QColor(0, 0, 0, 60))
-        # shadow.setOffset(0, 3)
-        # self.setGraphicsEffect(shadow)
-        
-        # Animation timer
-        self.animation_timer = QTimer()
-        self.animation_timer.timeout.connect(self.update_loading)
-        self.progress_value = 0
-        
-    def start_loading(self):
-        self.show()
-        self.animation_timer.start(50)  # Update every 50ms for smoother animation
-        
-    def stop_loading(self):
-        self.animation_timer.stop()
-        self.hide()
-        
-    def update_loading(self):
-        # Smooth progress animation
-        if self.progress_value < 95:  # Don't go to 100% until we're ready
-            self.progress_value += 1
-            self.percentage_label.setText(f"{self.progress_value}%")
-            
-    def set_progress(self, value):
-        self.progress_value = value
-        self.percentage_label.setText(f"{value}%")
-        
-    def set_loading_text(self, text):
-        # Keep this method for compatibility but we're not using text anymore
-        pass
-
 def move_to_right_middle(widget):
     screen = QApplication.primaryScreen()
     screen_geometry = screen.availableGeometry()
@@ -3178,6 +3159,7 @@ def get_circular_pixmap(source, size):
     return circular
 
 def get_graph_token(client_id, client_secret, tenant_id):
+    import msal  # Imported on first use to keep startup fast
     authority = f"https://login.microsoftonline.com/{tenant_id}"
     app = msal.ConfidentialClientApplication(
         client_id,
@@ -3243,6 +3225,7 @@ def send_graph_email_delegated(client_id, tenant_id, from_email, to_email, subje
     return response.status_code == 202
 
 def get_user_token(client_id, tenant_id, cache_path=None):
+    import msal  # Imported on first use to keep startup fast
     # Always ensure the CASI folder exists
     if cache_path is None:
         cache_dir = os.path.join(os.getenv("APPDATA"), "CASI")
@@ -3294,7 +3277,37 @@ def get_user_token(client_id, tenant_id, cache_path=None):
     else:
         raise Exception(f"Could not obtain access token: {result}")
 
-CHAT_HISTORY_FILE = "chat_history.json"
+def get_user_token_silent(client_id, tenant_id, cache_path=None):
+    """Return a cached or refreshed token without ever prompting; None if sign-in is needed."""
+    import msal
+    if cache_path is None:
+        cache_path = os.path.join(os.getenv("APPDATA"), "CASI", "token_cache.json")
+    if not os.path.exists(cache_path):
+        return None
+    cache = msal.SerializableTokenCache()
+    try:
+        with open(cache_path, "r") as f:
+            cache.deserialize(f.read())
+    except Exception as e:
+        print(f"Token cache unreadable: {e}")
+        return None
+    app = msal.PublicClientApplication(client_id, authority=f"https://login.microsoftonline.com/{tenant_id}",
+                                       token_cache=cache)
+    accounts = app.get_accounts()
+    if not accounts:
+        return None
+    result = app.acquire_token_silent(["User.Read", "Mail.Send"], account=accounts[0])
+    if not result or "access_token" not in result:
+        return None
+    if cache.has_state_changed:
+        try:
+            with open(cache_path, "w") as f:
+                f.write(cache.serialize())
+        except Exception as e:
+            print(f"Failed to write token cache: {e}")
+    return result["access_token"]
+
+LEGACY_CHAT_HISTORY_FILE = "chat_history.json"
 
 global_scrollbar_style = """
 QScrollBar:vertical {
@@ -3351,132 +3364,25 @@ QPushButton:pressed {
 }
 """
 
-def is_application_running():
-    """Check if another instance of the application is already running."""
-    current_pid = os.getpid()
-    current_process = psutil.Process(current_pid)
-    current_name = current_process.name()
-    
-    # Look for processes with similar names
-    target_names = ['python.exe', 'chatbot_ui.exe', 'pythonw.exe']
-    
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            # Skip the current process
-            if proc.pid == current_pid:
-                continue
-                
-            # Check if it's a Python process or our executable
-            if proc.info['name'] in target_names:
-                cmdline = proc.info['cmdline']
-                if cmdline:
-                    # Check for our specific application
-                    cmdline_str = ' '.join(cmdline).lower()
-                    if any(keyword in cmdline_str for keyword in ['chatbot_ui', 'casi', 'castoaibot']):
-                        return True, proc.pid
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-    
-    return False, None
-
-def create_lock_file():
-    """Create a lock file to indicate the application is running."""
-    lock_file = os.path.join(os.getenv("APPDATA"), "CASI", "casi_app.lock")
-    os.makedirs(os.path.dirname(lock_file), exist_ok=True)
-    
-    try:
-        with open(lock_file, 'w') as f:
-            f.write(str(os.getpid()))
-        return lock_file
-    except Exception as e:
-        print(f"Failed to create lock file: {e}")
-        return None
-
-def remove_lock_file(lock_file):
-    """Remove the lock file when the application exits."""
-    if lock_file and os.path.exists(lock_file):
-        try:
-            os.remove(lock_file)
-        except Exception as e:
-            print(f"Failed to remove lock file: {e}")
-
-def check_single_instance():
-    """Check if only one instance should be running and handle accordingly."""
-    # This function is now handled in the main execution block
-    # Keeping this for compatibility but it's not used
-    return True
-
-def already_running_mutex(mutexname="CASIAppMutex"):
-    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-    mutex = kernel32.CreateMutexW(None, wintypes.BOOL(False), mutexname)
-    last_error = ctypes.GetLastError()
-    # ERROR_ALREADY_EXISTS == 183
-    if last_error == 183:
-        return True
-    return False
-
-
-
-
-
 if __name__ == "__main__":
-    # Check if single instance detection is enabled
+    app = QApplication(sys.argv)
+    print("[DEBUG] QApplication created")
+    single_instance = None
     if get_single_instance_enabled():
         print("[DEBUG] Single instance detection enabled")
-        # Try multiple methods to detect if already running
-        is_running = False
-        detection_method = "none"
-        
-        # Method 1: Socket-based detection (most reliable)
-        try:
-            is_running = already_running_socket()
-            if is_running:
-                detection_method = "socket"
-                print("[DEBUG] Socket detection: Another instance detected")
-        except Exception as e:
-            print(f"[DEBUG] Socket detection failed: {e}")
-        
-        # Method 2: Mutex-based detection (fallback)
-        if not is_running:
-            try:
-                single_instance = SingleInstance()
-                is_running = single_instance.already_running()
-                if is_running:
-                    detection_method = "mutex"
-                    print("[DEBUG] Mutex detection: Another instance detected")
-            except Exception as e:
-                print(f"[DEBUG] Mutex detection failed: {e}")
-        
-        # Method 3: Process-based detection (final fallback)
-        if not is_running:
-            try:
-                is_running, pid = is_application_running()
-                if is_running:
-                    detection_method = "process"
-                    print(f"[DEBUG] Process detection: Another instance detected (PID: {pid})")
-            except Exception as e:
-                print(f"[DEBUG] Process detection failed: {e}")
-        
-        if is_running:
-            from PyQt5.QtWidgets import QApplication, QMessageBox
-            app = QApplication(sys.argv)
-            QMessageBox.information(None, "CASI Assistant", 
-                               "CASI is already running in the system tray.\n\nPlease check your system tray for the CASI icon, or close the existing instance before starting a new one.")
-            sys.exit(1)
+        single_instance = SingleInstanceGuard()
+        if single_instance.notify_running_instance():
+            # The running instance shows its window; no second process is started
+            sys.exit(0)
+        if not single_instance.listen():
+            # A concurrent launch got the lock first; it is listening by now, so hand over to it
+            if not single_instance.notify_running_instance():
+                print("[DEBUG] Warning: another instance holds the lock but did not answer; exiting")
+            sys.exit(0)
     else:
         print("[DEBUG] Single instance detection disabled")
-    app = QApplication(sys.argv)
-    print("[DEBUG] QApplication created")
-    loading_screen = LoadingScreen()
-    loading_screen.start_loading()
-    app.processEvents()
-    loading_screen.set_progress(40)
-    app.processEvents()
-    loading_screen.set_progress(60)
-    app.processEvents()
     app.setStyleSheet(global_scrollbar_style)
-    loading_screen.set_progress(80)
-    app.processEvents()
+    # Staged startup: tray and minimized widget first, main window built on first expand
     chatbot = ChatbotWidget()
     print("[DEBUG] ChatbotWidget created")
     global tray  # Ensure tray is global and not garbage collected
@@ -3497,13 +3403,11 @@ if __name__ == "__main__":
         print("[DEBUG] SystemTrayApp shown and visible")
     else:
         print("[DEBUG] Warning: System tray is not available!")
-    loading_screen.set_progress(90)
-    app.processEvents()
-    chatbot.minimize_widget()  # Show minimized widget after loading
-    chatbot.load_chat_history()
-    loading_screen.set_progress(100)
-    app.processEvents()
-    QTimer.singleShot(800, loading_screen.stop_loading)
+    report_startup_milestone("time-to-tray")
+    backend_selector.start()  # first probe runs in the background, after the tray is up
+    if single_instance is not None:
+        single_instance.activation_requested.connect(tray.show_chatbot_simple)
+    chatbot.minimize_widget()  # Show minimized widget; history loads on first expand
     sys.exit(app.exec_())
 
 # In SystemTrayApp, add debug prints for tray icon creation, menu setup, and menu actions:
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+CASI Debug Stream Monitor
+Follows the backend's /debug/stream Server-Sent Events feed. It never sends
+/chat requests of its own, so watching production adds no load beyond one
+open connection.
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("CASI_BACKEND_URL", "https://casto-ai-bot.vercel.app")
+RECONNECT_DELAY = 3.0
+
+LEVEL_ICONS = {"info": "🔵", "warning": "🟡", "error": "🔴"}
+DETAIL_FIELDS = ("method", "path", "status", "user", "model", "entries", "matches", "found",
+                 "chars", "duration_ms", "message", "response", "error")
+
+
+def iter_sse(lines):
+    """Yield ``(event_id, event_type, data)`` from an iterator of SSE lines."""
+    event_id, event_type, data = None, None, []
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield event_id, event_type, "\n".join(data)
+            event_id, event_type, data = None, None, []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = value
+            elif field == "event":
+                event_type = value
+            elif field == "data":
+                data.append(value)
+
+
+def format_event(event):
+    stamp = datetime.fromtimestamp(event.get("ts", time.time())).strftime("%H:%M:%S")
+    icon = LEVEL_ICONS.get(event.get("level"), "⚪")
+    details = " ".join(f"{field}={event[field]}" for field in DETAIL_FIELDS if field in event)
+    request_id = event.get("request_id") or "-"
+    return f"{icon} [{stamp}] #{event['id']} {event['type']} ({request_id}) {details}"
+
+
+class DebugStreamMonitor:
+    """Prints debug events as they arrive and resumes from the last id after a disconnect."""
+
+    def __init__(self, base_url, filters=None, token=None, since=None, output_json=False):
+        self.url = base_url.rstrip("/") + "/debug/stream"
+        self.params = dict(filters or {})
+        if since is not None:
+            self.params["since"] = since
+        self.headers = {"Accept": "text/event-stream"}
+        if token:
+            self.headers["X-Debug-Token"] = token
+        self.last_event_id = None
+        self.output_json = output_json
+        self.session = requests.Session()
+
+    def stream_once(self):
+        headers = dict(self.headers)
+        if self.last_event_id is not None:
+            headers["Last-Event-ID"] = self.last_event_id
+        # Read timeout is longer than the server's keep-alive interval
+        with self.session.get(self.url, params=self.params, headers=headers,
+                              stream=True, timeout=(10, 60)) as response:
+            if response.status_code == 401:
+                raise SystemExit("❌ Unauthorized: pass --token or set DEBUG_STREAM_TOKEN")
+            if response.status_code == 403:
+                raise SystemExit("❌ Debug stream disabled: set DEBUG_STREAM_TOKEN on the backend")
+            response.raise_for_status()
+            print(f"✅ Connected to {self.url}")
+            for event_id, _, data in iter_sse(response.iter_lines(decode_unicode=True)):
+                self.last_event_id = event_id or self.last_event_id
+                event = json.loads(data)
+                print(json.dumps(event, ensure_ascii=False) if self.output_json else format_event(event))
+
+    def run(self):
+        while True:
+            try:
+                self.stream_once()
+            except requests.RequestException as e:
+                print(f"⚠️ Stream interrupted ({e}); reconnecting in {RECONNECT_DELAY:.0f}s")
+            time.sleep(RECONNECT_DELAY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow the CASI backend debug event stream")
+    parser.add_argument("--url", default=BASE_URL, help="Backend base URL (default: CASI_BACKEND_URL)")
+    parser.add_argument("--type", help="Comma-separated event types, e.g. chat.llm,chat.error")
+    parser.add_argument("--level", help="Comma-separated levels, e.g. warning,error")
+    parser.add_argument("--user", help="Only events for this user id or email")
+    parser.add_argument("--request-id", help="Only events for one request")
+    parser.add_argument("--path", help="Only http.request events for this path")
+    parser.add_argument("--contains", help="Case-insensitive text match anywhere in the event")
+    parser.add_argument("--since", type=int, help="Replay buffered events after this id first")
+    parser.add_argument("--token", default=os.environ.get("DEBUG_STREAM_TOKEN"))
+    parser.add_argument("--json", action="store_true", help="Print raw JSON events")
+    args = parser.parse_args()
+
+    filters = {field: getattr(args, attr) for field, attr in (
+        ("type", "type"), ("level", "level"), ("user", "user"), ("request_id", "request_id"),
+        ("path", "path"), ("contains", "contains")) if getattr(args, attr)}
+
+    print("🎯 CASI DEBUG STREAM MONITOR")
+    print("=" * 80)
+    print(f"🌐 Backend: {args.url}")
+    print(f"🔎 Filters: {filters or 'none'}")
+    print("💡 Press Ctrl+C to stop monitoring")
+    print("=" * 80)
+    try:
+        DebugStreamMonitor(args.url, filters, args.token, args.since, args.json).run()
+    except KeyboardInterrupt:
+        print("\n👋 Monitor stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Microsoft Graph mail sending with chunked attachment upload sessions
+import base64
+import mmap
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+# Graph rejects sendMail bodies over 4 MB; base64 inflates attachments by 4/3
+INLINE_ATTACHMENT_LIMIT = 3 * 1024 * 1024
+# Upload session chunks must be a multiple of 320 KiB
+UPLOAD_CHUNK_SIZE = 10 * 320 * 1024
+MAX_ATTACHMENT_SIZE = 150 * 1024 * 1024
+CHUNK_RETRIES = 3
+# Longest Retry-After we honour before trying a chunk again
+MAX_RETRY_DELAY = 60
+
+
+class GraphUploadError(Exception):
+    """Raised when Graph rejects a draft, upload session or chunk."""
+
+
+def parse_retry_after(value):
+    """Retry-After is either delta-seconds or an HTTP date; None when absent or unreadable."""
+    if not value:
+        return None
+    try:
+        return min(MAX_RETRY_DELAY, max(0.0, float(value)))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return min(MAX_RETRY_DELAY, max(0.0, retry_at.timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+class GraphMailSender:
+    """Sends mail as the signed-in user; large attachments go through upload sessions."""
+
+    def __init__(self, access_token, base_url=GRAPH_BASE_URL, chunk_size=UPLOAD_CHUNK_SIZE,
+                 inline_limit=INLINE_ATTACHMENT_LIMIT, timeout=30, session=None):
+        if chunk_size % (320 * 1024):
+            raise ValueError("chunk_size must be a multiple of 320 KiB")
+        self.base_url = base_url.rstrip("/")
+        self.chunk_size = chunk_size
+        self.inline_limit = inline_limit
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.auth_headers = {"Authorization": f"Bearer {access_token}"}
+
+    def send_mail(self, to_email, subject, body, attachment_paths=(), progress_callback=None):
+        """Send a text mail. ``progress_callback(sent_bytes, total_bytes)`` tracks large uploads."""
+        inline, large = [], []
+        for path in attachment_paths:
+            size = os.path.getsize(path)
+            if size > MAX_ATTACHMENT_SIZE:
+                raise GraphUploadError(f"{os.path.basename(path)} is larger than 150 MB")
+            (large if size > self.inline_limit else inline).append(path)
+
+        message = {
+            "subject": subject,
+            "body": {"contentType": "Text", "content": body},
+            "toRecipients": [{"emailAddress": {"address": to_email}}],
+        }
+        if inline:
+            message["attachments"] = [self._inline_attachment(path) for path in inline]
+
+        if not large:
+            response = self._post("/me/sendMail", {"message": message})
+            return response.status_code == 202
+
+        # Large attachments can only be added to a draft, which is then sent
+        draft = self._post("/me/messages", message)
+        if draft.status_code != 201:
+            raise GraphUploadError(f"Draft creation failed: {draft.status_code} {draft.text}")
+        message_id = draft.json()["id"]
+
+        total = sum(os.path.getsize(path) for path in large)
+        uploaded = 0
+        try:
+            for path in large:
+                def report(sent, _size, offset=uploaded):
+                    if progress_callback:
+                        progress_callback(offset + sent, total)
+                self.upload_attachment(message_id, path, report)
+                uploaded += os.path.getsize(path)
+            response = self._post(f"/me/messages/{message_id}/send", None)
+        except Exception:
+            self.delete_draft(message_id)
+            raise
+        if response.status_code != 202:
+            self.delete_draft(message_id)
+            return False
+        return True
+
+    def delete_draft(self, message_id):
+        """Best effort: each outbox retry creates a new draft, so a failed one must not stay behind."""
+        try:
+            self.session.delete(f"{self.base_url}/me/messages/{message_id}", headers=self.auth_headers,
+                                timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            pass
+
+    def get_sender_address(self):
+        """Return the signed-in user's principal name."""
+        response = self.session.get(f"{self.base_url}/me", headers=self.auth_headers, timeout=self.timeout)
+        return response.json().get("userPrincipalName", "unknown@domain.com")
+
+    def upload_attachment(self, message_id, path, progress_callback=None):
+        """Stream ``path`` into a draft message in fixed-size chunks from a memory map."""
+        size = os.path.getsize(path)
+        session_response = self._post(
+            f"/me/messages/{message_id}/attachments/createUploadSession",
+            {"AttachmentItem": {"attachmentType": "file", "name": os.path.basename(path), "size": size}},
+        )
+        if session_response.status_code != 201:
+            raise GraphUploadError(
+                f"Upload session failed: {session_response.status_code} {session_response.text}")
+        upload_url = session_response.json()["uploadUrl"]
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            offset = 0
+            while offset < size:
+                end = min(offset + self.chunk_size, size)
+                response = self._put_chunk(upload_url, mapped, offset, end, size)
+                next_offset = self._next_offset(response, end)
+                if next_offset <= offset:
+                    raise GraphUploadError(f"Upload session stalled at byte {offset}")
+                offset = next_offset
+                if progress_callback:
+                    progress_callback(offset, size)
+
+    def _put_chunk(self, upload_url, mapped, start, end, size):
+        headers = {
+            "Content-Length": str(end - start),
+            "Content-Range": f"bytes {start}-{end - 1}/{size}",
+        }
+        last_error = None
+        for attempt in range(CHUNK_RETRIES):
+            retry_after = None
+            try:
+                # The upload URL is pre-authenticated; Graph rejects an Authorization header here
+                response = self.session.put(upload_url, data=mapped[start:end], headers=headers,
+                                            timeout=self.timeout)
+                if response.status_code in (200, 201, 202):
+                    return response
+                last_error = f"{response.status_code} {response.text}"
+                if response.status_code < 500 and response.status_code != 429:
+                    break
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except requests.exceptions.RequestException as e:
+                last_error = str(e)
+            if attempt == CHUNK_RETRIES - 1:
+                break
+            time.sleep(retry_after if retry_after is not None else 2 ** attempt)
+        raise GraphUploadError(f"Chunk {start}-{end - 1} failed: {last_error}")
+
+    @staticmethod
+    def _next_offset(response, default):
+        """Resume from the server's nextExpectedRanges when it reports one."""
+        if response.status_code != 202:
+            return default
+        try:
+            ranges = response.json().get("nextExpectedRanges") or []
+        except ValueError:
+            return default
+        if ranges:
+            return int(ranges[0].split("-")[0])
+        return default
+
+    def _inline_attachment(self, path):
+        with open(path, "rb") as f:
+            content_bytes = base64.b64encode(f.read()).decode("utf-8")
+        return {
+            "@odata.type": "#microsoft.graph.fileAttachment",
+            "name": os.path.basename(path),
+            "contentBytes": content_bytes,
+        }
+
+    def _post(self, path, payload):
+        headers = dict(self.auth_headers)
+        if payload is None:
+            headers["Content-Length"] = "0"
+            return self.session.post(f"{self.base_url}{path}", headers=headers, timeout=self.timeout)
+        return self.session.post(f"{self.base_url}{path}", headers=headers, json=payload, timeout=self.timeout)
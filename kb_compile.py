@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+CASI Knowledge Base Compiler
+Builds api/knowledge.kb from knowledge_base.json and api/knowledge_data.py.
+Both backends mmap the artifact at startup instead of parsing JSON and
+rebuilding strings on every cold start.
+
+    python kb_compile.py            # rebuild the artifact
+    python kb_compile.py --check    # exit 1 if the artifact is missing or stale
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+from kb_artifact import load_knowledge_artifact, write_artifact
+from knowledge_data import EMBEDDED_KNOWLEDGE, VERIFIED_COMPANY_INFO
+
+KNOWLEDGE_JSON = os.path.join(ROOT, "knowledge_base.json")
+ARTIFACT_PATH = os.path.join(ROOT, "api", "knowledge.kb")
+
+
+def load_sources(knowledge_json=KNOWLEDGE_JSON):
+    with open(knowledge_json, "r", encoding="utf-8") as f:
+        qa_pairs = [(entry["question"], entry["answer"]) for entry in json.load(f)]
+    return list(EMBEDDED_KNOWLEDGE), qa_pairs, VERIFIED_COMPANY_INFO
+
+
+def source_hash(knowledge, qa_pairs, company_info):
+    digest = hashlib.sha256()
+    digest.update(json.dumps([knowledge, qa_pairs, company_info], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def compile_knowledge(knowledge_json=KNOWLEDGE_JSON, artifact_path=ARTIFACT_PATH):
+    knowledge, qa_pairs, company_info = load_sources(knowledge_json)
+    version = source_hash(knowledge, qa_pairs, company_info)
+    return write_artifact(artifact_path, knowledge, qa_pairs, company_info,
+                          {"kb_version": version, "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())})
+
+
+def is_current(knowledge_json=KNOWLEDGE_JSON, artifact_path=ARTIFACT_PATH):
+    artifact = load_knowledge_artifact(artifact_path)
+    if artifact is None:
+        return False
+    try:
+        return artifact.kb_version == source_hash(*load_sources(knowledge_json))
+    finally:
+        artifact.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the CASI knowledge base artifact")
+    parser.add_argument("--check", action="store_true", help="Only verify the artifact matches its sources")
+    parser.add_argument("--source", default=KNOWLEDGE_JSON)
+    parser.add_argument("--out", default=ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    if args.check:
+        if is_current(args.source, args.out):
+            print(f"✅ {args.out} is up to date")
+            return
+        print(f"❌ {args.out} is missing or stale; run python kb_compile.py")
+        sys.exit(1)
+
+    meta = compile_knowledge(args.source, args.out)
+    print(f"✅ Wrote {args.out} ({os.path.getsize(args.out)} bytes)")
+    print(f"📚 {meta['documents']} documents, kb_version {meta['kb_version']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+CASI Load Test
+Replays the chat scenarios from chat_scenarios.py against a backend, either
+open-loop at a target request rate or closed-loop with a fixed number of
+concurrent users. Both modes can ramp up gradually. Latencies go into
+HDR-style log-linear histograms, and results are exported as JSON so runs
+can be compared.
+
+    python load_test.py run --mode rps --rps 20 --duration 60 --ramp-up 15 --out before.json
+    python load_test.py run --mode concurrency --concurrency 16 --duration 60 --out after.json
+    python load_test.py compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from datetime import datetime
+
+import aiohttp
+
+from chat_scenarios import SCENARIOS, ScenarioMix, is_meaningful
+
+DEFAULT_URL = "http://localhost:5000"
+# 2**7 linear sub-buckets per power of two keeps recorded values within 1%
+SUB_BUCKET_BITS = 7
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of microsecond latencies, in the style of HdrHistogram.
+
+    Values below 2**SUB_BUCKET_BITS are exact. Above that, every power of two
+    is split into 2**SUB_BUCKET_BITS equal buckets. Only non-empty buckets are
+    stored, so histograms stay small and can be merged and serialized.
+    """
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.counts = Counter()
+        self.total = 0
+        self.min_us = None
+        self.max_us = 0
+        self.sum_us = 0
+
+    def bucket_index(self, value_us):
+        if value_us < self.sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits - 1
+        return (shift + 1) * self.sub_bucket_count + (value_us >> shift) - self.sub_bucket_count
+
+    def bucket_value(self, index):
+        """Highest value that falls into a bucket."""
+        magnitude, sub = divmod(index, self.sub_bucket_count)
+        if magnitude == 0:
+            return sub
+        shift = magnitude - 1
+        return ((self.sub_bucket_count + sub + 1) << shift) - 1
+
+    def record(self, seconds):
+        value_us = max(0, int(seconds * 1_000_000))
+        self.counts[self.bucket_index(value_us)] += 1
+        self.total += 1
+        self.sum_us += value_us
+        self.max_us = max(self.max_us, value_us)
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, percent):
+        """Latency in ms at or below which ``percent`` of recorded values fall."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return round(min(self.bucket_value(index), self.max_us) / 1000, 2)
+        return round(self.max_us / 1000, 2)
+
+    def summary(self):
+        if not self.total:
+            return {"count": 0}
+        summary = {
+            "count": self.total,
+            "min": round(self.min_us / 1000, 2),
+            "mean": round(self.sum_us / self.total / 1000, 2),
+            "max": round(self.max_us / 1000, 2),
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent:g}"] = self.percentile(percent)
+        return summary
+
+    def to_dict(self):
+        return {"sub_bucket_bits": self.sub_bucket_bits, "total": self.total, "min_us": self.min_us,
+                "max_us": self.max_us, "sum_us": self.sum_us,
+                "buckets": {str(index): count for index, count in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["sub_bucket_bits"])
+        histogram.counts = Counter({int(index): count for index, count in data["buckets"].items()})
+        histogram.total = data["total"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        histogram.sum_us = data["sum_us"]
+        return histogram
+
+
+class ScenarioStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.errors = Counter()
+        # Answered, but without the text the scenario expects (e.g. "Marc Casto" for CEO questions)
+        self.unexpected = 0
+
+    def to_dict(self):
+        errors = sum(self.errors.values())
+        return {
+            "requests": self.requests,
+            "errors": errors,
+            "error_rate": round(errors / self.requests, 4) if self.requests else 0.0,
+            "errors_by_kind": dict(self.errors),
+            "unexpected_answers": self.unexpected,
+            "latency_ms": self.histogram.summary(),
+            "histogram": self.histogram.to_dict(),
+        }
+
+
+class LoadTest:
+    """Drives /chat with a scenario mix in "rps" (open-loop) or "concurrency" (closed-loop) mode."""
+
+    def __init__(self, base_url=DEFAULT_URL, mix=None, mode="concurrency", concurrency=10, rps=5.0,
+                 duration=30.0, ramp_up=0.0, timeout=30.0, max_in_flight=500):
+        if mode not in ("rps", "concurrency"):
+            raise ValueError("mode must be 'rps' or 'concurrency'")
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix or ScenarioMix()
+        self.mode = mode
+        self.concurrency = concurrency
+        self.rps = rps
+        self.duration = duration
+        self.ramp_up = min(ramp_up, duration)
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.stats = {}
+        self.timeline = Counter()
+        self.timeline_errors = Counter()
+        self.dropped = 0
+        self.in_flight = 0
+        self.started = None
+
+    def ramp_fraction(self, elapsed):
+        if not self.ramp_up:
+            return 1.0
+        return min(1.0, elapsed / self.ramp_up)
+
+    async def send(self, session, scheduled_at=None):
+        name, query = self.mix.next()
+        stats = self.stats.setdefault(name, ScenarioStats())
+        # Open-loop latency counts from the intended send time, so a slow server
+        # cannot hide queueing delay (coordinated omission)
+        started = scheduled_at or time.perf_counter()
+        error = None
+        self.in_flight += 1
+        try:
+            async with session.post(f"{self.base_url}/chat", json={"message": query}) as response:
+                body = await response.text()
+                if response.status != 200:
+                    error = f"http_{response.status}"
+                else:
+                    answer = json.loads(body).get("response", "")
+                    if not is_meaningful(answer):
+                        error = "empty_answer"
+                    elif any(text not in answer.lower() for text in self.mix.expected(name)):
+                        stats.unexpected += 1
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except aiohttp.ClientError as e:
+            error = type(e).__name__
+        except ValueError:
+            error = "invalid_json"
+        finally:
+            self.in_flight -= 1
+        finished = time.perf_counter()
+        stats.requests += 1
+        stats.histogram.record(finished - started)
+        second = int(finished - self.started)
+        self.timeline[second] += 1
+        if error:
+            stats.errors[error] += 1
+            self.timeline_errors[second] += 1
+
+    async def run_rps(self, session, deadline):
+        tasks = set()
+        next_at = self.started
+        while next_at < deadline:
+            now = time.perf_counter()
+            if next_at > now:
+                await asyncio.sleep(next_at - now)
+            if self.in_flight >= self.max_in_flight:
+                self.dropped += 1
+            else:
+                task = asyncio.create_task(self.send(session, scheduled_at=next_at))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            # Start at 10% of the target so ramp-up does not begin with a long gap
+            rate = self.rps * max(0.1, self.ramp_fraction(next_at - self.started))
+            next_at += 1.0 / rate
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run_concurrency(self, session, deadline):
+        async def user(index):
+            await asyncio.sleep(self.ramp_up * index / self.concurrency)
+            while time.perf_counter() < deadline:
+                await self.send(session)
+
+        await asyncio.gather(*(user(i) for i in range(self.concurrency)))
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {"User-Agent": "casi-load-test"}
+        started_at = datetime.now().isoformat()
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            self.started = time.perf_counter()
+            deadline = self.started + self.duration
+            if self.mode == "rps":
+                await self.run_rps(session, deadline)
+            else:
+                await self.run_concurrency(session, deadline)
+            elapsed = time.perf_counter() - self.started
+        return self.report(started_at, elapsed)
+
+    def report(self, started_at, elapsed):
+        overall = ScenarioStats()
+        for stats in self.stats.values():
+            overall.histogram.merge(stats.histogram)
+            overall.requests += stats.requests
+            overall.errors.update(stats.errors)
+            overall.unexpected += stats.unexpected
+        summary = overall.to_dict()
+        histogram = summary.pop("histogram")
+        summary["throughput_rps"] = round(overall.requests / elapsed, 2) if elapsed else 0.0
+        summary["dropped"] = self.dropped
+        summary["elapsed_s"] = round(elapsed, 2)
+        meta = {"url": self.base_url, "mode": self.mode, "duration_s": self.duration,
+                "ramp_up_s": self.ramp_up, "timeout_s": self.timeout, "started_at": started_at}
+        if self.mode == "rps":
+            meta["target_rps"] = self.rps
+        else:
+            meta["concurrency"] = self.concurrency
+        return {
+            "meta": meta,
+            "summary": summary,
+            "histogram": histogram,
+            "scenarios": {name: stats.to_dict() for name, stats in sorted(self.stats.items())},
+            "timeline": [{"second": s, "completed": self.timeline[s], "errors": self.timeline_errors[s]}
+                         for s in sorted(self.timeline)],
+        }
+
+
+COMPARE_METRICS = (
+    ("throughput_rps", ("throughput_rps",), True),
+    ("error_rate", ("error_rate",), False),
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+    ("max ms", ("latency_ms", "max"), False),
+)
+
+
+def compare_reports(baseline, candidate):
+    """Rows of (metric, baseline, candidate, change %, better) for two exported runs."""
+    rows = []
+    for label, path, higher_is_better in COMPARE_METRICS:
+        values = []
+        for report in (baseline, candidate):
+            value = report["summary"]
+            for key in path:
+                value = (value or {}).get(key)
+            values.append(value)
+        before, after = values
+        change = None
+        if before not in (None, 0) and after is not None:
+            change = round((after - before) / before * 100, 1)
+        better = None
+        if before is not None and after is not None and before != after:
+            better = (after > before) == higher_is_better
+        rows.append((label, before, after, change, better))
+    return rows
+
+
+def print_report(report):
+    summary = report["summary"]
+    latency = summary["latency_ms"]
+    print("=" * 70)
+    print(f"📊 LOAD TEST RESULTS ({report['meta']['mode']} mode against {report['meta']['url']})")
+    print("=" * 70)
+    print(f"📨 Requests: {summary['requests']}  ⚡ Throughput: {summary['throughput_rps']} req/s")
+    print(f"❌ Errors: {summary['errors']} ({summary['error_rate'] * 100:.2f}%)  "
+          f"🚫 Dropped: {summary['dropped']}  ⚠️ Unexpected answers: {summary['unexpected_answers']}")
+    if latency.get("count"):
+        print("⏱️ Latency ms: " + "  ".join(
+            f"{key}={latency[key]}" for key in ("min", "mean", "p50", "p90", "p95", "p99", "p99.9", "max")))
+    for kind, count in summary["errors_by_kind"].items():
+        print(f"   ❌ {kind}: {count}")
+    print("-" * 70)
+    for name, stats in report["scenarios"].items():
+        latency = stats["latency_ms"]
+        print(f"🔍 {name:<12} requests={stats['requests']:<6} errors={stats['errors']:<4} "
+              f"p50={latency.get('p50')} p95={latency.get('p95')} p99={latency.get('p99')}")
+
+
+def print_comparison(rows):
+    print(f"{'metric':<16}{'baseline':>12}{'candidate':>12}{'change':>10}")
+    for label, before, after, change, better in rows:
+        icon = "" if better is None else (" ✅" if better else " ❌")
+        change_text = "-" if change is None else f"{change:+.1f}%"
+        print(f"{label:<16}{str(before):>12}{str(after):>12}{change_text:>10}{icon}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the CASI /chat endpoint")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Generate load and record latencies")
+    run.add_argument("--url", default=DEFAULT_URL)
+    run.add_argument("--mode", choices=("rps", "concurrency"), default="concurrency")
+    run.add_argument("--rps", type=float, default=5.0, help="Target requests per second (rps mode)")
+    run.add_argument("--concurrency", type=int, default=10, help="Concurrent users (concurrency mode)")
+    run.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    run.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to reach full load")
+    run.add_argument("--timeout", type=float, default=30.0)
+    run.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    run.add_argument("--seed", type=int, help="Seed for a repeatable query sequence")
+    run.add_argument("--out", help="Write the JSON report here")
+
+    compare = commands.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.candidate, encoding="utf-8") as f:
+            candidate = json.load(f)
+        print_comparison(compare_reports(baseline, candidate))
+        return
+
+    mix = ScenarioMix(only=args.scenarios.split(",") if args.scenarios else None, seed=args.seed)
+    load_test = LoadTest(args.url, mix, args.mode, args.concurrency, args.rps, args.duration,
+                         args.ramp_up, args.timeout)
+    print(f"🚀 Starting {args.mode} load test against {args.url} for {args.duration:g}s")
+    report = asyncio.run(load_test.run())
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Measure idle CPU of the typing indicator.
+
+Runs the paint-based TypingIndicator and a replica of the old four-timer
+indicator (80 ms logo resize, 800 ms stylesheet pulse, 400 ms dots, 1 s phase)
+inside a chat-sized window for the same wall-clock time, once with the window
+shown and once with it hidden in the tray, and prints the CPU seconds used.
+Timing starts after a short warm-up, so the one-off fade-in and the first
+render of each cached frame are not counted as idle CPU.
+
+Usage: python measure_typing_indicator_cpu.py [seconds]
+(QT_QPA_PLATFORM=offscreen runs it without a display)
+"""
+
+import sys
+import time
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+
+from chatbot_ui import TypingIndicator
+
+WARM_UP_SECONDS = 4.0  # fade-in plus two full cycles, so every frame is cached
+
+PULSE_STYLES = [
+    "QLabel#typing_message { background: #f8f9ff; color: #495057; border: 1px solid #007bff; border-radius: 18px; padding: 16px 20px; font-size: 14px; }",
+    "QLabel#typing_message { background: #ffffff; color: #6c757d; border: 1px solid #e9ecef; border-radius: 18px; padding: 16px 20px; font-size: 14px; }",
+]
+
+
+def build_legacy_indicator():
+    """Replica of the timer-per-effect indicator this widget replaced."""
+    container = QWidget()
+    layout = QHBoxLayout(container)
+    logo = QLabel(container)
+    label = QLabel("CASI is thinking")
+    label.setObjectName("typing_message")
+    dots = QLabel("")
+    layout.addWidget(logo)
+    layout.addWidget(label)
+    layout.addWidget(dots)
+    state = {"scale": 1.0, "dir": 1, "pulse": 0, "dots": 0}
+
+    def breathe():
+        state["scale"] += 0.005 * state["dir"]
+        if not 0.98 <= state["scale"] <= 1.02:
+            state["dir"] *= -1
+        logo.setFixedSize(int(40 * state["scale"]), int(40 * state["scale"]))
+
+    def pulse():
+        state["pulse"] ^= 1
+        label.setStyleSheet(PULSE_STYLES[state["pulse"]])
+
+    def animate_dots():
+        state["dots"] += 1
+        dots.setText("".join("●" if i < state["dots"] % 4 else "○" for i in range(4)))
+
+    timers = []
+    for interval, callback in ((80, breathe), (800, pulse), (400, animate_dots), (1000, lambda: None)):
+        timer = QTimer(container)
+        timer.timeout.connect(callback)
+        timer.start(interval)
+        timers.append(timer)
+    container._timers = timers
+    return container
+
+
+def measure(indicator, seconds, visible=True):
+    window = QWidget()
+    window.resize(460, 580)
+    layout = QVBoxLayout(window)
+    layout.addWidget(indicator)
+    layout.addStretch()
+    window.show()
+    if isinstance(indicator, TypingIndicator):
+        indicator.start()
+    if not visible:
+        window.hide()
+    loop = QEventLoop()
+    QTimer.singleShot(int(WARM_UP_SECONDS * 1000), loop.quit)
+    loop.exec_()
+    start = time.process_time()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+    used = time.process_time() - start
+    window.hide()
+    return used
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    app = QApplication(sys.argv)
+
+    print(f"⏱️  Measured {seconds:.0f}s per indicator")
+    for visible in (True, False):
+        legacy_cpu = measure(build_legacy_indicator(), seconds, visible)
+        new_cpu = measure(TypingIndicator(), seconds, visible)
+        print(f"   Window {'shown' if visible else 'hidden'}:")
+        print(f"      Legacy four-timer indicator: {legacy_cpu:.4f}s CPU")
+        print(f"      TypingIndicator (QTimeLine): {new_cpu:.4f}s CPU")
+        if new_cpu > 0:
+            print(f"      Ratio: {legacy_cpu / new_cpu:.1f}x lower")
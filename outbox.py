@@ -0,0 +1,200 @@
+# Durable outbox for tickets and alerts sent by the CASI desktop client
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+
+MAX_ATTEMPTS = 8
+BASE_DELAY = 2.0
+MAX_DELAY = 300.0
+# Delivered items are kept this long so a re-submitted ticket is still deduplicated
+SENT_RETENTION_DAYS = 7
+IDLE_POLL_SECONDS = 30.0
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+# Reported to the status callback only; the row stays pending
+STATUS_RETRYING = "retrying"
+
+
+def make_idempotency_key(kind, payload):
+    """Stable key for a payload so double submissions collapse into one item."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{kind}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+class Outbox:
+    """SQLite-backed queue drained by a background thread with retry and backoff.
+
+    Handlers are registered per kind and called as ``handler(payload)``. A
+    truthy return marks the item sent (a string return is passed on as the
+    status detail); a falsy return or an exception schedules a retry.
+    """
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 on_status=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_status = on_status
+        self.handlers = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+            self._conn.execute(
+                "DELETE FROM outbox WHERE status != ? AND updated_at < ?",
+                (STATUS_PENDING, time.time() - SENT_RETENTION_DAYS * 86400),
+            )
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload, idempotency_key=None):
+        """Persist an item and wake the worker. Returns ``(item_id, created)``."""
+        key = idempotency_key or make_idempotency_key(kind, payload)
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, kind, payload, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload, ensure_ascii=False), now, now, now),
+            )
+            created = cursor.rowcount == 1
+            item_id = self._conn.execute(
+                "SELECT id FROM outbox WHERE idempotency_key = ?", (key,)).fetchone()["id"]
+        if created:
+            self._wake.set()
+        return item_id, created
+
+    def get(self, item_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM outbox WHERE id = ?", (item_id,)).fetchone()
+        return dict(row) if row else None
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = ?", (STATUS_PENDING,)).fetchone()[0]
+
+    def start(self):
+        """Start the drain thread; items left pending by a previous run are resumed."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="casi-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+    def process_due(self, now=None):
+        """Attempt every due item once. Returns the number of items attempted."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY id",
+                (STATUS_PENDING, now),
+            ).fetchall()
+        for row in rows:
+            if self._stopping.is_set():
+                break
+            self._attempt(dict(row))
+        return len(rows)
+
+    def seconds_until_next(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?", (STATUS_PENDING,)).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.process_due()
+            except Exception as e:
+                print(f"Outbox worker error: {e}")
+            wait = self.seconds_until_next()
+            self._wake.wait(IDLE_POLL_SECONDS if wait is None else min(wait, IDLE_POLL_SECONDS))
+            self._wake.clear()
+
+    def _attempt(self, item):
+        handler = self.handlers.get(item["kind"])
+        attempts = item["attempts"] + 1
+        error = None
+        result = None
+        if handler is None:
+            error = f"No handler registered for {item['kind']}"
+        else:
+            try:
+                result = handler(json.loads(item["payload"]))
+                if not result:
+                    error = "Handler reported failure"
+            except Exception as e:
+                error = str(e)
+
+        now = time.time()
+        if error is None:
+            self._update(item["id"], STATUS_SENT, attempts, now, None)
+            self._report(item, STATUS_SENT, result if isinstance(result, str) else "", attempts)
+        elif attempts >= self.max_attempts:
+            self._update(item["id"], STATUS_FAILED, attempts, now, error)
+            self._report(item, STATUS_FAILED, error, attempts)
+        else:
+            self._update(item["id"], STATUS_PENDING, attempts, now + self._backoff(attempts), error)
+            self._report(item, STATUS_RETRYING, error, attempts)
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter so many clients do not retry in lockstep."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _update(self, item_id, status, attempts, next_attempt_at, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, attempts, next_attempt_at, error, time.time(), item_id),
+            )
+
+    def _report(self, item, status, detail, attempts):
+        print(f"Outbox item {item['id']} ({item['kind']}): {status} after {attempts} attempt(s) {detail or ''}")
+        if self.on_status:
+            try:
+                self.on_status(item["id"], item["kind"], status, detail or "", attempts)
+            except Exception as e:
+                print(f"Outbox status callback failed: {e}")
@@ -6,7 +6,7 @@ from datetime import datetime
 # Power Automate Webhook URL
 POWER_AUTOMATE_URL = "https://prod-88.southeastasia.logic.azure.com:443/workflows/e1ba333c4808479c86c7251c0ebb2c6b/triggers/manual/paths/invoke?api-version=2016-06-01&sp=%2Ftriggers%2Fmanual%2Frun&sv=1.0&sig=Dcvy8b0SH8SM_-ux4hefDRUqC1maFD0Ft2yLZ-hr6Cg"
 
-def send_power_automate_alert(alert_data):
+def send_power_automate_alert(alert_data, timeout=30):
     """Send IT alert to Power Automate"""
     try:
         # Prepare the data for Power Automate
@@ -30,7 +30,7 @@ def send_power_automate_alert(alert_data):
             POWER_AUTOMATE_URL,
             headers=headers,
             json=power_automate_data,
-            timeout=30
+            timeout=timeout
         )
         
         if response.status_code == 200:
@@ -6,6 +6,7 @@ Script to switch between different CASI backend configurations
 import os
 import json
 from pathlib import Path
+from backend_selector import AUTO_BACKEND
 
 def get_config_path():
     """Get the path to the configuration file."""
@@ -35,6 +36,11 @@ def switch_backend():
     
     # Available backends
     backends = {
+        "0": {
+            "name": "Automatic",
+            "url": AUTO_BACKEND,
+            "description": "Use the fastest healthy backend and fail over automatically"
+        },
         "1": {
             "name": "On-Premise Server",
             "url": "http://172.16.11.69:9000",
@@ -63,13 +69,13 @@ def switch_backend():
     for key, backend in backends.items():
         print(f"  {key}. {backend['name']}")
         print(f"     {backend['description']}")
-        if backend['url']:
+        if backend['url'] and backend['url'] != AUTO_BACKEND:
             print(f"     URL: {backend['url']}")
         print()
     
     # Get user choice
     while True:
-        choice = input("Select backend (1-3) or 'q' to quit: ").strip()
+        choice = input("Select backend (0-3) or 'q' to quit: ").strip()
         
         if choice.lower() == 'q':
             print("👋 Goodbye!")
@@ -78,7 +84,7 @@ def switch_backend():
         if choice in backends:
             break
         else:
-            print("❌ Invalid choice. Please select 1, 2, 3, or 'q'.")
+            print("❌ Invalid choice. Please select 0, 1, 2, 3, or 'q'.")
     
     # Handle custom URL
     if choice == "3":
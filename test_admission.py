@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for /chat admission control: concurrency cap, priority queue and load shedding
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from admission import (AdmissionController, Overloaded, PRIORITY_ANONYMOUS, PRIORITY_ESCALATION,
+                       PRIORITY_USER)
+
+
+def wait_until(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def queue_request(controller, priority, admitted, errors):
+    def run():
+        try:
+            controller.acquire(priority)
+        except Overloaded as e:
+            errors.append((priority, e.reason))
+            return
+        admitted.append(priority)
+        controller.release(0.01)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_waiters_are_admitted_by_priority():
+    controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=5)
+    controller.acquire(PRIORITY_ANONYMOUS)
+    admitted, errors, threads = [], [], []
+    for priority in (PRIORITY_ANONYMOUS, PRIORITY_USER, PRIORITY_ANONYMOUS, PRIORITY_ESCALATION):
+        threads.append(queue_request(controller, priority, admitted, errors))
+        wait_until(lambda: len(controller.queue) == len(threads))
+    assert controller.stats()["in_flight"] == 1
+
+    controller.release(0.5)
+    for thread in threads:
+        thread.join(5)
+    assert admitted == [PRIORITY_ESCALATION, PRIORITY_USER, PRIORITY_ANONYMOUS, PRIORITY_ANONYMOUS]
+    assert errors == []
+    stats = controller.stats()
+    assert stats["in_flight"] == 0 and stats["queued"] == 0 and stats["admitted"] == 5
+    assert stats["queue_wait_ms"]["max"] > 0
+
+
+def test_full_queue_sheds_the_lowest_priority():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+    controller.acquire(PRIORITY_USER)
+    admitted, errors = [], []
+    anonymous = queue_request(controller, PRIORITY_ANONYMOUS, admitted, errors)
+    wait_until(lambda: len(controller.queue) == 1)
+
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire(PRIORITY_ANONYMOUS)
+    assert rejected.value.reason == "queue_full" and rejected.value.retry_after >= 1
+
+    escalation = queue_request(controller, PRIORITY_ESCALATION, admitted, errors)
+    anonymous.join(5)
+    assert errors == [(PRIORITY_ANONYMOUS, "evicted")]
+    controller.release(0.01)
+    escalation.join(5)
+    assert admitted == [PRIORITY_ESCALATION]
+    stats = controller.stats()
+    assert stats["shed"] == {"queue_full": 1, "evicted": 1, "timeout": 0}
+    assert stats["shed_by_priority"]["anonymous"] == 2 and stats["shed_by_priority"]["escalation"] == 0
+
+
+def test_waiters_are_shed_after_the_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    controller.acquire(PRIORITY_USER)
+    with pytest.raises(Overloaded) as rejected:
+        controller.acquire(PRIORITY_USER)
+    assert rejected.value.reason == "timeout"
+    assert controller.stats()["queued"] == 0
+    controller.release(0.01)
+    assert controller.acquire(PRIORITY_ANONYMOUS) == 0.0
+
+
+def test_overloaded_endpoints_return_503_with_retry_after(monkeypatch):
+    import debug_events
+    import index
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", "s3cret")
+    monkeypatch.setattr(index.admission, "max_concurrent", 0)
+    monkeypatch.setattr(index.admission, "max_queue", 0)
+    logging.disable(logging.CRITICAL)
+    try:
+        app = index.app.test_client()
+        response = app.post("/chat", json={"message": "hello"})
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert response.get_json()["retry_after"] == int(response.headers["Retry-After"])
+
+        # An unverified token does not buy escalation priority
+        response = app.post("/it-on-duty", json={"access_token": "t", "concern": "VPN down"})
+        assert response.status_code == 503
+        stats = app.get("/debug/admission", headers={"X-Debug-Token": "s3cret"}).get_json()
+        assert stats["shed_by_priority"]["user"] >= 1 and stats["shed_by_priority"]["escalation"] == 0
+
+        monkeypatch.setitem(index.token_email_cache, index.token_cache_key("t"),
+                            ("jdoe@castotravel.ph", time.time() + 60))
+        response = app.post("/it-on-duty", json={"access_token": "t", "concern": "VPN down"})
+        assert response.status_code == 503
+        stats = app.get("/debug/admission", headers={"X-Debug-Token": "s3cret"}).get_json()
+        assert stats["shed_by_priority"]["anonymous"] >= 1 and stats["shed_by_priority"]["escalation"] >= 1
+    finally:
+        logging.disable(logging.NOTSET)
+
+    monkeypatch.setattr(index.admission, "max_concurrent", 6)
+    response = index.app.test_client().post("/it-on-duty", json={"concern": "VPN down"})
+    assert response.status_code == 401 and "X-Queue-Wait-Ms" in response.headers
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for IT alert coalescing and digest cards
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "casi-teams-bot"))
+
+from alert_coalescer import AlertCoalescer, digest_alert_data
+from teams_connector_cards import TeamsConnectorCards
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _alert(user, concern, priority="Network"):
+    return {"priority": priority, "windows_user": user, "hostname": f"{user}-PC",
+            "concern": concern, "timestamp": "2025-01-15T09:30:00"}
+
+
+def test_similar_alerts_become_one_digest():
+    """The first report goes out at once; similar follow-ups are held and released as one batch"""
+    clock = FakeClock()
+    coalescer = AlertCoalescer(window=60, max_hold=180, clock=clock)
+    assert coalescer.add(_alert("anna", "No internet connection on my laptop")) == [
+        [_alert("anna", "No internet connection on my laptop")]]
+    clock.now = 20
+    assert coalescer.add(_alert("ben", "internet connection is down")) == []
+    clock.now = 30
+    assert coalescer.add(_alert("dave", "internet connection dropped")) == []
+    assert len(coalescer.add(_alert("carl", "printer jammed again", priority="Printer/Scanner"))) == 1
+    clock.now = 80
+    assert coalescer.due() == []  # window slides with each new alert
+    clock.now = 91
+    batches = coalescer.due()
+    assert [[a["windows_user"] for a in batch] for batch in batches] == [["ben", "dave"]]
+    assert coalescer.next_due_in() is None and coalescer.groups == []
+
+
+def test_lone_alert_is_not_held():
+    clock = FakeClock()
+    coalescer = AlertCoalescer(window=60, max_hold=180, clock=clock)
+    assert len(coalescer.add(_alert("erin", "outlook keeps crashing"))) == 1
+    assert coalescer.pending_count() == 0 and coalescer.next_due_in() is None
+    clock.now = 61
+    assert coalescer.due() == []
+    # Once the window has closed, a similar report starts a new group and is sent at once too
+    assert len(coalescer.add(_alert("erin", "outlook crashing again"))) == 1
+
+
+def test_critical_alert_skips_the_window():
+    clock = FakeClock()
+    coalescer = AlertCoalescer(clock=clock)
+    batches = coalescer.add(_alert("dana", "server room flooding", priority="Critical"))
+    assert batches == [[_alert("dana", "server room flooding", priority="Critical")]]
+    assert coalescer.pending_count() == 0
+
+
+def test_max_hold_caps_latency():
+    """A continuous stream of reports is still flushed after max_hold"""
+    clock = FakeClock()
+    coalescer = AlertCoalescer(window=60, max_hold=100, clock=clock)
+    for i in range(6):
+        clock.now = i * 19
+        coalescer.add(_alert(f"user{i}", "wifi keeps dropping"))
+    clock.now = 100
+    assert len(coalescer.due()[0]) == 5  # user0 was sent on arrival
+
+
+def test_digest_card_and_power_automate_summary():
+    alerts = [_alert("anna", "vpn down"), _alert("ben", "vpn not connecting")]
+    card = TeamsConnectorCards().create_digest_card(alerts)
+    assert "2 alerts from 2 user(s)" in card["title"]
+    assert [f["name"] for f in card["sections"][0]["facts"]] == ["anna (anna-PC)", "ben (ben-PC)"]
+    summary = digest_alert_data(alerts)
+    assert summary["windows_user"] == "anna, ben"
+    assert summary["concern"].startswith("2 similar alerts")
+
+
+if __name__ == "__main__":
+    for test in (test_similar_alerts_become_one_digest, test_lone_alert_is_not_held,
+                 test_critical_alert_skips_the_window,
+                 test_max_hold_caps_latency, test_digest_card_and_power_automate_summary):
+        test()
+        print(f"✅ {test.__name__}")
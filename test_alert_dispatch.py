@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the IT-on-duty alert dispatcher
+"""
+
+import time
+
+from alert_dispatch import AlertChannel, AlertDispatcher
+
+
+def _channel(name, endpoint, delay, ok, calls):
+    def send(alert_data, timeout):
+        calls.append((name, timeout))
+        time.sleep(delay)
+        return ok
+    return AlertChannel(name, endpoint, send)
+
+
+def test_channels_sharing_an_endpoint_are_tried_once():
+    """The custom bot and Azure bot both post to the local relay"""
+    calls = []
+    dispatcher = AlertDispatcher([
+        _channel("custom_bot", "http://localhost:3978/api/send-alert", 0, False, calls),
+        _channel("azure_bot", "http://localhost:3978/api/send-alert", 0, False, calls),
+        _channel("teams_webhook", "https://example.webhook.office.com/x", 0, True, calls),
+    ], stagger=5)
+    result = dispatcher.dispatch({"concern": "vpn"})
+    assert [name for name, _ in calls] == ["custom_bot", "teams_webhook"]
+    assert result["delivered"] and result["channel"] == "teams_webhook"
+    assert set(result["latency_ms"]) == {"custom_bot", "teams_webhook"}
+
+
+def test_slow_channel_is_hedged_after_stagger():
+    """A hanging first channel does not hold the alert for its full timeout"""
+    calls = []
+    dispatcher = AlertDispatcher([
+        _channel("custom_bot", "relay", 2.0, True, calls),
+        _channel("teams_webhook", "webhook", 0.05, True, calls),
+        _channel("power_automate", "flow", 0, True, calls),
+    ], deadline=5, stagger=0.2)
+    started = time.monotonic()
+    result = dispatcher.dispatch({"concern": "printer"})
+    assert time.monotonic() - started < 1.0
+    assert result["channel"] == "teams_webhook"
+    assert "power_automate" not in [name for name, _ in calls]
+
+
+def test_deadline_bounds_total_time():
+    """Nothing succeeds: dispatch gives up at the deadline and passes the remaining time on"""
+    calls = []
+    dispatcher = AlertDispatcher([
+        _channel("custom_bot", "relay", 1.0, False, calls),
+        _channel("teams_webhook", "webhook", 1.0, False, calls),
+    ], deadline=0.3, stagger=0.1)
+    started = time.monotonic()
+    result = dispatcher.dispatch({"concern": "laptop"})
+    assert time.monotonic() - started < 0.6
+    assert not result["delivered"]
+    assert all(timeout <= 0.3 for _, timeout in calls)
+
+
+if __name__ == "__main__":
+    for test in (test_channels_sharing_an_endpoint_are_tried_once, test_slow_channel_is_hedged_after_stagger,
+                 test_deadline_bounds_total_time):
+        test()
+        print(f"✅ {test.__name__}")
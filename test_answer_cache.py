@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the client answer cache and the backend kb_version validation
+"""
+
+import logging
+import os
+import sys
+import tempfile
+
+from answer_cache import AnswerCache, cache_key, normalize_question
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_questions_share_entries_per_auth_state():
+    assert normalize_question("  Who is the CEO?? ") == "who is the ceo"
+    assert normalize_question("Sabre PCC") == normalize_question("sabre, pcc!")
+    assert cache_key("Who is the CEO?", True) == cache_key("who is the ceo", True)
+    assert cache_key("Who is the CEO?", True) != cache_key("Who is the CEO?", False)
+
+
+def test_fresh_stale_and_version_change():
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.json")
+        cache = AnswerCache(path, fresh_seconds=60, max_age_seconds=3600, clock=clock)
+        cache.store("Who is the CEO?", False, "Marc Casto is the CEO.", "v1")
+        entry, state = cache.lookup("who is the ceo", False)
+        assert state == "fresh" and entry["answer"] == "Marc Casto is the CEO."
+        assert cache.lookup("who is the ceo", True) == (None, None)
+
+        clock.now += 120
+        assert cache.lookup("who is the ceo", False)[1] == "stale"
+        cache.mark_validated("v1")
+        assert cache.lookup("who is the ceo", False)[1] == "fresh"
+
+        # Reloaded from disk, then a new knowledge-base version invalidates it
+        reloaded = AnswerCache(path, fresh_seconds=60, clock=clock)
+        assert reloaded.lookup("Who is the CEO?", False)[1] == "fresh"
+        reloaded.observe_version("v2")
+        assert reloaded.lookup("Who is the CEO?", False) == (None, None)
+
+        clock.now += 3601
+        assert cache.lookup("who is the ceo", False) == (None, None)
+
+
+def test_versions_are_tracked_per_backend():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.json")
+        cache = AnswerCache(path)
+        cache.store("Who is the CEO?", False, "Marc Casto (on-prem).", "onprem-v1", backend="http://onprem:9000")
+        cache.store("Sabre PCC", False, "AAAPCC (cloud).", "cloud-v1", backend="https://cloud")
+        # Failing over between backends with different versions keeps both sets of answers
+        cache.observe_version("cloud-v1", "https://cloud")
+        cache.observe_version("onprem-v1", "http://onprem:9000")
+        assert cache.lookup("who is the ceo", False)[1] == "fresh"
+        assert cache.lookup("sabre pcc", False)[1] == "fresh"
+
+        cache.observe_version("cloud-v2", "https://cloud")
+        assert cache.lookup("sabre pcc", False) == (None, None)
+        reloaded = AnswerCache(path)
+        assert reloaded.lookup("who is the ceo", False)[0]["backend"] == "http://onprem:9000"
+        assert reloaded.stats()["kb_versions"] == {"http://onprem:9000": "onprem-v1", "https://cloud": "cloud-v2"}
+
+
+def test_eviction_by_count_and_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnswerCache(os.path.join(tmp, "answers.json"), max_entries=3, max_bytes=10_000)
+        for n in range(5):
+            cache.store(f"question {n}", False, f"answer {n}", "v1")
+        assert cache.stats()["entries"] == 3
+        assert cache.lookup("question 0", False) == (None, None)
+        cache.lookup("question 2", False)  # most recently used is evicted last
+        cache.store("big", False, "x" * 9_980, "v1")
+        assert cache.stats()["bytes"] <= 10_000
+        assert cache.lookup("question 3", False) == (None, None)
+        assert cache.lookup("question 2", False)[1] == "fresh"
+        assert cache.lookup("big", False)[1] == "fresh"
+
+
+def test_backend_reports_kb_version_and_answers_304(monkeypatch, tmp_path):
+    import index
+    from knowledge_store import KnowledgeStore
+    monkeypatch.setattr(index, "knowledge_store", KnowledgeStore(str(tmp_path / "knowledge.db")))
+    monkeypatch.setattr(index, "client", None)
+    monkeypatch.setattr(index, "fetch_website_data", lambda url, query=None: None)
+    logging.disable(logging.CRITICAL)
+    try:
+        app = index.app.test_client()
+        index.conversation_cache.clear()
+        data = app.post("/chat", json={"message": "What is the PCC in Sabre?"}).get_json()
+        assert data["kb_version"] == index.KB_VERSION and data["cacheable"] is True
+
+        response = app.get("/kb-version")
+        assert response.status_code == 200 and response.headers["ETag"] == f'"{index.KB_VERSION}"'
+        assert app.get("/kb-version", headers={"If-None-Match": f'"{index.KB_VERSION}"'}).status_code == 304
+        assert app.get("/kb-version", headers={"If-None-Match": '"outdated"'}).status_code == 200
+
+        # A stored knowledge entry changes the version clients validate against
+        index.knowledge_store.add("The Sabre PCC for Manila is ABC1.", "admin@castotravel.ph")
+        assert app.get("/kb-version", headers={"If-None-Match": f'"{index.KB_VERSION}"'}).status_code == 200
+    finally:
+        index.knowledge_store.close()
+        logging.disable(logging.NOTSET)
+        index.conversation_cache.clear()
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
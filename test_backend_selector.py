@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for latency-aware backend selection and failover
+"""
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from backend_selector import AUTO_BACKEND, DEFAULT_BACKENDS, BackendSelector, create_backend_selector
+
+
+class FakeBackend(BaseHTTPRequestHandler):
+    """Backend stand-in; the server's ``delay`` and ``status`` control its answers."""
+
+    def log_message(self, *args):
+        pass
+
+    def _answer(self):
+        time.sleep(self.server.delay)
+        self.server.hits += 1
+        body = self.server.name.encode()
+        self.send_response(self.server.status)
+        for name, value in self.server.extra_headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._answer()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._answer()
+
+
+def _server(name, delay=0.0, status=200, headers=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBackend)
+    server.name, server.delay, server.status = name, delay, status
+    server.extra_headers, server.hits = headers or {}, 0
+    server.handle_error = lambda request, client_address: None  # clients that timed out hang up
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _closed_port_url():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+def test_probes_pick_fastest_and_choice_is_sticky():
+    slow, slow_url = _server("slow", delay=0.15)
+    fast, fast_url = _server("fast")
+    try:
+        selector = BackendSelector([("slow", slow_url), ("fast", fast_url)])
+        assert selector.current().name == "slow"  # configured order until probed
+        selector.probe_all()
+        assert selector.current().name == "fast"
+        # Latency swings without a health change do not move requests
+        fast.delay = 0.5
+        selector.probe_all()
+        selector.probe_all()
+        assert selector.current().name == "fast"
+        assert selector.backends[1].ewma_ms > selector.backends[0].ewma_ms
+    finally:
+        slow.shutdown()
+        fast.shutdown()
+
+
+def test_request_fails_over_without_waiting():
+    backup, backup_url = _server("backup")
+    changes = []
+    try:
+        selector = BackendSelector([("down", _closed_port_url()), ("backup", backup_url)],
+                                   on_change=lambda old, new: changes.append((old.name, new.name)))
+        started = time.monotonic()
+        response = selector.post("/chat", json={"message": "hi"}, timeout=5)
+        assert response.text == "backup"
+        assert time.monotonic() - started < 1.0
+        assert changes == [("down", "backup")]
+        assert selector.snapshot()["backends"][0]["healthy"] is False
+        # The next request goes straight to the healthy backend
+        assert selector.ordered()[0].name == "backup"
+    finally:
+        backup.shutdown()
+
+
+def test_busy_backend_fails_over_and_recovery_is_picked_up():
+    primary, primary_url = _server("primary", status=503)
+    backup, backup_url = _server("backup", delay=0.05)
+    try:
+        selector = BackendSelector([("primary", primary_url), ("backup", backup_url)])
+        assert selector.get("/", timeout=5).text == "backup"
+        assert selector.current().name == "backup"
+        primary.status = 200
+        selector.probe_all()
+        assert selector.current().name == "primary"
+    finally:
+        primary.shutdown()
+        backup.shutdown()
+
+
+def test_load_shedding_is_busy_not_unhealthy():
+    """A 503 with Retry-After goes back to the caller instead of moving the load elsewhere"""
+    primary, primary_url = _server("primary", status=503, headers={"Retry-After": "2"})
+    backup, backup_url = _server("backup")
+    try:
+        selector = BackendSelector([("primary", primary_url), ("backup", backup_url)])
+        response = selector.post("/chat", json={"message": "hi"}, timeout=5)
+        assert response.status_code == 503 and response.headers["Retry-After"] == "2"
+        assert backup.hits == 0
+        assert selector.current().name == "primary" and selector.backends[0].healthy is None
+    finally:
+        primary.shutdown()
+        backup.shutdown()
+
+
+def test_timeouts_share_one_deadline_and_posts_are_not_resent():
+    slow, slow_url = _server("slow", delay=0.6)
+    backup, backup_url = _server("backup")
+    try:
+        selector = BackendSelector([("slow", slow_url), ("backup", backup_url)])
+        started = time.monotonic()
+        try:
+            selector.post("/it-on-duty", json={"concern": "vpn"}, timeout=0.3)
+            assert False, "expected Timeout"
+        except requests.exceptions.Timeout:
+            pass
+        assert time.monotonic() - started < 0.55
+        assert backup.hits == 0 and selector.backends[0].healthy is False
+
+        # An idempotent GET fails over, but only within what is left of the same budget
+        selector = BackendSelector([("slow", slow_url), ("backup", backup_url)])
+        started = time.monotonic()
+        assert selector.get("/kb-version", timeout=0.5).text == "backup"
+        assert time.monotonic() - started < 0.55
+    finally:
+        slow.shutdown()
+        backup.shutdown()
+
+
+def test_pinned_url_uses_single_backend():
+    assert [b.url for b in create_backend_selector(AUTO_BACKEND).backends] == [url for _, url in DEFAULT_BACKENDS]
+    pinned = create_backend_selector("http://localhost:9000/")
+    assert [b.url for b in pinned.backends] == ["http://localhost:9000"]
+
+
+if __name__ == "__main__":
+    for test in (test_probes_pick_fastest_and_choice_is_sticky, test_request_fails_over_without_waiting,
+                 test_busy_backend_fails_over_and_recovery_is_picked_up, test_load_shedding_is_busy_not_unhealthy,
+                 test_timeouts_share_one_deadline_and_posts_are_not_resent, test_pinned_url_uses_single_backend):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the append-only chat history store
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from chat_history_store import ChatHistoryStore
+
+
+def _store(tmpdir, **kwargs):
+    return ChatHistoryStore(os.path.join(tmpdir, "chat_history.jsonl"), **kwargs)
+
+
+def test_append_and_load_tail():
+    """Appends are readable and the tail returns only the last N messages"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = _store(tmpdir, max_messages=0)
+        for i in range(2000):
+            store.append(f"message {i}", "user" if i % 2 else "bot")
+        tail = store.load_tail(5)
+        assert [m["text"] for m in tail] == [f"message {i}" for i in range(1995, 2000)]
+        assert tail[-1]["sender"] == "user"
+
+
+def test_torn_last_line_is_skipped_and_repaired():
+    """A crash mid-append must not lose earlier messages"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = _store(tmpdir)
+        store.append("first", "user")
+        store.append("second", "bot")
+        with open(store.path, "a", encoding="utf-8") as f:
+            f.write('{"text": "torn')
+        assert [m["text"] for m in _store(tmpdir).load_tail(10)] == ["first", "second"]
+
+        reopened = _store(tmpdir)
+        reopened.append("third", "user")
+        assert [m["text"] for m in reopened.load_tail(10)] == ["first", "second", "third"]
+
+
+def test_compaction_applies_retention():
+    """Compaction keeps the newest messages and drops expired ones"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = _store(tmpdir, max_messages=10, max_age_days=1, compact_slack=5)
+        old = {"text": "old", "sender": "bot", "ts": time.time() - 3 * 86400}
+        with open(store.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(old) + "\n")
+        for i in range(16):
+            store.append(f"m{i}", "user")
+        if store._compact_thread:
+            store._compact_thread.join(5)
+        texts = [m["text"] for m in store.load_tail(100)]
+        assert "old" not in texts
+        assert texts == [f"m{i}" for i in range(6, 16)]
+        assert not os.path.exists(f"{store.path}.{os.getpid()}.tmp")
+
+
+def test_legacy_json_migration():
+    """The old indent=2 chat_history.json is imported once"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        legacy = os.path.join(tmpdir, "chat_history.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([["hello", "user"], {"text": "hi there", "sender": "bot"}], f, indent=2)
+        store = _store(tmpdir)
+        assert store.migrate_legacy_json(legacy) == 2
+        assert store.migrate_legacy_json(legacy) == 0
+        assert [(m["text"], m["sender"]) for m in store.load_tail(10)] == [("hello", "user"), ("hi there", "bot")]
+
+
+if __name__ == "__main__":
+    for test in (test_append_and_load_tail, test_torn_last_line_is_skipped_and_repaired,
+                 test_compaction_applies_retention, test_legacy_json_migration):
+        test()
+        print(f"✅ {test.__name__}")
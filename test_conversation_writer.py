@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for write-behind conversation persistence
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from conversation_writer import ConversationWriter
+from sqlite_pool import SQLitePool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool(str(tmp_path / "conversations.db"))
+    yield pool
+    pool.close_all()
+
+
+def count_turns(pool):
+    with pool.reader() as conn:
+        return conn.execute("SELECT COUNT(*) FROM conversation_turns").fetchone()[0]
+
+
+def test_concurrent_turns_are_group_committed(pool):
+    writer = ConversationWriter(pool, flush_interval=0.05)
+    writer.start()
+    try:
+        threads = [threading.Thread(target=writer.record, args=(f"user{n}@castotravel.ph", "hi", "hello"))
+                   for n in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert writer.flush(timeout=5)
+        assert count_turns(pool) == 40
+        assert writer.stats()["written"] == 40 and writer.stats()["batches"] < 40
+    finally:
+        writer.stop()
+
+
+def test_stop_flushes_and_turns_survive_a_restart(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    clock = FakeClock()
+    pool = SQLitePool(path)
+    writer = ConversationWriter(pool, flush_interval=10, clock=clock)
+    writer.start()
+    for n in range(12):
+        writer.record("ana@castotravel.ph", f"question {n}", f"answer {n}", clock.now - 12 + n)
+    writer.record("old@castotravel.ph", "stale question", "stale answer", clock.now - 7200)
+    writer.record("ben@castotravel.ph", "printer?", "restart it", clock.now)
+    writer.stop()  # cleanup() path: nothing is left in the queue
+    pool.close_all()
+
+    pool = SQLitePool(path)
+    try:
+        restored = ConversationWriter(pool, clock=clock).recent_turns(1800, 10)
+        ana = [t["user_input"] for t in restored if t["user_id"] == "ana@castotravel.ph"]
+        assert ana == [f"question {n}" for n in range(2, 12)]
+        assert {t["user_id"] for t in restored} == {"ana@castotravel.ph", "ben@castotravel.ph"}
+    finally:
+        pool.close_all()
+
+
+def test_clear_user_is_ordered_after_pending_turns(pool):
+    writer = ConversationWriter(pool)
+    writer.record("ana@castotravel.ph", "hi", "hello")
+    writer.clear_user("ana@castotravel.ph")
+    writer.record("ben@castotravel.ph", "hi", "hello")
+    assert writer.flush()
+    assert [t["user_id"] for t in writer.recent_turns(3600, 10)] == ["ben@castotravel.ph"]
+
+
+def test_user_turns_let_another_worker_rebuild_the_context(pool):
+    clock = FakeClock()
+    writer = ConversationWriter(pool, clock=clock)
+    writer.record("ana@castotravel.ph", "too old", "...", timestamp=clock.now - 7200)
+    for i in range(4):
+        writer.record("ana@castotravel.ph", f"question {i}", f"answer {i}", timestamp=clock.now)
+    writer.record("ben@castotravel.ph", "hi", "hello", timestamp=clock.now)
+    assert writer.flush()
+
+    # A second worker opens the same file with its own pool
+    other = ConversationWriter(SQLitePool(pool.path), clock=clock)
+    turns = other.user_turns("ana@castotravel.ph", 3600, 3)
+    assert [t["user_input"] for t in turns] == ["question 1", "question 2", "question 3"]
+    other.pool.close_all()
+
+
+def test_ttl_retention_with_incremental_vacuum(pool):
+    clock = FakeClock()
+    writer = ConversationWriter(pool, ttl_seconds=3600, vacuum_pages=10_000, clock=clock)
+    with pool.writer() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+    for n in range(300):
+        writer.record("ana@castotravel.ph", "x" * 2000, "y" * 2000, clock.now - 7200)
+    writer.record("ana@castotravel.ph", "recent", "kept", clock.now)
+    assert writer.flush()
+    with pool.reader() as conn:
+        pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+
+    assert writer.apply_retention() == 300
+    assert count_turns(pool) == 1
+    with pool.reader() as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        assert conn.execute("PRAGMA page_count").fetchone()[0] < pages_before
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
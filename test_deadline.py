@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for per-request deadlines: header parsing, outbound timeouts and partial /chat answers
+"""
+
+import logging
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, jsonify
+from openai import APITimeoutError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from deadline import (Deadline, DeadlineExceeded, DEADLINE_HEADER, parse_timeout_header, register_deadlines,
+                      time_left)
+from knowledge_store import KnowledgeStore
+from llm_scheduler import LLMScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingLLM:
+    """Groq stand-in that records the timeout each call was given, optionally timing out."""
+
+    def __init__(self, time_out=False):
+        self.timeouts = []
+        self.time_out = time_out
+        self.chat = self.completions = self.with_raw_response = self
+
+    def create(self, model, messages, temperature=None, timeout=None):
+        self.timeouts.append(timeout)
+        if self.time_out:
+            raise APITimeoutError(request=None)
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Full answer"))],
+                                     usage=None)
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+
+def test_deadline_budget_and_header_parsing():
+    clock = FakeClock()
+    deadline = Deadline(2.0, clock=clock)
+    assert deadline.timeout(15) == 2.0 and deadline.timeout(1) == 1
+    assert deadline.timeout(15, reserve=1.5) == 0.5
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        deadline.timeout(15, "website", reserve=1.9)
+    assert exceeded.value.stage == "website"
+    clock.now += 1.5
+    assert deadline.allows(0.5) and not deadline.allows(0.6)
+    clock.now += 10
+    assert deadline.remaining() == 0.0
+
+    assert parse_timeout_header("8000") == 8.0
+    assert parse_timeout_header("250", default=5) == 0.25
+    assert parse_timeout_header("600000") == 60.0
+    for bad in (None, "", "soon", "-5", "0", "nan"):
+        assert parse_timeout_header(bad, default=7) == 7
+
+
+def test_requests_get_a_deadline_from_the_header():
+    app = Flask(__name__)
+    register_deadlines(app, default_seconds=8, margin=0.5)
+
+    @app.route("/budget")
+    def budget():
+        try:
+            website = time_left(15, "website", reserve=3)
+        except DeadlineExceeded as exceeded:
+            website = exceeded.stage
+        return jsonify({"graph": time_left(10, "graph"), "website": website})
+
+    client = app.test_client()
+    response = client.get("/budget", headers={DEADLINE_HEADER: "2500"})
+    assert response.get_json()["graph"] <= 2.0 and response.get_json()["website"] == "website"
+    assert 0 < int(response.headers["X-Deadline-Remaining-Ms"]) <= 2000
+
+    budget = client.get("/budget").get_json()
+    assert budget["graph"] == pytest.approx(7.5, abs=0.1) and budget["website"] == pytest.approx(4.5, abs=0.1)
+    assert time_left(10) == 10
+
+
+def test_running_out_of_time_while_verifying_the_token_is_not_an_auth_failure(monkeypatch):
+    import requests
+    import index
+
+    class SlowGraph:
+        def __init__(self):
+            self.timeouts = []
+
+        def get(self, url, headers=None, timeout=None):
+            self.timeouts.append(timeout)
+            raise requests.exceptions.ReadTimeout("Graph did not answer")
+
+    graph = SlowGraph()
+    monkeypatch.setattr(index, "session", graph)
+    logging.disable(logging.CRITICAL)
+    try:
+        app = index.app.test_client()
+        # Too little left to even ask Graph, then Graph cut short by the deadline: both 503, not 403/anonymous
+        for timeout_ms, token in (("600", "token-a"), ("2500", "token-b")):
+            response = app.post("/chat", json={"message": "Why is my printer offline?", "access_token": token},
+                                headers={DEADLINE_HEADER: timeout_ms})
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "1" and response.get_json()["stage"] == "graph"
+        assert len(graph.timeouts) == 1 and graph.timeouts[0] <= 2.0
+
+        # A full-length Graph timeout says the token could not be verified: no email, as before
+        with index.app.test_request_context("/", headers={DEADLINE_HEADER: "60000"}):
+            index.app.preprocess_request()
+            assert index.get_user_email_from_token("token-c") is None
+    finally:
+        logging.disable(logging.NOTSET)
+        index.conversation_cache.clear()
+
+
+@pytest.fixture
+def chat_app(monkeypatch, tmp_path):
+    import index
+    store = KnowledgeStore(str(tmp_path / "knowledge.db"))
+    store.add("Printer offline: restart the print spooler service, then re-add the printer.", "it@castotravel.ph")
+    website_calls = []
+    monkeypatch.setattr(index, "knowledge_store", store)
+    monkeypatch.setattr(index, "get_user_email_from_token", lambda token: "agent@castotravel.ph")
+    monkeypatch.setattr(index, "fetch_website_data", lambda url, query=None: website_calls.append(url))
+    monkeypatch.setattr(index, "llm_scheduler", LLMScheduler(rpm=10 ** 6, tpm=10 ** 9))
+    logging.disable(logging.CRITICAL)
+    yield index, website_calls
+    logging.disable(logging.NOTSET)
+    index.conversation_cache.clear()
+    store.close()
+
+
+def test_short_deadline_skips_optional_stages_and_answers_partially(chat_app, monkeypatch):
+    index, website_calls = chat_app
+    llm = RecordingLLM()
+    monkeypatch.setattr(index, "client", llm)
+    app = index.app.test_client()
+
+    response = app.post("/chat", json={"message": "What services does the company offer? My printer is offline",
+                                       "access_token": "token"},
+                        headers={DEADLINE_HEADER: "700"})
+    body = response.get_json()
+    assert response.status_code == 200 and body["partial"] is True and body["cacheable"] is False
+    assert "restart the print spooler" in body["response"]
+    assert website_calls == [] and llm.timeouts == []
+
+    response = app.post("/chat", json={"message": "What services does the company offer?", "access_token": "token"},
+                        headers={DEADLINE_HEADER: "8000"})
+    assert response.get_json()["partial"] is False and response.get_json()["response"].startswith("Full answer")
+    assert len(website_calls) == 1 and 0 < llm.timeouts[0] <= 7.5
+
+
+def test_llm_timeout_returns_the_best_partial_answer(chat_app, monkeypatch):
+    index, _ = chat_app
+    llm = RecordingLLM(time_out=True)
+    monkeypatch.setattr(index, "client", llm)
+
+    response = index.app.test_client().post("/chat", json={"message": "Why is my printer offline?",
+                                                                  "access_token": "token"},
+                                            headers={DEADLINE_HEADER: "3000"})
+    body = response.get_json()
+    assert response.status_code == 200 and body["partial"] is True
+    assert "restart the print spooler" in body["response"]
+    assert 0 < llm.timeouts[0] <= 2.5
+
+
+
+def test_busy_llm_returns_the_knowledge_match_with_retry_after(chat_app, monkeypatch):
+    index, _ = chat_app
+    llm = RecordingLLM()
+    monkeypatch.setattr(index, "client", llm)
+    monkeypatch.setattr(index, "llm_scheduler", LLMScheduler(rpm=1, tpm=6000, max_wait=0.05))
+    index.llm_scheduler.requests.tokens = 0.0
+    app = index.app.test_client()
+
+    response = app.post("/chat", json={"message": "Why is my printer offline?", "access_token": "token"})
+    body = response.get_json()
+    assert response.status_code == 200 and body["partial"] is True and body["cacheable"] is False
+    assert "restart the print spooler" in body["response"]
+    assert int(response.headers["Retry-After"]) >= 1 and llm.timeouts == []
+
+    # Nothing in the knowledge base to offer instead: 503 with Retry-After as before
+    response = app.post("/chat", json={"message": "xyzzy plugh", "access_token": "token"})
+    assert response.status_code == 503 and int(response.headers["Retry-After"]) >= 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the debug event buffer and SSE stream
+"""
+
+import json
+import os
+import sys
+import threading
+
+import pytest
+from flask import Flask, g, jsonify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+import debug_events
+from debug_events import DebugEventBuffer, register_debug_routes, user_ref
+from debug_stream_monitor import iter_sse
+
+TOKEN = {"X-Debug-Token": "s3cret"}
+
+
+@pytest.fixture
+def debug_token(monkeypatch):
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", TOKEN["X-Debug-Token"])
+
+
+def _app(buffer):
+    app = Flask(__name__)
+    register_debug_routes(app, buffer)
+
+    @app.route("/chat", methods=["POST"])
+    def chat():
+        buffer.emit("chat.received", request_id=g.request_id, user="a@castotravel.ph")
+        return jsonify({"response": "ok"})
+
+    return app
+
+
+def test_buffer_is_bounded_and_ids_keep_growing():
+    buffer = DebugEventBuffer(capacity=3)
+    for n in range(5):
+        buffer.emit("tick", n=n)
+    assert [e["id"] for e in buffer.since(0)] == [3, 4, 5]
+    assert [e["n"] for e in buffer.since(4)] == [4]
+    assert buffer.latest_id() == 5
+
+
+def test_wait_wakes_on_emit():
+    buffer = DebugEventBuffer()
+    assert buffer.wait(0, 0.01) is False
+    threading.Timer(0.05, buffer.emit, args=("tick",)).start()
+    assert buffer.wait(0, 2) is True
+
+
+def test_requests_are_recorded_and_filterable(debug_token):
+    buffer = DebugEventBuffer()
+    client = _app(buffer).test_client()
+    response = client.post("/chat", json={"message": "hi"}, headers={"X-Request-ID": "req-1"})
+    assert response.headers["X-Request-ID"] == "req-1"
+    client.get("/missing")
+
+    events = client.get("/debug/events", headers=TOKEN).get_json()["events"]
+    assert [e["type"] for e in events] == ["chat.received", "http.request", "http.request"]
+    assert {e["request_id"] for e in events[:2]} == {"req-1"}
+
+    warnings = client.get("/debug/events?type=http.request&level=warning", headers=TOKEN).get_json()["events"]
+    assert len(warnings) == 1 and warnings[0]["path"] == "/missing" and warnings[0]["status"] == 404
+    # The email itself never reaches the buffer; filtering by it still works
+    assert client.get("/debug/events?contains=CASTOTRAVEL", headers=TOKEN).get_json()["events"] == []
+    by_user = client.get("/debug/events?user=a@castotravel.ph", headers=TOKEN).get_json()["events"]
+    assert [e["user"] for e in by_user] == [user_ref("a@castotravel.ph")]
+
+
+def test_endpoints_are_closed_without_a_token(monkeypatch):
+    buffer = DebugEventBuffer()
+    client = _app(buffer).test_client()
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", "")
+    for path in ("/debug/status", "/debug/events", "/debug/stream"):
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers=TOKEN).status_code == 403
+
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", TOKEN["X-Debug-Token"])
+    assert client.get("/debug/events", headers={"X-Debug-Token": "guess"}).status_code == 401
+    assert client.get("/debug/status?token=s3cret").status_code == 200
+    assert user_ref("anonymous") == "anonymous" and user_ref("A@castotravel.ph") == user_ref("a@castotravel.ph")
+    assert "castotravel" not in user_ref("a@castotravel.ph")
+
+
+def test_app_debug_views_use_the_same_token(monkeypatch):
+    import index
+    client = index.app.test_client()
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", "")
+    for path in ("/debug/llm", "/debug/admission"):
+        assert client.get(path, headers=TOKEN).status_code == 403
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", TOKEN["X-Debug-Token"])
+    for path in ("/debug/llm", "/debug/admission"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=TOKEN).status_code == 200
+
+
+def test_stream_replays_from_last_event_id(debug_token):
+    buffer = DebugEventBuffer()
+    for n in range(3):
+        buffer.emit("chat.llm" if n else "chat.error", n=n)
+    client = _app(buffer).test_client()
+    response = client.get("/debug/stream?type=chat.llm", headers=dict(TOKEN, **{"Last-Event-ID": "1"}),
+                          buffered=False)
+    assert response.mimetype == "text/event-stream"
+
+    chunks = iter(response.response)
+    lines = (line for chunk in chunks for line in
+             (chunk.decode() if isinstance(chunk, bytes) else chunk).split("\n"))
+    received = []
+    for event_id, event_type, data in iter_sse(lines):
+        received.append((event_id, event_type, json.loads(data)["n"]))
+        if len(received) == 2:
+            break
+    response.close()
+    assert received == [("2", "chat.llm", 1), ("3", "chat.llm", 2)]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
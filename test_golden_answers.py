@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Test script for golden answers and performance baselines of the /chat endpoint
+
+Runs every case in golden_answers.json in-process through Flask's test client
+with a deterministic stub LLM, so no deployment, Groq key or network access is
+needed. Executive, identity and Sabre answers must contain the expected text.
+When a case goes to the LLM, the system prompt it receives must contain the
+expected facts.
+
+Each case also records its median latency and peak traced allocations. These
+are compared with golden_baseline.json, and the run fails when a case gets
+slower or allocates more than GOLDEN_PERF_THRESHOLD (default 0.5 = +50%).
+Refresh the baseline after an intended change with:
+
+    python test_golden_answers.py --update-baseline
+"""
+
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "api"))
+
+import index
+from knowledge_store import KnowledgeStore
+from llm_scheduler import LLMScheduler
+
+GOLDEN_FILE = os.path.join(ROOT, "golden_answers.json")
+BASELINE_FILE = os.path.join(ROOT, "golden_baseline.json")
+PERF_THRESHOLD = float(os.environ.get("GOLDEN_PERF_THRESHOLD", "0.5"))
+# Timer noise and allocator jitter below these are never treated as regressions
+LATENCY_SLACK_MS = 2.0
+ALLOCATION_SLACK_KIB = 16.0
+TIMING_RUNS = 5
+TEST_EMAIL = "golden.tester@castotravel.ph"
+
+with open(GOLDEN_FILE, encoding="utf-8") as f:
+    GOLDEN_CASES = json.load(f)
+
+
+class StubLLMClient:
+    """Stands in for the Groq client: answers deterministically and keeps every prompt."""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = self
+        self.completions = self
+        self.with_raw_response = StubRawCompletions(self)
+
+    def create(self, model, messages, temperature=None, timeout=None):
+        self.calls.append({"model": model, "system": messages[0]["content"], "user": messages[-1]["content"]})
+        return StubCompletion(f"I'm CASI! (stub answer to: {messages[-1]['content']})")
+
+
+# Plain instances, not a new class per call: uncollected classes skew the peak allocation figures
+class StubCompletion:
+    """Just the ``choices[0].message.content`` shape the backend reads."""
+
+    def __init__(self, content):
+        message = SimpleNamespace(content=content)
+        self.choices = [SimpleNamespace(message=message)]
+        self.usage = None
+
+
+class StubRawResponse:
+    headers = {}
+
+    def __init__(self, completion):
+        self.completion = completion
+
+    def parse(self):
+        return self.completion
+
+
+class StubRawCompletions:
+    """``completions.with_raw_response``: the same answers, wrapped the way the openai client returns them."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, **kwargs):
+        return StubRawResponse(self.client.create(**kwargs))
+
+
+# Module globals of index that offline_chat replaces and restores
+OFFLINE_PATCHED = ("get_user_email_from_token", "fetch_website_data", "knowledge_store", "llm_scheduler", "client")
+
+
+@contextmanager
+def offline_chat(db_dir):
+    """Keep /chat in-process: no Graph lookups, no website scraping, an empty knowledge store, no log noise.
+
+    Shared by the tests and by --update-baseline, so the baseline is measured the same way it is checked.
+    """
+    saved = {name: getattr(index, name) for name in OFFLINE_PATCHED}
+    store = KnowledgeStore(os.path.join(db_dir, "knowledge.db"))
+    index.get_user_email_from_token = lambda token: TEST_EMAIL if token else None
+    index.fetch_website_data = lambda url, query=None: None
+    index.knowledge_store = store
+    # The timing runs make far more LLM calls than Groq's real per-minute budget allows
+    index.llm_scheduler = LLMScheduler(rpm=10 ** 6, tpm=10 ** 9)
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+        for name, value in saved.items():
+            setattr(index, name, value)
+        index.conversation_cache.clear()
+        store.close()
+
+
+@pytest.fixture(autouse=True)
+def offline_backend(tmp_path):
+    with offline_chat(str(tmp_path)):
+        yield
+
+
+def ask(case, client):
+    """POST one golden case with a fresh conversation and return the parsed response."""
+    index.client = client
+    index.conversation_cache.clear()
+    payload = {"message": case["message"]}
+    if case.get("authenticated"):
+        payload["access_token"] = "golden-token"
+    response = index.app.test_client().post("/chat", json=payload)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()["response"]
+
+
+def client_for(case):
+    return None if case.get("llm") == "offline" else StubLLMClient()
+
+
+def measure(case):
+    """Median latency in ms over TIMING_RUNS and peak traced allocation in KiB for one case."""
+    ask(case, client_for(case))  # warm caches so the baseline measures steady state
+    timings = []
+    for _ in range(TIMING_RUNS):
+        started = time.perf_counter()
+        ask(case, client_for(case))
+        timings.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        ask(case, client_for(case))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"latency_ms": round(statistics.median(timings), 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def find_regressions(measured, baseline, threshold=PERF_THRESHOLD):
+    """Human-readable regressions of ``measured`` against ``baseline`` beyond ``threshold``."""
+    regressions = []
+    for case_id, now in measured.items():
+        before = baseline.get(case_id)
+        if not before:
+            continue
+        for metric, slack in (("latency_ms", LATENCY_SLACK_MS), ("peak_kib", ALLOCATION_SLACK_KIB)):
+            limit = max(before[metric] * (1 + threshold), before[metric] + slack)
+            if now[metric] > limit:
+                regressions.append(f"{case_id}: {metric} {now[metric]} > {round(limit, 3)} (baseline {before[metric]})")
+    return regressions
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+def update_baseline():
+    measured = {case["id"]: measure(case) for case in GOLDEN_CASES}
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "timing_runs": TIMING_RUNS, "cases": measured}, f, indent=2)
+        f.write("\n")
+    return measured
+
+
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=[case["id"] for case in GOLDEN_CASES])
+def test_golden_answer(case):
+    client = client_for(case)
+    answer = ask(case, client).lower()
+    for text in case.get("expect", []):
+        assert text in answer, f"{case['id']}: expected '{text}' in answer: {answer[:200]}"
+    for text in case.get("reject", []):
+        assert text not in answer, f"{case['id']}: did not expect '{text}' in answer: {answer[:200]}"
+    if client is None:
+        return
+    if "llm_called" in case:
+        assert bool(client.calls) == case["llm_called"], f"{case['id']}: llm_called should be {case['llm_called']}"
+    for text in case.get("prompt_expect", []):
+        assert text in client.calls[-1]["system"], f"{case['id']}: system prompt is missing '{text}'"
+
+
+def test_knowledge_base_covers_executives():
+    """Merged from test_kb_fix.py: both knowledge sources still describe the founder and CEO."""
+    with open(os.path.join(ROOT, "knowledge_base.json"), encoding="utf-8") as f:
+        entries = json.load(f)
+    assert any("maryles" in (e.get("question", "") + e.get("answer", "")).lower() for e in entries)
+    embedded = " ".join(index.get_cached_knowledge())
+    assert "Maryles Casto is the Founder & Chairperson" in embedded
+    assert "Marc Casto is the CEO" in embedded
+
+
+def test_find_regressions_respects_threshold_and_slack():
+    baseline = {"a": {"latency_ms": 10.0, "peak_kib": 100.0}, "b": {"latency_ms": 0.5, "peak_kib": 4.0}}
+    measured = {"a": {"latency_ms": 16.0, "peak_kib": 140.0}, "b": {"latency_ms": 2.0, "peak_kib": 12.0},
+                "new": {"latency_ms": 99.0, "peak_kib": 999.0}}
+    assert find_regressions(measured, baseline, threshold=0.5) == ["a: latency_ms 16.0 > 15.0 (baseline 10.0)"]
+
+
+def test_performance_against_baseline():
+    baseline = load_baseline()
+    if not baseline:
+        pytest.skip("No golden_baseline.json yet; run python test_golden_answers.py --update-baseline")
+    measured = {case["id"]: measure(case) for case in GOLDEN_CASES if case["id"] in baseline}
+    regressions = find_regressions(measured, baseline)
+    assert not regressions, "Performance regressions:\n" + "\n".join(regressions)
+
+
+if __name__ == "__main__":
+    if "--update-baseline" in sys.argv:
+        with tempfile.TemporaryDirectory() as db_dir, offline_chat(db_dir):
+            measured = update_baseline()
+        for case_id, result in measured.items():
+            print(f"📏 {case_id}: {result['latency_ms']} ms, {result['peak_kib']} KiB")
+        print(f"💾 Baseline saved to {BASELINE_FILE}")
+    else:
+        sys.exit(pytest.main([__file__, "-q"]))
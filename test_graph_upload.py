@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for chunked Graph attachment uploads against a local stand-in
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from graph_upload import GraphMailSender, GraphUploadError, parse_retry_after
+
+CHUNK = 320 * 1024
+
+
+class FakeGraph(BaseHTTPRequestHandler):
+    """Minimal Graph stand-in: drafts, upload sessions, chunk PUTs and send."""
+
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        state = self.state
+        body = self._body()
+        if self.path == "/v1.0/me/sendMail":
+            state["sendmail"].append(json.loads(body))
+            self._reply(202)
+        elif self.path == "/v1.0/me/messages":
+            state["draft"] = json.loads(body)
+            self._reply(201, {"id": "draft-1"})
+        elif self.path.endswith("/attachments/createUploadSession"):
+            item = json.loads(body)["AttachmentItem"]
+            state["uploads"][item["name"]] = bytearray()
+            port = self.server.server_address[1]
+            self._reply(201, {"uploadUrl": f"http://127.0.0.1:{port}/upload/{item['name']}"})
+        elif self.path == "/v1.0/me/messages/draft-1/send":
+            state["sent"] = True
+            self._reply(202)
+        else:
+            self._reply(404)
+
+    def do_DELETE(self):
+        self.state["deleted"].append(self.path.rsplit("/", 1)[-1])
+        self._reply(204)
+
+    def do_PUT(self):
+        state = self.state
+        name = self.path.rsplit("/", 1)[-1]
+        assert "Authorization" not in self.headers
+        start, rest = self.headers["Content-Range"].split(" ")[1].split("-")
+        end, total = rest.split("/")
+        data = self._body()
+        state["chunk_sizes"].append(len(data))
+        if state["fail_once"] or state["throttle"]:
+            state["fail_once"] = False
+            self._reply(503, headers={"Retry-After": "0"} if state["throttle"] else None)
+            return
+        upload = state["uploads"][name]
+        assert int(start) == len(upload)
+        upload.extend(data)
+        if int(end) + 1 == int(total):
+            self._reply(201, {})
+        else:
+            self._reply(202, {"nextExpectedRanges": [f"{len(upload)}-"]})
+
+
+def _serve():
+    FakeGraph.state = {"sendmail": [], "draft": None, "uploads": {}, "sent": False, "deleted": [],
+                       "chunk_sizes": [], "fail_once": False, "throttle": False}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGraph)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1.0"
+
+
+def test_small_attachment_is_sent_inline():
+    """Files under the inline limit keep the single sendMail request"""
+    server, base_url = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "small.txt")
+            with open(path, "wb") as f:
+                f.write(b"hello")
+            sender = GraphMailSender("token", base_url=base_url)
+            assert sender.send_mail("it@example.com", "Subject", "Body", [path])
+        sent = FakeGraph.state["sendmail"][0]["message"]
+        assert sent["attachments"][0]["name"] == "small.txt"
+        assert FakeGraph.state["draft"] is None
+    finally:
+        server.shutdown()
+
+
+def test_large_attachment_uses_upload_session():
+    """Large files are streamed in 320 KiB-multiple chunks and the draft is sent"""
+    server, base_url = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "logs.zip")
+            payload = os.urandom(CHUNK * 5 + 1234)
+            with open(path, "wb") as f:
+                f.write(payload)
+            progress = []
+            sender = GraphMailSender("token", base_url=base_url, chunk_size=CHUNK * 2, inline_limit=CHUNK)
+            assert sender.send_mail("it@example.com", "Subject", "Body", [path],
+                                    progress_callback=lambda sent, total: progress.append((sent, total)))
+        assert bytes(FakeGraph.state["uploads"]["logs.zip"]) == payload
+        assert FakeGraph.state["sent"]
+        assert "attachments" not in FakeGraph.state["draft"]
+        assert max(FakeGraph.state["chunk_sizes"]) == CHUNK * 2
+        assert progress[-1] == (len(payload), len(payload))
+        assert FakeGraph.state["deleted"] == []
+    finally:
+        server.shutdown()
+
+
+def test_failed_chunk_is_retried():
+    """A transient 5xx on a chunk is retried instead of failing the ticket"""
+    server, base_url = _serve()
+    try:
+        FakeGraph.state["fail_once"] = True
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "big.bin")
+            payload = os.urandom(CHUNK * 3)
+            with open(path, "wb") as f:
+                f.write(payload)
+            sender = GraphMailSender("token", base_url=base_url, chunk_size=CHUNK, inline_limit=CHUNK)
+            assert sender.send_mail("it@example.com", "Subject", "Body", [path])
+        assert bytes(FakeGraph.state["uploads"]["big.bin"]) == payload
+    finally:
+        server.shutdown()
+
+
+def test_retry_after_is_honoured_and_last_attempt_does_not_sleep():
+    """Retry-After replaces the exponential backoff, and giving up does not wait first"""
+    assert parse_retry_after("2") == 2.0 and parse_retry_after("3600") == 60
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    server, base_url = _serve()
+    try:
+        FakeGraph.state["throttle"] = True
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "big.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(CHUNK * 2))
+            sender = GraphMailSender("token", base_url=base_url, chunk_size=CHUNK, inline_limit=CHUNK)
+            started = time.monotonic()
+            try:
+                sender.send_mail("it@example.com", "Subject", "Body", [path])
+                assert False, "expected GraphUploadError"
+            except GraphUploadError:
+                pass
+            # Without Retry-After: 0 this would have slept 1 + 2 (+ 4 after the last attempt) seconds
+            assert time.monotonic() - started < 1
+        assert len(FakeGraph.state["chunk_sizes"]) == 3
+        # The outbox retries with a fresh draft, so the failed one is removed from the mailbox
+        assert FakeGraph.state["deleted"] == ["draft-1"] and not FakeGraph.state["sent"]
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    for test in (test_small_attachment_is_sent_inline, test_large_attachment_uses_upload_session,
+                 test_failed_chunk_is_retried, test_retry_after_is_honoured_and_last_attempt_does_not_sleep):
+        test()
+        print(f"✅ {test.__name__}")
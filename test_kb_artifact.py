@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled, memory-mapped knowledge-base artifact
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+import kb_compile
+from kb_artifact import KnowledgeArtifact, KnowledgeArtifactError, load_knowledge_artifact, write_artifact
+
+KNOWLEDGE = ["Marc Casto is the CEO of Casto Travel Philippines.", "George Anzures is the IT Director. 💻"]
+QA_PAIRS = [("How do I reset my password?", "Use the self-service portal."), ("Who is the CFO?", "Alwin Benedicto.")]
+COMPANY_INFO = {"company_name": "Casto Travel Philippines", "executives": {"ceo": {"name": "Marc Casto"}}}
+
+
+def test_round_trip_and_cached_strings():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge.kb")
+        write_artifact(path, KNOWLEDGE, QA_PAIRS, COMPANY_INFO, {"kb_version": "abc"})
+        artifact = KnowledgeArtifact(path)
+        try:
+            assert list(artifact.knowledge) == KNOWLEDGE
+            assert artifact.knowledge[1].endswith("💻")
+            assert artifact.qa_documents[0] == "Question: How do I reset my password?\nAnswer: Use the self-service portal."
+            assert artifact.company_info == COMPANY_INFO and artifact.kb_version == "abc"
+            assert artifact.knowledge[0] is artifact.knowledge[0]  # decoded once, not per access
+            assert artifact.documents[1:3] == [KNOWLEDGE[1], artifact.qa_documents[0]]
+            assert artifact.knowledge.join("\n") == "\n".join(KNOWLEDGE)
+            assert artifact.knowledge.join("\n") is artifact.knowledge.join("\n")
+        finally:
+            artifact.close()
+        os.remove(path)  # the mapping is really released
+
+
+def test_rejects_foreign_or_truncated_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge.kb")
+        with open(path, "wb") as f:
+            f.write(b"not an artifact at all")
+        with pytest.raises(KnowledgeArtifactError):
+            KnowledgeArtifact(path)
+        assert load_knowledge_artifact(path) is None
+        assert load_knowledge_artifact(os.path.join(tmp, "missing.kb")) is None
+
+        write_artifact(path, KNOWLEDGE, QA_PAIRS, COMPANY_INFO)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) // 2)
+        assert load_knowledge_artifact(path) is None
+
+
+def test_compiler_tracks_source_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "knowledge_base.json")
+        out = os.path.join(tmp, "knowledge.kb")
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump([{"question": "q1", "answer": "a1"}], f)
+        meta = kb_compile.compile_knowledge(source, out)
+        assert kb_compile.is_current(source, out)
+        with open(source, "w", encoding="utf-8") as f:
+            json.dump([{"question": "q1", "answer": "a2"}], f)
+        assert not kb_compile.is_current(source, out)
+        assert kb_compile.compile_knowledge(source, out)["kb_version"] != meta["kb_version"]
+
+
+def test_shipped_artifact_is_current():
+    assert kb_compile.is_current(), "api/knowledge.kb is stale; run python kb_compile.py"
+
+
+def test_artifact_and_plain_list_give_the_same_search_results(monkeypatch):
+    import index
+    if index.KNOWLEDGE_ARTIFACT is None:
+        pytest.skip("api/knowledge.kb is not built")
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_answers.json"), encoding="utf-8") as f:
+        queries = [case["message"] for case in json.load(f)]
+    queries += ["who handles tax", "HR", "who is the ceo", "what's the weather"]
+    artifact_entries = index.KNOWLEDGE_ARTIFACT.knowledge
+    plain_entries = list(artifact_entries)
+    monkeypatch.setattr(index, "get_knowledge_store", lambda: None)  # compare the knowledge entries only
+    for query in queries:
+        assert index.search_knowledge(query, artifact_entries) == index.search_knowledge(query, plain_entries), query
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
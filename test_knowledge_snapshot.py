@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for versioned knowledge snapshots and the background rebuild watcher
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from knowledge_snapshot import KnowledgeSnapshotManager, file_fingerprint
+
+
+class Source:
+    """In-memory knowledge source; ``gate`` lets a test hold a build mid-way."""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.revision = 1
+        self.fail = False
+        self.gate = None
+        self.started = threading.Event()
+
+    def build(self):
+        self.started.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ValueError("half-written source")
+        return list(self.entries)
+
+    def fingerprint(self):
+        return self.revision
+
+    def edit(self, *entries):
+        self.entries = list(entries)
+        self.revision += 1
+
+
+def test_swap_only_when_sources_change():
+    source = Source(["Question: a\nAnswer: 1"])
+    swapped = []
+    manager = KnowledgeSnapshotManager(source.build, source.fingerprint, on_swap=swapped.append)
+    assert manager.version == 0 and manager.current().entries == ()
+    assert manager.refresh() and manager.version == 1
+    in_flight = manager.current()
+    assert not manager.refresh()
+
+    source.edit("Question: a\nAnswer: 2")
+    assert manager.refresh()
+    assert manager.version == 2 and manager.current().entries == ("Question: a\nAnswer: 2",)
+    assert in_flight.entries == ("Question: a\nAnswer: 1",)  # an in-flight request keeps its snapshot
+    assert in_flight.kb_version != manager.current().kb_version
+    assert [s.version for s in swapped] == [1, 2]
+
+
+def test_failed_build_keeps_old_snapshot_until_next_change():
+    source = Source(["one"])
+    manager = KnowledgeSnapshotManager(source.build, source.fingerprint)
+    manager.refresh()
+    source.edit("two")
+    source.fail = True
+    assert not manager.refresh()
+    assert manager.current().entries == ("one",) and manager.failures == 1
+    assert not manager.refresh() and manager.failures == 1  # not retried for the same sources
+
+    source.fail = False
+    source.edit("three")
+    assert manager.refresh() and manager.current().entries == ("three",)
+    assert manager.stats()["last_error"] == "half-written source"
+
+
+def test_watcher_rebuilds_without_blocking_readers():
+    source = Source(["old"])
+    manager = KnowledgeSnapshotManager(source.build, source.fingerprint, poll_interval=60)
+    manager.refresh()
+    manager.start()
+    try:
+        source.gate = threading.Event()
+        source.started.clear()
+        source.edit("new")
+        manager.request_reload()
+        assert source.started.wait(2)
+        started = time.perf_counter()
+        assert manager.current().entries == ("old",)  # served from the old snapshot mid-rebuild
+        assert time.perf_counter() - started < 0.1
+        source.gate.set()
+        deadline = time.time() + 2
+        while manager.version < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.current().entries == ("new",) and manager.stats()["watching"]
+    finally:
+        manager.stop()
+    assert not manager.stats()["watching"]
+
+
+def test_file_fingerprint_tracks_edits():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "knowledge_base.json")
+        assert file_fingerprint(path) == ((path, None),)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[]")
+        before = file_fingerprint(path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('[{"question": "q", "answer": "a"}]')
+        assert file_fingerprint(path) != before
+
+
+if __name__ == "__main__":
+    for test in (test_swap_only_when_sources_change, test_failed_build_keeps_old_snapshot_until_next_change,
+                 test_watcher_rebuilds_without_blocking_readers, test_file_fingerprint_tracks_edits):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite FTS5 knowledge store and the /knowledge endpoints
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from knowledge_store import KnowledgeStore, fts_query
+
+ADMIN_EMAIL = "rojohn.deguzman@castotravel.ph"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = KnowledgeStore(str(tmp_path / "knowledge.db"))
+    yield store
+    store.close()
+
+
+def test_bm25_search_and_trigger_sync(store):
+    printer = store.add("To add a network printer open Settings, Printers, then Add device.", "it@castotravel.ph")
+    store.add("The Sabre PCC for the Manila office is ABC1.", "it@castotravel.ph")
+    jams = store.add("Printer jams: open the tray. Printer offline: restart the printer spooler.", "it@castotravel.ph")
+
+    hits = store.search("printer offline?")
+    assert [hit["id"] for hit in hits] == [jams["id"], printer["id"]]
+    assert hits[0]["score"] > hits[1]["score"]
+    assert store.search('"unbalanced (AND OR') == []
+    assert fts_query('printers" OR NEAR(') == '"printers" OR "or" OR "near"'
+
+    conn = sqlite3.connect(store.path)
+    with conn:
+        conn.execute("UPDATE knowledge SET content = 'Scanner setup guide' WHERE id = ?", (printer["id"],))
+    conn.close()
+    assert [hit["id"] for hit in store.search("scanner")] == [printer["id"]]
+    assert store.delete(printer["id"]) and store.search("scanner") == []
+
+
+def test_writes_on_a_shared_normal_pool_commit_with_full_sync(tmp_path):
+    from sqlite_pool import SQLitePool
+    pool = SQLitePool(str(tmp_path / "conversations.db"))  # synchronous=NORMAL, as on-prem shares it
+    store = KnowledgeStore(pool.path, pool=pool)
+    seen = []
+    with pool.writer() as conn:
+        conn.set_trace_callback(seen.append)
+    try:
+        entry = store.add("Printer offline: restart the spooler.", "it@castotravel.ph")
+        assert store.delete(entry["id"])
+        assert seen.count("PRAGMA synchronous=FULL") == 2
+        with pool.writer() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        pool.close_all()
+
+
+def test_wal_durability_and_reopen(tmp_path):
+    path = str(tmp_path / "knowledge.db")
+    store = KnowledgeStore(path)
+    entry = store.add("VPN: use GlobalProtect with your Casto email.", "it@castotravel.ph")
+    with store.pool.writer() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    fingerprint = store.fingerprint()
+    store.close()
+
+    reopened = KnowledgeStore(path)
+    try:
+        assert reopened.entries() == [entry]
+        assert reopened.fingerprint() == fingerprint
+        assert reopened.search("globalprotect")[0]["id"] == entry["id"]
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(reopened.search("vpn")))
+        thread.start()
+        thread.join()
+        assert seen[0][0]["id"] == entry["id"]
+    finally:
+        reopened.close()
+
+
+def test_indexes_rows_from_the_legacy_table(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE knowledge (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, timestamp TEXT, content TEXT)")
+    conn.execute("INSERT INTO knowledge (user_id, timestamp, content) VALUES ('a', '2025-01-01', 'Outlook archive limits')")
+    conn.commit()
+    conn.close()
+
+    store = KnowledgeStore(path)
+    try:
+        assert [hit["content"] for hit in store.search("outlook")] == ["Outlook archive limits"]
+    finally:
+        store.close()
+
+
+def test_knowledge_endpoints_use_the_store(monkeypatch, store):
+    import index
+    monkeypatch.setattr(index, "knowledge_store", store)
+    monkeypatch.setattr(index, "get_user_email_from_token", lambda token: ADMIN_EMAIL if token else None)
+    logging.disable(logging.CRITICAL)
+    try:
+        app = index.app.test_client()
+        response = app.post("/knowledge", json={"access_token": "t", "content": "Wi-Fi guest password rotates on Mondays."})
+        entry = response.get_json()["entry"]
+        assert response.status_code == 200 and entry["user_id"] == ADMIN_EMAIL
+        assert response.get_json()["durable"] is True and "warning" not in response.get_json()
+
+        # Vercel's /tmp store is per instance and wiped on cold start; the caller is told so
+        monkeypatch.setattr(index, "KNOWLEDGE_STORE_DURABLE", False)
+        ephemeral = app.post("/knowledge", json={"access_token": "t", "content": "Printer queue resets nightly."})
+        assert ephemeral.get_json()["durable"] is False and "cold start" in ephemeral.get_json()["warning"]
+        store.delete(ephemeral.get_json()["entry"]["id"])
+
+        listed = app.get("/knowledge?access_token=t").get_json()
+        assert listed[0] == dict(entry, source="store")
+        assert listed[-1]["source"] == "built-in" and listed[-1]["timestamp"] is None
+
+        results = app.post("/knowledge/search", json={"query": "guest wi-fi password"}).get_json()["results"]
+        assert any(r["source"] == "Knowledge Store" and r["content"] == entry["content"] for r in results)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
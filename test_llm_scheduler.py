@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the outbound Groq scheduler: AIMD limit, RPM/TPM budgets, fair queue and 429 handling
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from llm_scheduler import LLMBusy, LLMScheduler, estimate_tokens, parse_duration, retry_after_from
+
+
+class RateLimited(Exception):
+    """Shaped like openai.RateLimitError: a 429 status and the response headers."""
+
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("429 Too Many Requests")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+def test_aimd_limit_and_429_retry():
+    logging.disable(logging.CRITICAL)
+    try:
+        scheduler = LLMScheduler(rpm=1000, tpm=10 ** 6, initial_limit=4, max_limit=5, max_wait=5, max_retries=2)
+        for _ in range(8):
+            assert scheduler.call(lambda: "ok", 10) == "ok"
+        assert scheduler.stats()["limit"] == 5
+
+        attempts = []
+
+        def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RateLimited({"retry-after": "0.2"})
+            return "answer"
+
+        assert scheduler.call(flaky, 10) == "answer"
+        assert attempts[1] - attempts[0] >= 0.19
+        stats = scheduler.stats()
+        assert stats["limit"] == 2 and stats["throttled"] == 1 and stats["retries"] == 1
+
+        with pytest.raises(ValueError):
+            scheduler.call(lambda: (_ for _ in ()).throw(ValueError("bad request")), 10)
+        assert scheduler.stats()["limit"] == 2
+        with pytest.raises(LLMBusy) as busy:
+            scheduler.call(lambda: (_ for _ in ()).throw(RateLimited({"x-ratelimit-reset-tokens": "1m2s"})), 10)
+        assert busy.value.retry_after == 60  # capped
+        stats = scheduler.stats()
+        assert stats["in_flight"] == 0 and 59 < stats["paused_for"] <= 60
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def test_retry_after_prefers_retry_after_then_the_token_reset():
+    # The request reset counts down to the daily limit and must not pause the scheduler for hours
+    daily = {"x-ratelimit-reset-requests": "7h12m", "x-ratelimit-reset-tokens": "7.5s", "retry-after": "3"}
+    assert retry_after_from(RateLimited(daily), default=1) == 3
+    del daily["retry-after"]
+    assert retry_after_from(RateLimited(daily), default=1) == 7.5
+    del daily["x-ratelimit-reset-tokens"]
+    assert retry_after_from(RateLimited(daily), default=1) == 1
+    assert retry_after_from(RateLimited({"retry-after": "86400"}), default=1) == 60
+
+
+def test_concurrency_is_capped_and_users_are_served_fairly():
+    scheduler = LLMScheduler(rpm=1000, tpm=10 ** 6, initial_limit=1, max_limit=1, max_wait=5)
+    gate = threading.Event()
+    order = []
+    first = threading.Thread(target=scheduler.call, args=(gate.wait, 10, "busy-user"))
+    first.start()
+    while scheduler.stats()["in_flight"] == 0:
+        time.sleep(0.005)
+
+    threads = []
+    for key in ("busy-user", "busy-user", "busy-user", "other-user"):
+        thread = threading.Thread(target=scheduler.call, args=(lambda key=key: order.append(key), 10, key))
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()["queued"] < len(threads):
+            time.sleep(0.005)
+    assert scheduler.stats()["queued_keys"] == 2
+
+    gate.set()
+    for thread in [first] + threads:
+        thread.join(5)
+    # The other user goes second despite arriving last
+    assert order == ["busy-user", "other-user", "busy-user", "busy-user"]
+
+
+def test_rpm_and_tpm_budgets_make_callers_wait():
+    scheduler = LLMScheduler(rpm=600, tpm=10 ** 6, initial_limit=8, max_wait=5)
+    scheduler.requests.tokens = 1.0
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.call(lambda: None, 10)
+    # 600 RPM refills one request every 0.1 s
+    assert time.monotonic() - started >= 0.18
+
+    scheduler = LLMScheduler(rpm=1000, tpm=6000, max_wait=0.2)
+    scheduler.call(lambda: None, 5000)
+    with pytest.raises(LLMBusy) as busy:
+        scheduler.call(lambda: None, 2000)
+    assert busy.value.retry_after >= 9
+    scheduler.settle(5000, used_tokens=800, headers={"x-ratelimit-remaining-tokens": "3000",
+                                                     "x-ratelimit-remaining-requests": "2"})
+    stats = scheduler.stats()
+    assert stats["timeouts"] == 1 and 3000 <= stats["tokens_available"] < 3010
+    assert stats["requests_available"] < 2.1
+    assert estimate_tokens("a" * 400, completion=100) == 200
+    assert parse_duration("2m59.5s") == 179.5 and parse_duration("120ms") == 0.12
+
+
+def test_chat_answers_503_when_groq_is_saturated(monkeypatch):
+    import debug_events
+    import index
+    monkeypatch.setattr(debug_events, "DEBUG_STREAM_TOKEN", "s3cret")
+    monkeypatch.setattr(index, "client", object())
+    monkeypatch.setattr(index, "llm_scheduler", LLMScheduler(rpm=1, tpm=6000, max_wait=0.05))
+    index.llm_scheduler.requests.tokens = 0.0
+    logging.disable(logging.CRITICAL)
+    try:
+        app = index.app.test_client()
+        response = app.post("/chat", json={"message": "My laptop will not connect to the VPN"})
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert app.get("/debug/llm").status_code == 401  # scheduler stats need the debug token
+        assert app.get("/debug/llm", headers={"X-Debug-Token": "s3cret"}).get_json()["timeouts"] == 1
+    finally:
+        logging.disable(logging.NOTSET)
+        index.conversation_cache.clear()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the async load generator
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from chat_scenarios import SCENARIOS, ScenarioMix, case_variations
+from load_test import LatencyHistogram, LoadTest, compare_reports
+
+
+async def _run_against_stub(**options):
+    """Run a load test against a local /chat stub that fails every fifth request."""
+    calls = {"n": 0}
+
+    async def chat(request):
+        calls["n"] += 1
+        message = (await request.json())["message"]
+        await asyncio.sleep(0.01)
+        if calls["n"] % 5 == 0:
+            return web.json_response({"error": "busy"}, status=503)
+        return web.json_response({"response": f"I'm CASI. Marc Casto is the CEO. You asked: {message}"})
+
+    app = web.Application()
+    app.router.add_post("/chat", chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        load_test = LoadTest(f"http://127.0.0.1:{port}", ScenarioMix(seed=1), **options)
+        return await load_test.run(), calls["n"]
+    finally:
+        await runner.cleanup()
+
+
+def test_histogram_percentiles_are_within_one_percent():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    assert abs(histogram.percentile(50) - 500) <= 5
+    assert abs(histogram.percentile(99) - 990) <= 10
+    assert histogram.percentile(100) == 1000
+
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    restored.merge(histogram)
+    assert restored.total == 2000 and restored.summary()["p50"] == histogram.summary()["p50"]
+
+
+def test_scenario_mix_is_weighted_and_repeatable():
+    assert case_variations("Who are you?") == ["Who are you?", "WHO ARE YOU?", "who are you?", "Who Are You?"]
+    first = [ScenarioMix(seed=7).next() for _ in range(3)]
+    assert first == [ScenarioMix(seed=7).next() for _ in range(3)]
+    names = [ScenarioMix(only=["ceo", "identity"], seed=3).next()[0] for _ in range(50)]
+    assert set(names) <= {"ceo", "identity"}
+    assert all(query in SCENARIOS["ceo"]["queries"] + SCENARIOS["identity"]["queries"]
+               for _, query in [ScenarioMix(only=["ceo", "identity"]).next() for _ in range(20)])
+
+
+def test_rps_mode_hits_target_rate_and_counts_errors():
+    report, served = asyncio.run(_run_against_stub(mode="rps", rps=50, duration=1.0))
+    summary = report["summary"]
+    assert 40 <= summary["requests"] <= 60 and summary["requests"] == served
+    assert summary["errors_by_kind"] == {"http_503": served // 5}
+    assert summary["latency_ms"]["p50"] >= 10
+    assert sum(s["requests"] for s in report["scenarios"].values()) == summary["requests"]
+
+
+def test_concurrency_mode_ramps_up_and_compares():
+    report, _ = asyncio.run(_run_against_stub(mode="concurrency", concurrency=4, duration=1.0, ramp_up=0.5))
+    assert report["meta"]["concurrency"] == 4
+    assert report["summary"]["throughput_rps"] > 0
+    faster = {"summary": dict(report["summary"], throughput_rps=report["summary"]["throughput_rps"] * 2)}
+    rows = {row[0]: row for row in compare_reports(report, faster)}
+    assert rows["throughput_rps"][3] == 100.0 and rows["throughput_rps"][4] is True
+    assert rows["p95 ms"][4] is None
+
+
+if __name__ == "__main__":
+    for test in (test_histogram_percentiles_are_within_one_percent, test_scenario_mix_is_weighted_and_repeatable,
+                 test_rps_mode_hits_target_rate_and_counts_errors, test_concurrency_mode_ramps_up_and_compares):
+        test()
+        print(f"✅ {test.__name__}")
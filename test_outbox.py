@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the durable ticket/alert outbox
+"""
+
+import os
+import tempfile
+import time
+
+from outbox import Outbox, STATUS_FAILED, STATUS_PENDING, STATUS_RETRYING, STATUS_SENT
+
+
+def test_enqueue_is_deduplicated_by_idempotency_key():
+    """Submitting the same alert twice stores one item"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outbox = Outbox(os.path.join(tmpdir, "outbox.db"))
+        first_id, created = outbox.enqueue("it_on_duty", {"concern": "printer jam", "user": "jdoe"})
+        second_id, created_again = outbox.enqueue("it_on_duty", {"user": "jdoe", "concern": "printer jam"})
+        assert created and not created_again
+        assert first_id == second_id
+        assert outbox.pending_count() == 1
+        outbox.close()
+
+
+def test_failed_delivery_is_retried_with_backoff():
+    """A failing handler leaves the item pending with a future retry time"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        statuses = []
+        outbox = Outbox(os.path.join(tmpdir, "outbox.db"), base_delay=10,
+                        on_status=lambda item_id, kind, status, detail, attempts: statuses.append(status))
+        calls = []
+
+        def flaky(payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise ConnectionError("network down")
+            return "via Teams"
+
+        outbox.register("it_on_duty", flaky)
+        item_id, _ = outbox.enqueue("it_on_duty", {"concern": "vpn"})
+        assert outbox.process_due() == 1
+        item = outbox.get(item_id)
+        assert item["status"] == STATUS_PENDING and item["attempts"] == 1
+        assert "network down" in item["last_error"]
+        assert 5 <= item["next_attempt_at"] - time.time() <= 10
+
+        assert outbox.process_due() == 0  # not due yet
+        assert outbox.process_due(now=item["next_attempt_at"] + 1) == 1
+        assert outbox.get(item_id)["status"] == STATUS_SENT
+        assert statuses == [STATUS_RETRYING, STATUS_SENT]
+        outbox.close()
+
+
+def test_item_fails_after_max_attempts():
+    """Delivery gives up after max_attempts and reports failure"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outbox = Outbox(os.path.join(tmpdir, "outbox.db"), max_attempts=2, base_delay=0)
+        outbox.register("helpdesk_email", lambda payload: False)
+        item_id, _ = outbox.enqueue("helpdesk_email", {"subject": "laptop"})
+        outbox.process_due()
+        outbox.process_due(now=time.time() + 1)
+        assert outbox.get(item_id)["status"] == STATUS_FAILED
+        outbox.close()
+
+
+def test_pending_items_survive_restart():
+    """Items queued before a crash are delivered by the next worker"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "outbox.db")
+        previous_run = Outbox(path)
+        previous_run.enqueue("it_on_duty", {"concern": "no internet"})
+        previous_run.close()
+
+        delivered = []
+        outbox = Outbox(path)
+        outbox.register("it_on_duty", lambda payload: delivered.append(payload) or True)
+        outbox.start()
+        deadline = time.time() + 5
+        while not delivered and time.time() < deadline:
+            time.sleep(0.05)
+        outbox.stop()
+        assert delivered == [{"concern": "no internet"}]
+        assert outbox.pending_count() == 0
+        outbox.close()
+
+
+if __name__ == "__main__":
+    for test in (test_enqueue_is_deduplicated_by_idempotency_key, test_failed_delivery_is_retried_with_backoff,
+                 test_item_fails_after_max_attempts, test_pending_items_survive_restart):
+        test()
+        print(f"✅ {test.__name__}")
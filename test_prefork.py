@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the prefork server: shared worker stats, forked workers, recycling and shutdown
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from prefork import PreforkServer, WorkerStats, supports_prefork
+from sqlite_pool import SQLitePool
+
+needs_fork = pytest.mark.skipif(not supports_prefork(), reason="os.fork is not available")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def pid_app(environ, start_response):
+    time.sleep(0.01)
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode()]
+
+
+def get(port, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2) as response:
+                return int(response.read())
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def run_server(port, stats, **options):
+    server = PreforkServer(pid_app, host="127.0.0.1", port=port, graceful_timeout=5, **options)
+    server.stats = stats
+    server.serve()
+
+
+def start_server(port, workers, **options):
+    stats = WorkerStats(workers)
+    # A fork context keeps the shared stats array and the test module's app importable in the parent
+    parent = multiprocessing.get_context("fork").Process(target=run_server, args=(port, stats),
+                                                         kwargs=dict(workers=workers, **options))
+    parent.start()
+    return parent, stats
+
+
+def test_worker_stats_report():
+    stats = WorkerStats(2)
+    stats.reset(0, 101)
+    stats.reset(1, 102)
+    for _ in range(10):
+        stats.record(0, 0.05)
+    for _ in range(5):
+        stats.record(1, 0.05)
+    start = stats.get(0, "started_at")
+    stats.values[stats._index(1, "started_at")] = start
+    report = stats.report(now=start + 10)
+
+    assert [row["pid"] for row in report["workers"]] == [101, 102]
+    assert [row["rps"] for row in report["workers"]] == [1.0, 0.5]
+    assert report["workers"][0]["busy"] == 0.05
+    assert report["total_rps"] == 1.5 and report["rps_per_worker"] == 0.75
+    assert report["balance"] == 0.75
+    assert report["speedup"] is None and report["scaling_efficiency"] is None  # no baseline given
+
+    # One worker alone served 1.0 req/s under the same load, so two reach 1.5x of an ideal 2x
+    report = stats.report(now=start + 10, baseline_rps=1.0)
+    assert report["speedup"] == 1.5 and report["scaling_efficiency"] == 0.75
+    assert WorkerStats(1).report()["balance"] is None
+
+
+@needs_fork
+def test_workers_share_the_socket_and_stop_on_sigterm():
+    port = free_port()
+    parent, stats = start_server(port, workers=3, threads=1)
+    try:
+        pids = {get(port) for _ in range(60)}
+        report = stats.report()
+        assert len(pids) >= 2 and parent.pid not in pids
+        assert pids <= {row["pid"] for row in report["workers"]}
+        assert sum(row["requests"] for row in report["workers"]) == 60
+    finally:
+        os.kill(parent.pid, signal.SIGTERM)
+        parent.join(10)
+    assert parent.exitcode == 0
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+
+@needs_fork
+def test_workers_recycle_after_max_requests():
+    port = free_port()
+    parent, stats = start_server(port, workers=1, max_requests=5)
+    try:
+        pids = [get(port) for _ in range(12)]
+        assert len(set(pids)) >= 2
+        assert pids[:5] == [pids[0]] * 5 and pids[5] != pids[0]
+    finally:
+        os.kill(parent.pid, signal.SIGTERM)
+        parent.join(10)
+
+
+def test_pool_reset_reopens_connections(tmp_path):
+    pool = SQLitePool(str(tmp_path / "pool.db"), max_readers=2)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE t (x)")
+    with pool.reader() as conn:
+        old = conn
+    pool.reset()
+    assert pool.stats()["readers"]["open"] == 0 and pool.stats()["writer"]["open"] == 0
+    with pool.reader() as conn:
+        assert conn is not old and conn.execute("SELECT count(*) FROM t").fetchone()[0] == 0
+    pool.close_all()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared-state token-bucket rate limiter
+"""
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from rate_limit import RateLimiter, TokenBucketStore, parse_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_limit():
+    assert parse_limit("30 per minute") == (30, 60)
+    assert parse_limit("5/second") == (5, 1)
+    assert parse_limit("1000 per day") == (1000, 86400)
+    with pytest.raises(ValueError):
+        parse_limit("lots per fortnight")
+
+
+def test_bucket_drains_and_refills(tmp_path):
+    clock = FakeClock()
+    store = TokenBucketStore(str(tmp_path / "rate_limits.db"), clock=clock)
+    try:
+        results = [store.take("chat:user:ana", 3, 60) for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results] == [2, 1, 0, 0]
+        assert results[-1].retry_after == pytest.approx(20.0)
+        assert results[-1].headers()["Retry-After"] == "20"
+        assert store.take("chat:user:ben", 3, 60).allowed  # separate identity, separate bucket
+
+        clock.now += 20
+        assert store.take("chat:user:ana", 3, 60).allowed
+        clock.now += 3600
+        full = store.take("chat:user:ana", 3, 60)
+        assert full.remaining == 2 and full.reset_after == pytest.approx(20.0)
+    finally:
+        store.close()
+
+
+def _spend(path, attempts, allowed):
+    store = TokenBucketStore(path)
+    allowed.put(sum(store.take("chat:ip:10.0.0.1", 15, 3600).allowed for _ in range(attempts)))
+    store.close()
+
+
+def test_workers_share_one_budget(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    TokenBucketStore(path).close()
+    context = multiprocessing.get_context("spawn")
+    allowed = context.Queue()
+    workers = [context.Process(target=_spend, args=(path, 10, allowed)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    assert sum(allowed.get(timeout=5) for _ in workers) == 15
+
+
+def test_flask_integration_keys_and_headers(tmp_path):
+    app = Flask(__name__)
+    limiter = RateLimiter(lambda: request.headers.get("X-User") or f"ip:{request.remote_addr}", app=app,
+                          store=TokenBucketStore(str(tmp_path / "rate_limits.db")), default_limits=["5 per minute"])
+
+    @app.route("/chat", methods=["POST"])
+    @limiter.limit("2 per minute")
+    def chat():
+        return jsonify({"response": "ok"})
+
+    @app.route("/status")
+    def status():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+    first = client.post("/chat", headers={"X-User": "user:ana"})
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2" and first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    client.post("/chat", headers={"X-User": "user:ana"})
+    blocked = client.post("/chat", headers={"X-User": "user:ana"})
+    assert blocked.status_code == 429 and int(blocked.headers["Retry-After"]) >= 1
+    assert blocked.get_json()["error"] == "Rate limit exceeded"
+    assert client.post("/chat", headers={"X-User": "user:ben"}).status_code == 200  # same office IP
+    assert client.get("/status").headers["RateLimit-Limit"] == "5"
+    limiter.store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
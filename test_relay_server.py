@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the queued Teams alert relay
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "casi-teams-bot"))
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from alert_coalescer import AlertCoalescer
+from alert_queue import AlertQueue
+from relay_server import create_app
+
+
+class FakeConnector:
+    """Stands in for TeamsConnectorCards with a slow, optionally failing send."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.digests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _send(self, record):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            record()
+        return {"status": "error" if self.fail else "success"}
+
+    def send_alert_to_teams(self, alert):
+        return self._send(lambda: self.sent.append(alert))
+
+    def send_digest_to_teams(self, alerts):
+        return self._send(lambda: self.digests.append(alerts))
+
+
+async def _run(connector, scenario, power_automate=None, coalescer=None):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_app(os.path.join(tmpdir, "queue.db"), connector=connector, power_automate=power_automate,
+                         coalescer=coalescer or AlertCoalescer(window=0, max_hold=0),
+                         concurrency=2, poll_interval=0.05)
+        async with TestClient(TestServer(app)) as client:
+            return await scenario(client)
+
+
+async def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+
+
+def test_send_alert_answers_202_before_delivery():
+    """The client is not held while the relay talks to Teams"""
+    connector = FakeConnector(delay=0.5)
+
+    async def scenario(client):
+        started = time.monotonic()
+        response = await client.post("/api/send-alert", json={"concern": "VPN down", "priority": "High"})
+        assert response.status == 202
+        assert time.monotonic() - started < 0.3
+        assert (await response.json())["status"] == "queued"
+        await _wait_for(lambda: connector.sent)
+        stats = await (await client.get("/api/stats")).json()
+        assert stats["queue"]["delivered"] == 1
+        assert stats["delivery_latency_ms"]["count"] == 1
+        assert "_relay_id" not in connector.sent[0]
+
+    asyncio.run(_run(connector, scenario))
+
+
+def test_delivery_concurrency_is_bounded():
+    connector = FakeConnector(delay=0.2)
+
+    async def scenario(client):
+        for i in range(6):
+            await client.post("/api/send-alert", json={"concern": f"distinct issue {i}", "priority": "Critical"})
+        await _wait_for(lambda: len(connector.sent) == 6)
+        assert len(connector.sent) == 6
+        assert connector.max_active == 2
+
+    asyncio.run(_run(connector, scenario))
+
+
+def test_burst_is_sent_as_digest():
+    connector = FakeConnector()
+    coalescer = AlertCoalescer(window=0.3, max_hold=2)
+
+    async def scenario(client):
+        for user in ("anna", "ben", "carl"):
+            await client.post("/api/send-alert", json={"concern": "internet connection down",
+                                                      "priority": "Network", "windows_user": user})
+        await _wait_for(lambda: connector.digests)
+        assert [a["windows_user"] for a in connector.sent] == ["anna"]
+        assert [a["windows_user"] for a in connector.digests[0]] == ["ben", "carl"]
+
+    asyncio.run(_run(connector, scenario, coalescer=coalescer))
+
+
+def test_power_automate_fallback_and_duplicate_key():
+    connector = FakeConnector(fail=True)
+    fallback = []
+
+    async def scenario(client):
+        headers = {"Idempotency-Key": "alert-1"}
+        first = await client.post("/api/send-alert", json={"concern": "printer"}, headers=headers)
+        second = await client.post("/api/send-alert", json={"concern": "printer"}, headers=headers)
+        assert (await second.json())["duplicate"]
+        assert (await first.json())["id"] == (await second.json())["id"]
+        await _wait_for(lambda: fallback)
+        stats = await (await client.get("/api/stats")).json()
+        assert stats["delivered_by_channel"] == {"power_automate": 1}
+
+    asyncio.run(_run(connector, scenario, power_automate=lambda alert: fallback.append(alert) or True))
+
+
+def test_claimed_alerts_are_requeued_on_restart():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "queue.db")
+        queue = AlertQueue(path)
+        queue.put({"concern": "monitor flickers"})
+        assert len(queue.claim_due()) == 1
+        queue.close()
+        restarted = AlertQueue(path)
+        assert restarted.counts()["pending"] == 1
+        restarted.close()
+
+
+if __name__ == "__main__":
+    for test in (test_send_alert_answers_202_before_delivery, test_delivery_concurrency_is_bounded,
+                 test_burst_is_sent_as_digest, test_power_automate_fallback_and_duplicate_key,
+                 test_claimed_alerts_are_requeued_on_restart):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the WAL-mode SQLite connection pool
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "api"))
+
+from sqlite_pool import ConnectionGroup, PoolTimeout, SQLitePool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool(str(tmp_path / "conversations.db"), max_readers=2, checkout_timeout=0.2)
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+    yield pool
+    pool.close_all()
+
+
+def test_lazy_growth_and_pragmas(pool):
+    assert pool.stats()["readers"]["open"] == 0
+    with pool.reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == pool.mmap_size
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO notes (body) VALUES ('readers are query-only')")
+    with pool.reader():
+        pass
+    assert pool.stats()["readers"]["open"] == 1  # the idle reader was reused
+
+
+def test_writer_commits_or_rolls_back_while_readers_proceed(pool):
+    with pytest.raises(ValueError):
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO notes (body) VALUES ('discarded')")
+            raise ValueError("boom")
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO notes (body) VALUES ('kept')")
+        # WAL: a reader sees the last committed state while the writer holds its transaction
+        conn.execute("INSERT INTO notes (body) VALUES ('pending')")
+        with pool.reader() as reader:
+            assert [row["body"] for row in reader.execute("SELECT body FROM notes")] == []
+    with pool.reader() as reader:
+        assert [row["body"] for row in reader.execute("SELECT body FROM notes ORDER BY id")] == ["kept", "pending"]
+
+
+def test_checkout_timeout_and_wait_metrics(pool):
+    with pool.reader(), pool.reader():
+        with pytest.raises(PoolTimeout):
+            with pool.reader():
+                pass
+    assert pool.stats()["readers"]["timeouts"] == 1
+
+    entered = threading.Event()
+
+    def hold_writer():
+        with pool.writer():
+            entered.set()
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=hold_writer)
+    thread.start()
+    entered.wait(1)
+    with pool.writer(timeout=2):
+        pass
+    thread.join()
+    writer = pool.stats()["writer"]
+    assert writer["max_wait_ms"] >= 50 and writer["in_use"] == 0 and writer["open"] == 1
+    assert 0 < writer["utilization"] <= 1
+
+
+def test_slow_connect_does_not_hold_the_lock():
+    started = threading.Event()
+
+    def slow_factory():
+        started.set()
+        time.sleep(0.3)
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    group = ConnectionGroup("slow", slow_factory, 2, 1.0)
+    first, first_at = group.acquire()
+    started.clear()
+    thread = threading.Thread(target=group.acquire)
+    thread.start()
+    started.wait(1)
+    began = time.monotonic()
+    group.release(first, first_at)  # must not wait for the second caller's connect
+    assert time.monotonic() - began < 0.1
+    thread.join()
+    assert group.stats()["open"] == 2
+
+
+def test_failed_connect_frees_the_slot():
+    def broken():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    group = ConnectionGroup("broken", broken, 1, 0.1)
+    for _ in range(2):
+        with pytest.raises(sqlite3.OperationalError):
+            group.acquire()
+    assert group.stats()["open"] == 0
+
+
+def test_writer_can_commit_with_a_stronger_synchronous_setting(pool):
+    with pool.writer(synchronous="FULL") as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL for this commit
+        conn.execute("INSERT INTO notes (body) VALUES ('durable')")
+    with pool.writer() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # back to the pool's NORMAL
+    with pytest.raises(RuntimeError):
+        with pool.writer(synchronous="FULL") as conn:
+            conn.execute("INSERT INTO notes (body) VALUES ('rolled back')")
+            raise RuntimeError("boom")
+    with pool.reader() as conn:
+        assert [row[0] for row in conn.execute("SELECT body FROM notes")] == ["durable"]
+    with pool.writer() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+def test_closed_pool_rejects_checkouts(pool):
+    pool.close_all()
+    with pytest.raises(PoolTimeout):
+        with pool.writer():
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
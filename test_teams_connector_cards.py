@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent Teams connector card sends
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "casi-teams-bot"))
+
+from teams_connector_cards import TeamsConnectorCards
+
+
+class FakeWebhook(BaseHTTPRequestHandler):
+    """Webhook stand-in: /slow answers after a delay, /throttled returns 429 once."""
+
+    hits = []
+    throttled = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        FakeWebhook.hits.append((self.path, time.monotonic()))
+        if self.path == "/slow":
+            time.sleep(0.5)
+        if self.path in ("/hang", "/error"):
+            # Teams may have posted the card before timing out or failing
+            if self.path == "/hang":
+                time.sleep(0.5)
+            self.send_response(502 if self.path == "/error" else 200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/throttled" and self.path not in FakeWebhook.throttled:
+            FakeWebhook.throttled.add(self.path)
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "1")
+        self.end_headers()
+        self.wfile.write(b"1")
+
+
+def _connector(channel_path, group_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeWebhook)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    connector = TeamsConnectorCards()
+    connector.channel_webhook = base + channel_path
+    connector.group_chat_webhook = base + group_path
+    FakeWebhook.hits = []
+    FakeWebhook.throttled = set()
+    return server, connector
+
+
+def test_webhooks_are_sent_concurrently():
+    """Two slow webhooks take about as long as one"""
+    server, connector = _connector("/slow", "/slow")
+    try:
+        started = time.monotonic()
+        result = connector.send_alert_to_teams({"priority": "High", "concern": "VPN down"})
+        assert time.monotonic() - started < 0.9
+        assert result["status"] == "success"
+        assert set(result["targets"]) == {"channel", "group_chat"}
+        assert all(target["latency_ms"] >= 500 for target in result["targets"].values())
+    finally:
+        server.shutdown()
+
+
+def test_throttled_webhook_honours_retry_after():
+    """A 429 is retried after the Retry-After delay instead of failing"""
+    server, connector = _connector("/throttled", "/ok")
+    try:
+        result = connector.send_alert_to_teams({"priority": "General", "concern": "printer"})
+        channel = result["targets"]["channel"]
+        assert channel["sent"] and channel["attempts"] == 2
+        throttled_hits = [t for path, t in FakeWebhook.hits if path == "/throttled"]
+        assert throttled_hits[1] - throttled_hits[0] >= 0.2
+        assert result["targets"]["group_chat"]["attempts"] == 1
+    finally:
+        server.shutdown()
+
+
+def test_possibly_accepted_cards_are_not_posted_twice():
+    """Read timeouts and 5xx are not retried; a refused connection is, within the target deadline"""
+    server, connector = _connector("/hang", "/error")
+    try:
+        connector.timeout = 0.2
+        result = connector.send_alert_to_teams({"priority": "High", "concern": "VPN down"})
+        assert result["targets"]["channel"]["attempts"] == 1 and not result["targets"]["channel"]["sent"]
+        assert result["targets"]["group_chat"]["attempts"] == 1
+        assert result["targets"]["group_chat"]["status_code"] == 502
+        assert [path for path, _ in FakeWebhook.hits].count("/hang") == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    port = server.server_address[1]  # closed now, so connections are refused
+    connector = TeamsConnectorCards(max_retries=10, target_deadline=1.5)
+    started = time.monotonic()
+    result = connector.post_card("Channel", f"http://127.0.0.1:{port}/ok", {})
+    assert not result["sent"] and result["attempts"] >= 2
+    assert time.monotonic() - started < 1.5
+
+
+def test_retry_after_parsing():
+    assert TeamsConnectorCards.parse_retry_after("5") == 5.0
+    assert TeamsConnectorCards.parse_retry_after(None) is None
+    assert TeamsConnectorCards.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+if __name__ == "__main__":
+    for test in (test_webhooks_are_sent_concurrently, test_throttled_webhook_honours_retry_after,
+                 test_possibly_accepted_cards_are_not_posted_twice, test_retry_after_parsing):
+        test()
+        print(f"✅ {test.__name__}")